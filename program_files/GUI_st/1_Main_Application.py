@@ -143,10 +143,16 @@ def main_input_sidebar() -> st.runtime.uploaded_file_manager.UploadedFile:
                                          "downsampling A": 6,
                                          "downsampling B": 7,
                                          "heuristic selection": 8,
-                                         "random sampling": 9}
+                                         "random sampling": 9,
+                                         "k_means typical periods": 10,
+                                         "k_medoids typical periods": 11,
+                                         "segmentation": 12}
 
-            # Timeseries Index Range None or 1 to 365
-            timeseries_index_range_list = ["None"] + list(range(1, 366))
+            # Timeseries Index Range None or 1 to 8760 (the segmentation
+            # uses the index as number of segments of the year) or auto
+            # (automatic index selection)
+            timeseries_index_range_list = \
+                ["None"] + list(range(1, 8761)) + ["auto"]
 
             # Dict of choosable clustering crtieria matching the streamlit \
             # input index for selectbox's preselections
@@ -154,7 +160,8 @@ def main_input_sidebar() -> st.runtime.uploaded_file_manager.UploadedFile:
                                                 "temperature": 1,
                                                 "dhi": 2,
                                                 "el_demand_sum": 3,
-                                                "heat_demand_sum": 4}
+                                                "heat_demand_sum": 4,
+                                                "multi-attribute": 5}
 
             # Dict of choosable timeseries periods matching the streamlit \
             # input index for selectbox's preselections
@@ -362,6 +369,22 @@ def main_input_sidebar() -> st.runtime.uploaded_file_manager.UploadedFile:
 
                 GUI_main_dict["input_pareto_points"] = input_pareto_points
 
+                # number of pareto runs which are solved concurrently
+                GUI_main_dict["input_pareto_processes"] = st.slider(
+                    label="Parallel pareto runs",
+                    min_value=1,
+                    max_value=8,
+                    help=GUI_helper["main_sl_pareto_processes"],
+                    value=settings_cache_dict_reload.get(
+                        "input_pareto_processes", 1))
+
+                # solve the pareto points within one persistent model
+                GUI_main_dict["input_pareto_sweep"] = st.checkbox(
+                    label="Pareto sweep (build the model once)",
+                    value=settings_cache_dict_reload.get(
+                        "input_pareto_sweep", False),
+                    help=GUI_helper["main_cb_pareto_sweep"])
+
             # Function to upload the distrct heating precalulation inside an \
             # expander.
             with st.expander("Advanced District Heating Precalculation"):
@@ -429,7 +452,7 @@ def main_input_sidebar() -> st.runtime.uploaded_file_manager.UploadedFile:
                 input_montecarlo_number_of_runs = st.selectbox(
                     label="Number of iterations",
                     options=["Not set"] + list(range(10, 510, 10)),
-                    index=index_montecarlo(mc_input=settings_cache_dict_reload[
+                    index=GUI_functions.index_montecarlo(mc_input=settings_cache_dict_reload[
                         "input_montecarlo_number_of_runs"]),
                     help=GUI_helper["montecarlo_number_of_iterations"])
                 input_montecarlo_section = st.slider(
@@ -442,6 +465,15 @@ def main_input_sidebar() -> st.runtime.uploaded_file_manager.UploadedFile:
                 
                 GUI_main_dict["input_montecarlo_number_of_runs"] = input_montecarlo_number_of_runs
                 GUI_main_dict["input_montecarlo_section"] = input_montecarlo_section
+
+                # number of monte carlo runs which are solved concurrently
+                GUI_main_dict["input_montecarlo_processes"] = st.slider(
+                    label="Parallel Monte Carlo runs",
+                    min_value=1,
+                    max_value=8,
+                    help=GUI_helper["montecarlo_processes"],
+                    value=settings_cache_dict_reload.get(
+                        "input_montecarlo_processes", 1))
                 
                 
                 # set if a pareto run should be performed additionally
@@ -473,7 +505,8 @@ def main_input_sidebar() -> st.runtime.uploaded_file_manager.UploadedFile:
             # Dict of choosable solvers the streamlit input index for
             # selectbox preselections
             input_solver_dict = {"cbc": 0,
-                                 "gurobi": 1}
+                                 "gurobi": 1,
+                                 "highs": 2}
             # chosing the solver in an select box
             GUI_main_dict["input_solver"] = st.selectbox(
                 label="Optimization Solver",
@@ -486,6 +519,19 @@ def main_input_sidebar() -> st.runtime.uploaded_file_manager.UploadedFile:
             GUI_main_dict["input_solver_index"] = \
                 input_solver_dict[GUI_main_dict["input_solver"]]
 
+            # deactivation of components which can not affect the optimum
+            GUI_main_dict["input_presolve"] = st.checkbox(
+                label="Model Definition Presolve",
+                value=settings_cache_dict_reload.get("input_presolve", False),
+                help=GUI_helper["main_cb_presolve"])
+
+            # tightening of the maximum investment capacities
+            GUI_main_dict["input_tighten_bounds"] = st.checkbox(
+                label="Investment Bound Tightening",
+                value=settings_cache_dict_reload.get("input_tighten_bounds",
+                                                     False),
+                help=GUI_helper["main_cb_tighten_bounds"])
+
         # create tab 2 for postprocessing
         with tab_bar[2]:
             # Input Postprocessing Parameters
@@ -681,8 +727,10 @@ if st.session_state["state_submitted_optimization"] == "done":
                                 GUI_main_dict=GUI_main_dict)
                         
                         # run monte carlo loops and return res path
-                        GUI_main_dict["res_path"] = run_SESMG_montecarlo(GUI_main_dict=GUI_main_dict,
-                                  model_definition=model_definition_input_file)
+                        GUI_main_dict["res_path"] = \
+                            GUI_functions.run_SESMG_montecarlo(
+                                GUI_main_dict=GUI_main_dict,
+                                model_definition=model_definition_input_file)
                         
 
                         # safe path as session state for the result processing page
@@ -702,8 +750,10 @@ if st.session_state["state_submitted_optimization"] == "done":
                         
 
                         # run monte carlo loops and return res path
-                        GUI_main_dict["res_path"]=run_SESMG_montecarlo(GUI_main_dict=GUI_main_dict,
-                                  model_definition=model_definition_input_file)
+                        GUI_main_dict["res_path"] = \
+                            GUI_functions.run_SESMG_montecarlo(
+                                GUI_main_dict=GUI_main_dict,
+                                model_definition=model_definition_input_file)
                                   
 
                         # safe path as session state for the result processing page
@@ -727,9 +777,10 @@ if st.session_state["state_submitted_optimization"] == "done":
                 with st.spinner("Modeling in Progress..."):
 
                     
-                    run_SESMG(GUI_main_dict=GUI_main_dict,
-                              model_definition=model_definition_input_file,
-                              save_path=GUI_main_dict["res_path"])
+                    GUI_functions.run_SESMG(
+                        GUI_main_dict=GUI_main_dict,
+                        model_definition=model_definition_input_file,
+                        save_path=GUI_main_dict["res_path"])
 
 
                     # save GUI settings in result folder and reset session state
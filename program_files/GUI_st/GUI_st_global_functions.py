@@ -10,13 +10,8 @@ import sys
 from pathlib import Path
 from PIL import Image
 import streamlit as st
-import random
-from datetime import datetime
-from program_files.preprocessing.pareto_optimization import create_model_definition_save_folder
-from program_files.postprocessing import create_results
-import logging
 from program_files.preprocessing.Spreadsheet_Energy_System_Model_Generator \
-    import sesmg_main, sesmg_main_including_premodel, sesmg_main_montecarlo
+    import create_timeseries_parameter_list, run_SESMG, run_SESMG_montecarlo
 
 
 def get_bundle_dir() -> str:
@@ -150,261 +145,6 @@ def clear_GUI_main_settings(json_file_path: str) -> None:
                        json_file_path=json_file_path)
 
 
-def create_timeseries_parameter_list(GUI_main_dict: dict,
-                                     input_value_list: list,
-                                     input_timeseries_season: str) -> list:
-    """
-        Creates list of input variables as input preparation for
-        run_semsg with appending input_timseries_season value.
-
-        :param GUI_main_dict: global defined dict of GUI input variables
-        :type GUI_main_dict: dict
-        :param input_value_list: list of input variables which will \
-            be written in a list from the GUI_main_dict
-        :type input_value_list: list
-        :param input_timeseries_season: input value of the season drop \
-            down menu in the GUI
-        :type input_timeseries_season: str
-
-        :return: - **parameter_list + input_value_season** (list) - \
-            list of timeseries simplification parameters
-    """
-
-    # set parameter from the GUI main dict and store them in a list
-    parameter_list = \
-        [GUI_main_dict[input_value] for input_value in input_value_list]
-
-    # set input_timseries_season value
-    input_value_season = \
-        [0 if GUI_main_dict[input_timeseries_season] == "None"
-         else GUI_main_dict[input_timeseries_season]]
-
-    # append input_timseries_season value and return
-    return parameter_list + input_value_season
-
-
-def run_SESMG(GUI_main_dict: dict,
-              model_definition: str,
-              save_path: str) -> None:
-    """
-        Function to run SESMG main based on the GUI input values dict.
-
-        :param GUI_main_dict: global defined dict of GUI input variables
-        :type GUI_main_dict: dict
-        :param model_definition: file path of the model definition to \
-            be optimized
-        :type model_definition: str
-        :param save_path: file path where the results will be saved
-        :type save_path: str
-    """
-
-    # prepare timeseries parameter list
-    timeseries_prep_parameter_list = \
-        ["input_timeseries_algorithm", "input_timeseries_cluster_index",
-         "input_timeseries_criterion", "input_timeseries_period"]
-
-    # create timeseries parameter list as an input variable for run_sesmg
-    timeseries_prep = create_timeseries_parameter_list(
-        GUI_main_dict=GUI_main_dict,
-        input_value_list=timeseries_prep_parameter_list,
-        input_timeseries_season="input_timeseries_season")
-
-    if not GUI_main_dict["input_activate_premodeling"]:
-
-        sesmg_main(
-            model_definition_file=model_definition,
-            result_path=save_path,
-            num_threads=GUI_main_dict["input_num_threads"],
-            timeseries_prep=timeseries_prep,
-            criterion_switch=GUI_main_dict["input_criterion_switch"],
-            xlsx_results=GUI_main_dict["input_xlsx_results"],
-            console_results=GUI_main_dict["input_console_results"],
-            solver=GUI_main_dict["input_solver"],
-            district_heating_path=GUI_main_dict["input_dh_folder"],
-            cluster_dh=GUI_main_dict["input_cluster_dh"])
-
-    # If pre-modeling is activated a second run will be carried out
-    else:
-
-        # prepare pre-model timeseries parameter list
-        timeseries_prep_parameter_list = \
-            ["input_premodeling_timeseries_algorithm",
-             "input_premodeling_timeseries_cluster_index",
-             "input_premodeling_timeseries_criterion",
-             "input_premodeling_timeseries_period"]
-
-        # create pre-model timeseries parameter list as an input variable
-        # for run_sesmg
-        premodel_timeseries_prep = create_timeseries_parameter_list(
-            GUI_main_dict=GUI_main_dict,
-            input_value_list=timeseries_prep_parameter_list,
-            input_timeseries_season="input_premodeling_timeseries_season")
-
-        sesmg_main_including_premodel(
-            model_definition_file=model_definition,
-            result_path=save_path,
-            num_threads=GUI_main_dict["input_num_threads"],
-            timeseries_prep=timeseries_prep,
-            criterion_switch=GUI_main_dict["input_criterion_switch"],
-            xlsx_results=GUI_main_dict["input_xlsx_results"],
-            console_results=GUI_main_dict["input_console_results"],
-            solver=GUI_main_dict["input_solver"],
-            district_heating_path=GUI_main_dict["input_dh_folder"],
-            cluster_dh=GUI_main_dict["input_cluster_dh"],
-            pre_model_timeseries_prep=premodel_timeseries_prep,
-            investment_boundaries=GUI_main_dict["input_premodeling_invest_boundaries"],
-            investment_boundary_factor=GUI_main_dict["input_premodeling_tightening_factor"],
-            graph=False)
-
-
-def run_SESMG_montecarlo(GUI_main_dict: dict,
-              model_definition: str
-              ) -> str:
-    """
-        Function to run a Monte Carlo simulation via SESMG main based on 
-        the GUI input values dict.
-
-        :param GUI_main_dict: global defined dict of GUI input variables
-        :type GUI_main_dict: dict
-        :param model_definition: file path of the model definition to \
-            be optimized
-        :type model_definition: str
-        :param save_path: file path where the results will be saved
-        :type save_path: str
-    """
-
-    
-    # creating a dictionary to store the 
-    # relevant parameters during the monte carlo runs
-    montecarlo_dict = {"costs": [], 
-                       "emissions": [], 
-                       "folder": [], 
-                       "current_run": 0, 
-                       "folder_number": 1, 
-                       "main_directory": "",
-                       "sub_directory": "",
-                       "folder_failed": []
-                      }
-        
-        
-    # sets the corresponding directory and the initial result folder number depending on
-    # whether a pareto run was performed in advance or not
-    if GUI_main_dict["montecarlo_with_pareto"]:
-        
-        directory = GUI_main_dict["res_path"]
-        montecarlo_dict["folder_number"] = 2
-        
-        
-    else:
-        directory = os.path.join(
-                        os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
-                        "results/" + datetime.now().strftime("%Y-%m-%d--%H-%M-%S"),
-                )
-        os.mkdir(directory)
-        
-    montecarlo_dict["main_directory"] = directory
-
-    
-    # set up the parameters for the following loop
-    montecarlo_section_runs = GUI_main_dict["input_montecarlo_number_of_runs"]
-    montecarlo_section = GUI_main_dict["input_montecarlo_section"]
-    total_runs_montecarlo = montecarlo_section_runs*10
-    
-    # selecting a seed in order to
-    # guarantee reproducibility of section runs
-    random.seed(1)
-    
-    # initialize the monte carlo loop
-    while montecarlo_dict["current_run"] < total_runs_montecarlo:
-        
-        
-        try:
-
-            # prepare timeseries parameter list
-            timeseries_prep_parameter_list = \
-                ["input_timeseries_algorithm", "input_timeseries_cluster_index",
-                 "input_timeseries_criterion", "input_timeseries_period"]
-
-            # create timeseries parameter list as an input variable for run_sesmg
-            timeseries_prep = create_timeseries_parameter_list(
-                GUI_main_dict=GUI_main_dict,
-                input_value_list=timeseries_prep_parameter_list,
-                input_timeseries_season="input_timeseries_season")
-
-            if not GUI_main_dict["input_activate_premodeling"]:
-                
-                
-                
-                # create separate folders to collect all runs
-                if montecarlo_dict["current_run"] >= montecarlo_section_runs * (montecarlo_section -1) and \
-                montecarlo_dict["current_run"] < montecarlo_section_runs * montecarlo_section:
-                      
-                    save_path = create_model_definition_save_folder(model_definition,
-                                                                directory, str(montecarlo_dict["folder_number"]))
-                    montecarlo_dict["sub_directory"] = save_path
-                    montecarlo_dict["folder_number"] +=1
-                    
-                else:
-
-                    save_path = directory
-           
-                # run current monte carlo sample
-                sesmg_main_montecarlo(
-                    model_definition_file=model_definition,
-                    result_path=save_path,
-                    num_threads=GUI_main_dict["input_num_threads"],
-                    timeseries_prep=timeseries_prep,
-                    criterion_switch=GUI_main_dict["input_criterion_switch"],
-                    xlsx_results=GUI_main_dict["input_xlsx_results"],
-                    console_results=GUI_main_dict["input_console_results"],
-                    solver=GUI_main_dict["input_solver"],
-                    district_heating_path=GUI_main_dict["input_dh_folder"],
-                    cluster_dh=GUI_main_dict["input_cluster_dh"],
-                    montecarlo_dict=montecarlo_dict, montecarlo_section_runs=montecarlo_section_runs,
-                    montecarlo_section=montecarlo_section)
-            
-                # save folder number of successfull runs
-                if montecarlo_dict["current_run"] >= montecarlo_section_runs * (montecarlo_section -1) and \
-                montecarlo_dict["current_run"] < montecarlo_section_runs * montecarlo_section:
-                    
-                    montecarlo_dict["folder"].append(montecarlo_dict["folder_number"] -1)
-            
-                # raise number of current run
-                montecarlo_dict["current_run"] +=1
-                
-                # append results of current run 
-                create_results.montecarlo_results(montecarlo_dict)
-                
-                
-
-            # If pre-modeling is activated an error message will occur
-            else:
-                
-                logging.info("   " + "Pre-modeling with monte carlo currently not supported.")
-                break
-
-        # if a run doesn't succeed its number will be saved
-        except:
-            
-            if montecarlo_dict["current_run"] >= montecarlo_section_runs * (montecarlo_section -1) and \
-                montecarlo_dict["current_run"] < montecarlo_section_runs * montecarlo_section:
-                
-                    montecarlo_dict["folder_failed"].append(montecarlo_dict["folder_number"] -1)
-                    
-            create_results.montecarlo_failed_runs(montecarlo_dict)
-            continue
-    
-    
-    # create a final csv of failed runs  
-    create_results.montecarlo_failed_runs(montecarlo_dict)
-    
-    
-    logging.info("   " + "Monte Carlo runs successfully completed.")
-    
-
-    return directory
-
-
 def read_markdown_document(document_path: str, folder_path: str,
                            main_page=True, fixed_image_width=None) -> list:
     """
@@ -519,6 +259,9 @@ def create_cluster_simplification_index(input_value: str,
 
     if input_output_dict[input_value] == "None":
         input_output_dict[input_value_index] = 0
+    # "auto" is the last option after "None" and the indices 1 to 8760
+    elif input_output_dict[input_value] == "auto":
+        input_output_dict[input_value_index] = 8761
     else:
         input_output_dict[input_value_index] = input_output_dict[input_value]
 
@@ -579,7 +322,8 @@ def identify_win_solver_path(path_list: list) -> str:
 
 def check_for_dependencies(solver: str):
     """
-        Checks rather Graphviz, CBC or gurobi are installed.
+        Checks rather Graphviz, CBC, gurobi or HiGHS (highspy) are
+        installed.
 
         :param solver: name of the solver chosen in the GUI sidebar
         :type document_path: str
@@ -616,6 +360,7 @@ def check_for_dependencies(solver: str):
     # Check if a solver is installed
     cbc_bool = False
     gurobi_bool = False
+    highs_bool = False
 
     # Check if the selected solver is "cbc"
     if solver == "cbc":
@@ -684,7 +429,12 @@ def check_for_dependencies(solver: str):
         # Append the Gurobi solver path to the system's PATH environment.
         os.environ["PATH"] += os.pathsep + gurobi_path_str
 
-    if not (cbc_bool or gurobi_bool):
+    # HiGHS is called in-process by its python interface highspy
+    elif solver == "highs":
+        import importlib.util
+        highs_bool = importlib.util.find_spec("highspy") is not None
+
+    if not (cbc_bool or gurobi_bool or highs_bool):
         raise ImportError("The selected solver can not be found on your \
                           device. Make sure that it is installed correctly. \
                           We recommend using CBC or gurobi. Check our \
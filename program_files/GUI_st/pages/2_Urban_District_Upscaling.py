@@ -57,6 +57,11 @@ def us_application() -> None:
             st.text_input(label="Type in your model definition file name.",
                           help=GUI_helper["udu_ti_model_def_name"])
 
+        # checkbox to aggregate identical buildings
+        input_aggregation = st.checkbox(
+            label="Aggregate identical buildings",
+            help=GUI_helper["udu_cb_aggregation"])
+
         # Submit button to start optimization.
         submitted_us_run = st.form_submit_button(
                 label="Start US Tool",
@@ -84,7 +89,8 @@ def us_application() -> None:
                     urban_district_upscaling_pre_processing(
                         paths=us_path_list,
                         clustering=False,
-                        clustering_dh=False)
+                        clustering_dh=False,
+                        aggregation=input_aggregation)
 
             # raise streamlit error message when an input element is missing
             else:
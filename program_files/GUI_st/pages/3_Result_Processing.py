@@ -4,6 +4,7 @@
     Janik Budde - janik.budde@fh-muenster.de
 """
 import glob
+import json
 import os
 import streamlit as st
 import pandas as pd
@@ -263,6 +264,34 @@ def short_result_interactive_dia(result_path_results: str) -> None:
     st.plotly_chart(fig, theme="streamlit", use_container_width=True)
 
 
+def short_result_run_profile(result_path_profile: str) -> None:
+    """
+        Function displaying the runtime and memory usage of the single
+        stages of the run.
+
+        :param result_path_profile: path to a result run_profile.json \
+            file
+        :type result_path_profile: str
+    """
+    # the profile is only available for runs of newer versions
+    if not os.path.exists(result_path_profile):
+        return
+    with open(result_path_profile, "r", encoding="utf-8") as infile:
+        run_profile = json.load(infile)
+    with st.expander("Run Profile"):
+        profile1, profile2 = st.columns(2)
+        profile1.metric(label="Total Runtime (s)",
+                        value=run_profile["total_wall_time"])
+        profile2.metric(label="Peak Memory (MB)",
+                        value=run_profile["peak_rss_mb"])
+        # table and bar chart of the single stages
+        profile_df = pd.DataFrame(run_profile["stages"])
+        st.dataframe(profile_df, use_container_width=True)
+        fig = px.bar(profile_df, x="stage", y="wall_time").update_layout(
+            xaxis_title="stage", yaxis_title="wall time (s)")
+        st.plotly_chart(fig, theme="streamlit", use_container_width=True)
+
+
 def create_energy_amounts_diagram(result_path_amounts: str) -> None:
     """
         Function to create energy amount diagrams in streamlit.
@@ -502,6 +531,10 @@ elif os.path.join(st.session_state["state_result_path"], "components.csv") \
     short_result_interactive_dia(
         result_path_results=st.session_state["state_result_path"]
         + "/results.csv")
+    # show runtime and memory usage of the single stages
+    short_result_run_profile(
+        result_path_profile=st.session_state["state_result_path"]
+        + "/run_profile.json")
 
 # check if components.csv is in the result folder. Loading result page \
 # elements for a pareto run if not.
@@ -557,6 +590,10 @@ elif os.path.join(st.session_state["state_result_path"], "components.csv") \
     short_result_interactive_dia(
         result_path_results=st.session_state["state_pareto_result_path"]
         + "/results.csv")
+    # show runtime and memory usage of the single stages
+    short_result_run_profile(
+        result_path_profile=st.session_state["state_pareto_result_path"]
+        + "/run_profile.json")
     # show energy system graph
     short_result_graph(
         result_path_graph=st.session_state["state_pareto_result_path"]
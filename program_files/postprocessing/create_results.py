@@ -14,8 +14,8 @@ from program_files.postprocessing.create_results_prepare_data \
     import prepare_data
 
 
-def xlsx(nodes_data: dict, optimization_model: solph.Model, filepath: str
-         ) -> None:
+def xlsx(nodes_data: dict, optimization_model: solph.Model, filepath: str,
+         results=None) -> None:
     """
         Returns model results as xlsx-files.
         Saves the in- and outgoing flows of every bus of a given,
@@ -24,12 +24,17 @@ def xlsx(nodes_data: dict, optimization_model: solph.Model, filepath: str
         :param nodes_data: dictionary containing data from excel \
             model definition file
         :type nodes_data: dict
-        :param optimization_model: optimized energy system
+        :param optimization_model: optimized energy system, may be \
+            None if the results are given
         :type optimization_model: oemof.solph.model
         :param filepath: path, where the results will be stored
         :type filepath: str
+        :param results: already processed main results of the \
+            optimization (e.g. restored from a checkpoint)
+        :type results: dict
     """
-    results = solph.processing.results(optimization_model)
+    if results is None:
+        results = solph.processing.results(optimization_model)
 
     # Writes a spreadsheet containing the input and output flows into
     # every bus of the energy system for every timestep of the
@@ -157,7 +162,9 @@ class Results:
         :param nodes_data: dictionary containing data from excel \
             model definition file
         :type nodes_data: dict
-        :param optimization_model: optimized energy system
+        :param optimization_model: optimized energy system. If None \
+            the main and meta results are taken from \
+            energy_system.results (e.g. restored from a checkpoint).
         :type optimization_model: oemof.solph.Model
         :param energy_system: original (unoptimized) energy system
         :type energy_system: oemof.solph.Energysystem
@@ -194,7 +201,12 @@ class Results:
         investments_to_be_made = {}
         # define class variables
         self.esys = energy_system
-        self.results = solph.processing.results(optimization_model)
+        if optimization_model is None:
+            self.results = energy_system.results["main"]
+            meta_results = energy_system.results["meta"]
+        else:
+            self.results = solph.processing.results(optimization_model)
+            meta_results = solph.processing.meta_results(optimization_model)
 
         # collect the energy system results which have to be extracted
         # from the component specific result object
@@ -217,8 +229,8 @@ class Results:
                          nodes_data=nodes_data)
         
         # SUMMARY
-        meta_results = solph.processing.meta_results(optimization_model)
         meta_results_objective = meta_results["objective"]
+        termination_condition, mip_gap = get_solver_status(meta_results)
 
         # Importing time system parameters from the model definition
         ts = next(nodes_data["energysystem"].iterrows())[1]
@@ -238,6 +250,8 @@ class Results:
                     round(total_periodical_costs, 2),
                     round(total_demand, 2),
                     round(total_usage, 2),
+                    termination_condition,
+                    mip_gap,
                 ]
             ],
             columns=[
@@ -250,6 +264,8 @@ class Results:
                 "Total Periodical Costs",
                 "Total Energy Demand",
                 "Total Energy Usage",
+                "Termination Condition",
+                "MIP Gap",
             ],
         )
 
@@ -264,6 +280,36 @@ class Results:
         logging.info("   " + "Successfully prepared results...")
 
 
+def get_solver_status(meta_results: dict) -> (str, float):
+    """
+        Returns the solver's termination condition and the relative
+        gap between the objective bounds reported by the solver, which
+        is greater than zero if the solver stopped at a MIP gap or time
+        limit.
+
+        :param meta_results: meta results of the optimization \
+            (oemof.solph.processing.meta_results)
+        :type meta_results: dict
+
+        :return: - **termination_condition** (str) - termination \
+            condition of the solver
+                 - **mip_gap** (float) - relative gap, None if the \
+            solver did not report both bounds
+    """
+    termination_condition = str(meta_results.get("solver", {}).get(
+        "Termination condition", "unknown"))
+    try:
+        lower_bound = float(meta_results["problem"]["Lower bound"])
+        upper_bound = float(meta_results["problem"]["Upper bound"])
+    except (KeyError, TypeError, ValueError):
+        return termination_condition, None
+    # infinite bounds are reported if the solver found no solution
+    if abs(lower_bound) == float("inf") or abs(upper_bound) == float("inf"):
+        return termination_condition, None
+    mip_gap = abs(upper_bound - lower_bound) / max(abs(upper_bound), 1e-10)
+    return termination_condition, round(mip_gap, 6)
+
+
 def montecarlo_results(montecarlo_dict: dict) -> None:
     """
         Function to create the results of a succeeded 
@@ -283,6 +329,8 @@ def montecarlo_results(montecarlo_dict: dict) -> None:
                                            "Emissions": montecarlo_dict["emissions"], 
                                            "Folder": montecarlo_dict["folder"]}, 
                                             columns=["Costs", "Emissions", "Folder"])
+    # runs solved in parallel finish in arbitrary order
+    df_costs_and_emissions = df_costs_and_emissions.sort_values("Folder")
     df_costs_and_emissions.to_csv(montecarlo_dict["main_directory"] + "/montecarlo.csv", 
                                   index=False)
     
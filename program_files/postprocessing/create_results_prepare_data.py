@@ -2,6 +2,7 @@
     Christian Klemm - christian.klemm@fh-muenster.de
     Gregor Becker - gregor.becker@fh-muenster.de
 """
+import numbers
 import pandas
 
 # columns_of_plotly_table
@@ -195,6 +196,58 @@ def prepare_loc(comp_dict: dict, df_result_table: pandas.DataFrame,
     )
 
 
+def disaggregate_components(df_list_of_components: pandas.DataFrame,
+                            nodes_data: dict) -> pandas.DataFrame:
+    """
+        Disaggregates the components of building subsystems which
+        represent several identical buildings (see the "aggregated
+        buildings" sheet created by the upscaling tool). The amounts,
+        capacities and costs of such a component are divided by the
+        number of represented buildings and a row is added for every
+        represented building by replacing the representative's label
+        prefix. Thus, the totals of the list of components are not
+        changed.
+
+        :param df_list_of_components: DataFrame containing the list of \
+            components which will be the components.csv afterwards
+        :type df_list_of_components: pandas.DataFrame
+        :param nodes_data: dictionary containing data from excel \
+                model definition file
+        :type nodes_data: dict
+
+        :return: - **df_list_of_components** (pandas.DataFrame) - \
+            DataFrame containing the disaggregated list of components
+    """
+    aggregated = nodes_data.get("aggregated buildings", pandas.DataFrame())
+    if aggregated.empty:
+        return df_list_of_components
+    groups = {str(row["label"]): str(row["buildings"]).split(",")
+              for num, row in aggregated.iterrows()}
+    # the longest matching prefix is used, if building labels begin
+    # with the label of another building
+    representatives = sorted(groups, key=len, reverse=True)
+
+    rows = []
+    for num, component in df_list_of_components.iterrows():
+        label = str(component["ID"])
+        representative = next(
+            (rep for rep in representatives if label.startswith(rep + "_")),
+            None)
+        if representative is None:
+            rows.append(component)
+            continue
+        buildings = groups[representative]
+        for building in buildings:
+            row = component.copy()
+            row["ID"] = building + label[len(representative):]
+            for column in copt[2:]:
+                # the maximum investment may be "---"
+                if isinstance(row[column], numbers.Number):
+                    row[column] = round(row[column] / len(buildings), 2)
+            rows.append(row)
+    return pandas.DataFrame(rows, columns=copt).reset_index(drop=True)
+
+
 def prepare_data(comp_dict: dict, total_demand: float, nodes_data: dict
                  ) -> (pandas.DataFrame, float, float, float, pandas.DataFrame,
                        float):
@@ -263,6 +316,9 @@ def prepare_data(comp_dict: dict, total_demand: float, nodes_data: dict
     ) = prepare_loc(comp_dict=comp_dict,
                     df_result_table=df_result_table,
                     df_list_of_components=df_list_of_components)
+    # split the components of aggregated identical buildings
+    df_list_of_components = disaggregate_components(
+        df_list_of_components=df_list_of_components, nodes_data=nodes_data)
     return (
         df_list_of_components,
         total_periodical_costs,
@@ -56,7 +56,10 @@ def get_dataframe_from_nodes_data(nodes_data: dict) -> pandas.DataFrame:
             "weather data",
             "district heating",
             "competition constraints",
-            "pipe types"
+            "pipe types",
+            "aggregated buildings",
+            "typical periods",
+            "segments"
         ]:
             nodes_data[key].set_index("label", inplace=True, drop=False)
             if counter == 0:
@@ -13,16 +13,33 @@
 """
 import logging
 from oemof.tools import logger
+from oemof import solph
 import os
+import shutil
+from datetime import datetime
 from threading import *
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing
 from program_files.preprocessing import (create_energy_system,
                                          data_preparation,
-                                         pareto_optimization)
+                                         pareto_optimization,
+                                         model_definition_presolve,
+                                         investment_bounds,
+                                         fixed_investments)
 from program_files.preprocessing.components import (
     district_heating, Bus, Source, Sink, Transformer, Storage, Link)
+from program_files.preprocessing.data_preparation import SEGMENTS_SHEET, \
+    TYPICAL_PERIODS_SHEET
+from program_files.preprocessing.data_preparation_algorithms.segmentation \
+    import expand_segmented_results
 from program_files.preprocessing.create_graph import ESGraphRenderer
 from program_files.postprocessing import create_results
-from program_files.processing import optimize_model
+from program_files.preprocessing.pareto_optimization import \
+    create_model_definition_save_folder
+from program_files.processing import optimize_model, checkpoint
+from program_files.processing.model_statistics import save_model_statistics
+from program_files.processing.run_profile import RunProfile
+from program_files.processing.solver_options import read_solver_options
 from program_files.preprocessing.pre_model_analysis import \
     update_model_according_pre_model_results
 
@@ -30,7 +47,10 @@ from program_files.preprocessing.pre_model_analysis import \
 def sesmg_main(model_definition_file: str, result_path: str, num_threads: int,
                criterion_switch: bool, xlsx_results: bool,
                console_results: bool, timeseries_prep: list, solver: str,
-               cluster_dh, graph=False, district_heating_path=None) -> None:
+               cluster_dh, graph=False, district_heating_path=None,
+               resume=False, solver_options=None, dry_run=False,
+               presolve=False, tighten_bounds=False, checkpoints=False
+               ) -> None:
     """
         Main function of the Spreadsheet System Model Generator
 
@@ -68,14 +88,167 @@ def sesmg_main(model_definition_file: str, result_path: str, num_threads: int,
         :param district_heating_path: path to the folder where already \
             calculated district heating data is stored
         :type district_heating_path: str['folder']
+        :param resume: if True the run is resumed from the last \
+            completed stage stored within the result path (see \
+            processing/checkpoint.py), the checkpoints are updated
+        :type resume: bool
+        :param solver_options: solver options (mip gap, time limit, \
+            ...) overwriting the ones of the model definition (see \
+            processing/solver_options.py)
+        :type solver_options: dict
+        :param dry_run: if True the model is built and its statistics \
+            (model_statistics.json) are stored without solving it
+        :type dry_run: bool
+        :param presolve: if True zero capacity and unreachable \
+            components are deactivated before the energy system is \
+            built (see preprocessing/model_definition_presolve.py)
+        :type presolve: bool
+        :param tighten_bounds: if True the maximum investment \
+            capacities are tightened before the model is built (see \
+            preprocessing/investment_bounds.py)
+        :type tighten_bounds: bool
+        :param checkpoints: if True the prepared model definition and \
+            the optimized energy system are stored to resume the run \
+            or to repeat its postprocessing (see \
+            processing/checkpoint.py)
+        :type checkpoints: bool
     """
     # sets number of threads for numpy
     os.environ['NUMEXPR_NUM_THREADS'] = str(num_threads)
     # defines a logging file
     logger.define_logging(logpath=result_path)
+    # collects the runtime and memory usage of the single stages
+    profile = RunProfile()
+    try:
+        run_sesmg_stages(
+            model_definition_file=model_definition_file,
+            result_path=result_path, num_threads=num_threads,
+            criterion_switch=criterion_switch, xlsx_results=xlsx_results,
+            console_results=console_results, timeseries_prep=timeseries_prep,
+            solver=solver, cluster_dh=cluster_dh, graph=graph,
+            district_heating_path=district_heating_path, resume=resume,
+            profile=profile, solver_options=solver_options,
+            dry_run=dry_run, presolve=presolve,
+            tighten_bounds=tighten_bounds, checkpoints=checkpoints)
+    finally:
+        # the profile is also stored if a stage failed
+        profile.save(result_path=result_path)
+
+    logging.info('\t ' + 56 * '-')
+    if dry_run:
+        logging.info('\t Dry run successfully completed!')
+    else:
+        logging.info('\t Modelling and optimization successfully completed!')
+
+
+def run_sesmg_stages(model_definition_file: str, result_path: str,
+                     num_threads: int, criterion_switch: bool,
+                     xlsx_results: bool, console_results: bool,
+                     timeseries_prep: list, solver: str, cluster_dh,
+                     graph: bool, district_heating_path, resume: bool,
+                     profile: RunProfile, solver_options=None,
+                     dry_run=False, presolve=False, tighten_bounds=False,
+                     checkpoints=False) -> None:
+    """
+        Executes the stages of sesmg_main (import, timeseries
+        preparation, model creation and optimization, postprocessing).
+        The parameters equal the ones of sesmg_main.
+
+        :param profile: profile collecting the runtime and memory \
+            usage of the single stages
+        :type profile: RunProfile
+    """
+    # determine the last completed stage if the run is resumed
+    checkpoint_key = checkpoint.create_checkpoint_key(
+        model_definition_file=model_definition_file,
+        timeseries_prep=timeseries_prep,
+        criterion_switch=criterion_switch,
+        presolve=presolve, tighten_bounds=tighten_bounds,
+        cluster_dh=cluster_dh, district_heating_path=district_heating_path,
+        solver=solver, solver_options=solver_options)
+    # a resumed run updates its checkpoints
+    checkpoints = checkpoints or resume
+    stage = "none"
+    if resume:
+        stage = checkpoint.load_checkpoint_stage(result_path=result_path,
+                                                 key=checkpoint_key)
+        logging.info("\t Resuming run, last completed stage: " + stage)
+
+    if stage == "none":
+        nodes_data = prepare_model_definition(
+            model_definition_file=model_definition_file,
+            result_path=result_path, timeseries_prep=timeseries_prep,
+            criterion_switch=criterion_switch, presolve=presolve,
+            profile=profile)
+
+        # store the prepared model definition
+        if checkpoints:
+            with profile.stage("checkpoint (prepared)"):
+                checkpoint.save_prepared_nodes_data(
+                    result_path=result_path, key=checkpoint_key,
+                    nodes_data=nodes_data)
+    else:
+        nodes_data = checkpoint.load_prepared_nodes_data(
+            result_path=result_path)
+
+    if dry_run:
+        # builds the model and stores its statistics without solving it
+        create_and_solve_energy_system(
+            nodes_data=nodes_data, result_path=result_path,
+            num_threads=num_threads, solver=solver, cluster_dh=cluster_dh,
+            graph=graph, district_heating_path=district_heating_path,
+            profile=profile, solver_options=solver_options, dry_run=True,
+            tighten_bounds=tighten_bounds)
+        return
+
+    if stage != "solved":
+        # creates and optimizes the energy system
+        esys = create_and_solve_energy_system(
+            nodes_data=nodes_data, result_path=result_path,
+            num_threads=num_threads, solver=solver, cluster_dh=cluster_dh,
+            graph=graph, district_heating_path=district_heating_path,
+            profile=profile, solver_options=solver_options,
+            tighten_bounds=tighten_bounds)
+
+        # store the optimization results
+        if checkpoints:
+            with profile.stage("checkpoint (solved)"):
+                checkpoint.save_solved_energy_system(
+                    result_path=result_path, key=checkpoint_key,
+                    energy_system=esys)
+    else:
+        esys = checkpoint.load_solved_energy_system(result_path=result_path)
+
+    # shows and saves the results of the optimized model
+    sesmg_postprocessing(
+        nodes_data=nodes_data, energy_system=esys, result_path=result_path,
+        xlsx_results=xlsx_results, console_results=console_results,
+        cluster_dh=cluster_dh, profile=profile)
+
+
+def prepare_model_definition(model_definition_file: str, result_path: str,
+                             timeseries_prep: list, criterion_switch: bool,
+                             presolve=False, profile=None) -> dict:
+    """
+        Imports the model definition and prepares it for the creation
+        of the energy system: switches the optimization criteria if
+        requested, deactivates the components which can not affect the
+        optimum (presolve) and simplifies the timeseries. The
+        parameters equal the ones of sesmg_main.
+
+        :param profile: profile collecting the runtime and memory \
+            usage of the single stages
+        :type profile: RunProfile
+
+        :return: - **nodes_data** (dict) - prepared nodes data
+    """
+    if profile is None:
+        profile = RunProfile()
+
     # imports data from the excel file and returns it as a dictionary
-    nodes_data = create_energy_system.import_model_definition(
-        filepath=model_definition_file)
+    with profile.stage("import"):
+        nodes_data = create_energy_system.import_model_definition(
+            filepath=model_definition_file)
 
     # if the user has chosen two switch the optimization criteria the
     # nodes data dict is adapted
@@ -83,14 +256,161 @@ def sesmg_main(model_definition_file: str, result_path: str, num_threads: int,
         pareto_optimization.change_optimization_criterion(
                 nodes_data=nodes_data)
 
+    # deactivates the components which can not affect the optimum
+    if presolve:
+        with profile.stage("presolve"):
+            model_definition_presolve.presolve_model_definition(
+                nodes_data=nodes_data)
+
     # Timeseries Preprocessing
-    data_preparation.timeseries_preparation(
-        timeseries_prep_param=timeseries_prep,
-        nodes_data=nodes_data,
+    with profile.stage("timeseries preparation"):
+        data_preparation.timeseries_preparation(
+            timeseries_prep_param=timeseries_prep,
+            nodes_data=nodes_data,
+            result_path=result_path)
+    return nodes_data
+
+
+def create_and_solve_energy_system(nodes_data: dict, result_path: str,
+                                   num_threads: int, solver: str, cluster_dh,
+                                   graph=False, district_heating_path=None,
+                                   profile=None, solver_options=None,
+                                   dry_run=False, tighten_bounds=False,
+                                   fix_investments=False
+                                   ) -> solph.EnergySystem:
+    """
+        Creates the energy system's components of the prepared nodes
+        data, tightens the maximum investment capacities if
+        tighten_bounds is True (investment_bounds.csv), stores the
+        statistics of the model (model_statistics.json), optimizes the
+        energy system and stores the main and meta results within
+        energy_system.results. The parameters equal the ones of
+        sesmg_main.
+
+        :param profile: profile collecting the runtime and memory \
+            usage of the single stages, if None the stages are not \
+            stored
+        :type profile: RunProfile
+        :param fix_investments: if True the investments whose minimum \
+            equals their maximum are built as fixed capacities (see \
+            preprocessing/fixed_investments.py)
+        :type fix_investments: bool
+
+        :return: - **esys** (oemof.solph.EnergySystem) - optimized \
+            energy system holding its results, None in case of a dry \
+            run
+    """
+    if profile is None:
+        profile = RunProfile()
+
+    esys, busd = create_energy_system_components(
+        nodes_data=nodes_data, result_path=result_path,
+        cluster_dh=cluster_dh, graph=graph,
+        district_heating_path=district_heating_path, profile=profile)
+
+    # builds the investments with a fixed capacity as dispatch flows
+    if fix_investments:
+        with profile.stage("fixed investments"):
+            fixed_investments.save_fixed_investments(energy_system=esys)
+    
+    # clips the maximum investment capacities to the usable capacity
+    tightened = {}
+    if tighten_bounds:
+        with profile.stage("investment bounds"):
+            tightened = investment_bounds.save_investment_bounds(
+                energy_system=esys, result_path=result_path)
+
+    # creates the least cost model including the custom constraints
+    om = optimize_model.create_model(energy_system=esys,
+                                     nodes_data=nodes_data, busd=busd,
+                                     profile=profile)
+    # the results report the model definition's maximum capacities
+    investment_bounds.restore_investment_bounds(energy_system=esys,
+                                                tightened=tightened)
+    with profile.stage("model statistics"):
+        save_model_statistics(om=om, result_path=result_path)
+    if dry_run:
+        return None
+
+    # optimizes the energysystem
+    optimize_model.solve_model(
+        om=om, solver=solver, num_threads=num_threads, profile=profile,
+        solver_options=read_solver_options(nodes_data=nodes_data,
+                                           solver_options=solver_options),
         result_path=result_path)
 
-    if timeseries_prep[0] != 'none':
-        model_definition_file = result_path + "/modified_model_definition.xlsx"
+    extract_results(om=om, energy_system=esys, nodes_data=nodes_data,
+                    profile=profile, fix_investments=fix_investments)
+
+    return esys
+
+
+def extract_results(om: solph.Model, energy_system: solph.EnergySystem,
+                    nodes_data: dict, profile=None, fix_investments=False
+                    ) -> None:
+    """
+        Extracts the main and meta results of the solved model once
+        into energy_system.results, since they are used by the whole
+        postprocessing, and converts them into the form expected by
+        the postprocessing.
+
+        :param om: solved oemof model
+        :type om: oemof.solph.Model
+        :param energy_system: energy system of the model, changed in \
+            place
+        :type energy_system: oemof.solph.EnergySystem
+        :param nodes_data: prepared nodes data of the model
+        :type nodes_data: dict
+        :param profile: profile collecting the runtime and memory \
+            usage of the result extraction
+        :type profile: RunProfile
+        :param fix_investments: if True the energy system's fixed \
+            capacities are restored as investments
+        :type fix_investments: bool
+    """
+    if profile is None:
+        profile = RunProfile()
+
+    with profile.stage("result extraction"):
+        energy_system.results["main"] = solph.processing.results(om)
+        energy_system.results["meta"] = solph.processing.meta_results(om)
+        # the postprocessing expects the fixed capacities as
+        # investments
+        if fix_investments:
+            fixed_investments.restore_fixed_investments(
+                energy_system=energy_system,
+                results=energy_system.results["main"])
+        # the postprocessing expects the results of the original
+        # timesteps instead of the segments
+        if SEGMENTS_SHEET in nodes_data:
+            expand_segmented_results(energy_system=energy_system,
+                                     nodes_data=nodes_data)
+        # and the results of the real periods instead of the typical
+        # periods
+        if TYPICAL_PERIODS_SHEET in nodes_data:
+            data_preparation.expand_typical_period_results(
+                energy_system=energy_system, nodes_data=nodes_data)
+
+
+def create_energy_system_components(nodes_data: dict, result_path: str,
+                                    cluster_dh, graph=False,
+                                    district_heating_path=None, profile=None
+                                    ) -> (solph.EnergySystem, dict):
+    """
+        Creates the energy system and its components of the prepared
+        nodes data. The parameters equal the ones of sesmg_main.
+
+        :param profile: profile collecting the runtime and memory \
+            usage of the single stages
+        :type profile: RunProfile
+
+        :return: - **esys** (oemof.solph.EnergySystem) - energy \
+            system holding all components
+                 - **busd** (dict) - dictionary containing the buses \
+            of the energy system
+    """
+    if profile is None:
+        profile = RunProfile()
 
     # created an energysystem as defined in the model definition file
     esys = create_energy_system.define_energy_system(nodes_data=nodes_data)
@@ -100,30 +420,43 @@ def sesmg_main(model_definition_file: str, result_path: str, num_threads: int,
 
     # creates bus objects, excess sinks, and shortage sources as defined
     # in the model definition file
-    busd = Bus.buses(nodes_data=nodes_data, nodes=nodes)
+    busd = profile.call("Buses", Bus.buses, nodes_data, nodes)
     
     # PARALLEL CREATION OF ALL OBJECTS OF THE MODEL DEFINITION FILE
+    # every thread is measured as a stage of its own
 
     # creates source objects as defined in the model definition file and
     # adds them to the list of components (nodes)
-    thread1 = Thread(target=Source.Sources, args=(nodes_data, nodes, busd))
+    thread1 = Thread(target=profile.call,
+                     args=("Sources", Source.Sources, nodes_data, nodes,
+                           busd),
+                     kwargs={"thread": True})
     thread1.start()
     # created sink objects as defined in the model definition file and
     # adds them to the list of components (nodes)
-    thread2 = Thread(target=Sink.Sinks, args=(nodes_data, busd, nodes))
+    thread2 = Thread(target=profile.call,
+                     args=("Sinks", Sink.Sinks, nodes_data, busd, nodes),
+                     kwargs={"thread": True})
     thread2.start()
     # creates transformer objects as defined in the model definition
     # file and adds them to the list of components (nodes)
-    thread3 = Thread(target=Transformer.Transformers,
-                     args=(nodes_data, nodes, busd))
+    thread3 = Thread(target=profile.call,
+                     args=("Transformers", Transformer.Transformers,
+                           nodes_data, nodes, busd),
+                     kwargs={"thread": True})
     thread3.start()
     # creates storage objects as defined in the model definition file
     # and adds them to the list of components (nodes)
-    thread4 = Thread(target=Storage.Storages, args=(nodes_data, nodes, busd))
+    thread4 = Thread(target=profile.call,
+                     args=("Storages", Storage.Storages, nodes_data, nodes,
+                           busd),
+                     kwargs={"thread": True})
     thread4.start()
     # creates link objects as defined in the model definition file and
     # adds them to the list of components (nodes)
-    thread5 = Thread(target=Link.Links, args=(nodes_data, nodes, busd))
+    thread5 = Thread(target=profile.call,
+                     args=("Links", Link.Links, nodes_data, nodes, busd),
+                     kwargs={"thread": True})
     thread5.start()
 
     # wait until the threads have done their tasks
@@ -137,39 +470,214 @@ def sesmg_main(model_definition_file: str, result_path: str, num_threads: int,
         "district heating conn."].isin(["0", 0])]) > 0:
         # creates the thermal network components as defined in the model
         # definition file and adds them to the list of components (nodes)
-        nodes = district_heating.district_heating(
-            nodes_data=nodes_data, nodes=nodes, busd=busd,
-            district_heating_path=district_heating_path,
-            result_path=result_path, cluster_dh=cluster_dh,
-            anergy_or_exergy=False)
+        with profile.stage("district heating"):
+            nodes = district_heating.district_heating(
+                nodes_data=nodes_data, nodes=nodes, busd=busd,
+                district_heating_path=district_heating_path,
+                result_path=result_path, cluster_dh=cluster_dh,
+                anergy_or_exergy=False)
     
     # adds the created components to the energy system created in the
     # beginning of this method
     esys.add(*nodes)
     
     # creates the energy system graph
-    ESGraphRenderer(energy_system=esys, filepath=result_path, view=graph,
-                    legend=True)
-    
-    # optimizes the energysystem and returns the optimized energy system
-    om = optimize_model.least_cost_model(
-        energy_system=esys, num_threads=num_threads, nodes_data=nodes_data,
-        busd=busd, solver=solver
-    )
+    with profile.stage("energy system graph"):
+        ESGraphRenderer(energy_system=esys, filepath=result_path, view=graph,
+                        legend=True)
+
+    return esys, busd
+
+
+def sesmg_postprocessing(nodes_data: dict, energy_system: solph.EnergySystem,
+                         result_path: str, xlsx_results: bool,
+                         console_results: bool, cluster_dh, profile=None
+                         ) -> None:
+    """
+        Creates the result files (components.csv, results.csv,
+        summary.csv and optionally the bus flow spreadsheets) of an
+        optimized energy system. The parameters equal the ones of
+        sesmg_main.
+
+        :param energy_system: optimized energy system holding its \
+            main and meta results
+        :type energy_system: oemof.solph.EnergySystem
+        :param profile: profile collecting the runtime and memory \
+            usage of the single stages
+        :type profile: RunProfile
+    """
+    if profile is None:
+        profile = RunProfile()
 
     # shows and saves results iof the optimized model / postprocessing
     if xlsx_results:
-        create_results.xlsx(nodes_data=nodes_data, optimization_model=om,
-                            filepath=result_path)
+        with profile.stage("xlsx writing"):
+            create_results.xlsx(nodes_data=nodes_data,
+                                optimization_model=None,
+                                filepath=result_path,
+                                results=energy_system.results["main"])
         
     # creates the data used for the results presentation in the GUI
-    create_results.Results(
-        nodes_data=nodes_data, optimization_model=om, energy_system=esys,
-        result_path=result_path, console_log=console_results,
-        cluster_dh=cluster_dh)
+    with profile.stage("result writing"):
+        create_results.Results(
+            nodes_data=nodes_data, optimization_model=None,
+            energy_system=energy_system, result_path=result_path,
+            console_log=console_results, cluster_dh=cluster_dh)
+
+
+def sesmg_main_pareto_sweep(model_definition_file: str, result_paths: dict,
+                            constraints: dict, num_threads: int,
+                            criterion_switch: bool, xlsx_results: bool,
+                            console_results: bool, timeseries_prep: list,
+                            solver: str, cluster_dh,
+                            district_heating_path=None, solver_options=None,
+                            presolve=False, tighten_bounds=False) -> None:
+    """
+        Solves the semi optimal points of a pareto optimization
+        within one persistent model. The model of the first
+        optimization criterion including the second criterion limit is
+        built once, afterwards only the limit is updated
+        (optimize_model.update_second_criterion_limit) and the model
+        is solved again. The points are solved in the order of their
+        tightening limit, thus every solve starts from the solution of
+        the previous point if the solver supports it (persistent
+        solver interface or warm start). The remaining parameters
+        equal the ones of sesmg_main.
+
+        :param result_paths: dictionary holding the result folder of \
+            every pareto point (str(limit) as key)
+        :type result_paths: dict
+        :param constraints: dictionary holding the second criterion \
+            limit of every pareto point (str(limit) as key)
+        :type constraints: dict
+    """
+    # the points are solved from the loosest to the tightest limit
+    limits = sorted(result_paths, key=float)
+    # the model is built within the folder of the first point
+    build_path = result_paths[limits[0]]
+    os.environ['NUMEXPR_NUM_THREADS'] = str(num_threads)
+    logger.define_logging(logpath=build_path)
+    # the stages of the shared model building are stored once, every
+    # point stores the stages of its own solve and postprocessing
+    profile = RunProfile()
+
+    nodes_data = prepare_model_definition(
+        model_definition_file=model_definition_file, result_path=build_path,
+        timeseries_prep=timeseries_prep, criterion_switch=criterion_switch,
+        presolve=presolve, profile=profile)
+    # the second criterion constraint is created with the limit of the
+    # first point, the limit refers to the second criterion after the
+    # criteria were switched
+    nodes_data["energysystem"]["constraint cost limit"] = \
+        float(constraints[limits[0]])
+
+    esys, busd = create_energy_system_components(
+        nodes_data=nodes_data, result_path=build_path,
+        cluster_dh=cluster_dh, district_heating_path=district_heating_path,
+        profile=profile)
+    # files created during the model building (e.g. the thermal network
+    # data) are needed within the result folder of every point
+    build_files = [file for file in os.listdir(build_path)
+                   if os.path.isfile(os.path.join(build_path, file))
+                   and not file.endswith(".log")]
+    # the tightened bounds do not depend on the second criterion limit
+    tightened = {}
+    if tighten_bounds:
+        with profile.stage("investment bounds"):
+            tightened = investment_bounds.save_investment_bounds(
+                energy_system=esys, result_path=build_path)
+            build_files.append("investment_bounds.csv")
+
+    om = optimize_model.create_model(energy_system=esys,
+                                     nodes_data=nodes_data, busd=busd,
+                                     profile=profile)
+    # the results report the model definition's maximum capacities
+    investment_bounds.restore_investment_bounds(energy_system=esys,
+                                                tightened=tightened)
+    with profile.stage("model statistics"):
+        save_model_statistics(om=om, result_path=build_path)
+    solver_options = read_solver_options(
+        nodes_data=nodes_data, solver_options=solver_options)
+    persistent_solver = optimize_model.create_persistent_solver(
+        om=om, solver=solver, num_threads=num_threads,
+        solver_options=solver_options)
+    if persistent_solver is None:
+        logging.info("\t No persistent interface available for "
+                     + solver + ", the built model is re-solved.")
+    # the result extraction expands the time index of segmented and
+    # typical period models, the results of every point are extracted
+    # with the model's time index
+    timeindex, timeincrement = esys.timeindex, esys.timeincrement
+    profile.save(result_path=build_path, file_name="build_profile.json")
+
+    for number, limit in enumerate(limits):
+        result_path = result_paths[limit]
+        logging.info("\t " + 56 * "-")
+        logging.info("\t Pareto point " + limit + ": second criterion limit "
+                     + str(constraints[limit]))
+        for file in build_files:
+            if result_path != build_path:
+                shutil.copy(os.path.join(build_path, file), result_path)
+
+        profile = RunProfile()
+        optimize_model.update_second_criterion_limit(
+            om=om, limit=float(constraints[limit]),
+            persistent_solver=persistent_solver)
+        optimize_model.solve_model(
+            om=om, solver=solver, num_threads=num_threads, profile=profile,
+            warmstart=number > 0 and solver in ["cbc", "gurobi"],
+            persistent_solver=persistent_solver,
+            solver_options=solver_options, result_path=result_path)
+
+        esys.timeindex, esys.timeincrement = timeindex, timeincrement
+        extract_results(om=om, energy_system=esys, nodes_data=nodes_data,
+                        profile=profile)
+
+        sesmg_postprocessing(
+            nodes_data=nodes_data, energy_system=esys,
+            result_path=result_path, xlsx_results=xlsx_results,
+            console_results=console_results, cluster_dh=cluster_dh,
+            profile=profile)
+        profile.save(result_path=result_path)
 
     logging.info('\t ' + 56 * '-')
-    logging.info('\t Modelling and optimization successfully completed!')
+    logging.info('\t Pareto sweep successfully completed!')
+
+
+def rerun_postprocessing(result_path: str, xlsx_results=False,
+                         console_results=False, cluster_dh=False) -> None:
+    """
+        Re-executes the postprocessing of a finished (or after the
+        optimization failed) run against the solution stored within
+        its result folder, without solving the model again.
+
+        :param result_path: path of the run's result folder
+        :type result_path: str
+        :param xlsx_results: boolean which decides rather a flow \
+            Spreadsheet will be created for each bus
+        :type xlsx_results: bool
+        :param console_results: boolean which decides rather the \
+            results will be logged in the console
+        :type console_results: bool
+        :param cluster_dh: boolean which decides rather the thermal \
+            network was spatially clustered or not
+        :type cluster_dh: bool
+
+        :raises: - **FileNotFoundError** - no solution stored within \
+            the result folder
+    """
+    # defines a logging file
+    logger.define_logging(logpath=result_path)
+
+    sesmg_postprocessing(
+        nodes_data=checkpoint.load_prepared_nodes_data(
+            result_path=result_path),
+        energy_system=checkpoint.load_solved_energy_system(
+            result_path=result_path),
+        result_path=result_path, xlsx_results=xlsx_results,
+        console_results=console_results, cluster_dh=cluster_dh)
+
+    logging.info('\t Postprocessing successfully completed!')
 
 
 def sesmg_main_including_premodel(
@@ -178,7 +686,8 @@ def sesmg_main_including_premodel(
         console_results: bool, timeseries_prep: list, solver: str,
         cluster_dh, pre_model_timeseries_prep: list,
         investment_boundaries: bool, investment_boundary_factor: int,
-        district_heating_path=None) -> None:
+        district_heating_path=None, solver_options=None,
+        presolve=False, tighten_bounds=False) -> None:
     """
          This method solves the specified model definition file is
          solved twice. First with the pre-model time series preparatory
@@ -235,6 +744,13 @@ def sesmg_main_including_premodel(
         :param district_heating_path: path to the folder where already \
             calculated district heating data is stored
         :type district_heating_path: str['folder']
+        :param solver_options: solver options overwriting the ones of \
+            the model definition (see processing/solver_options.py)
+        :type solver_options: dict
+        :param presolve: see sesmg_main
+        :type presolve: bool
+        :param tighten_bounds: see sesmg_main
+        :type tighten_bounds: bool
     """
     # Create Sub-Folders in the results-repository
     os.mkdir(result_path + str('/pre_model'))
@@ -256,7 +772,10 @@ def sesmg_main_including_premodel(
         console_results=console_results,
         solver=solver,
         district_heating_path=district_heating_path,
-        cluster_dh=cluster_dh)
+        cluster_dh=cluster_dh,
+        solver_options=solver_options,
+        presolve=presolve,
+        tighten_bounds=tighten_bounds)
 
     # create updated model definition for main-modeling run
     logging.info('UPDATING DATA BASED ON PRE-MODEL RESULTS')
@@ -281,16 +800,33 @@ def sesmg_main_including_premodel(
         console_results=console_results,
         solver=solver,
         district_heating_path=district_heating_path,
-        cluster_dh=cluster_dh)
+        cluster_dh=cluster_dh,
+        solver_options=solver_options,
+        presolve=presolve,
+        tighten_bounds=tighten_bounds)
 
 
-def sesmg_main_montecarlo(model_definition_file: str, result_path: str, num_threads: int,
+def sesmg_main_montecarlo(result_path: str, num_threads: int,
                criterion_switch: bool, xlsx_results: bool,
                console_results: bool, timeseries_prep: list, solver: str,
-               montecarlo_dict: dict, montecarlo_section_runs: int, montecarlo_section: int,
-               cluster_dh, graph=False, district_heating_path=None) -> None:
+               nodes_data_template: dict, current_run: int, cluster_dh,
+               seed=1, graph=False, district_heating_path=None,
+               solver_options=None, presolve=False, tighten_bounds=False
+               ) -> None:
     """
-        Main function to run the Monte Carlo Simulation.
+        Main function to run a single run of the Monte Carlo
+        Simulation. The parameters equal the ones of sesmg_main, the
+        model definition is given by nodes_data_template instead of
+        its file path.
+
+        :param nodes_data_template: nodes data of the base model \
+            definition which is imported once per Monte Carlo campaign
+        :type nodes_data_template: dict
+        :param current_run: index of the Monte Carlo run which \
+            determines the random parameter variation
+        :type current_run: int
+        :param seed: seed of the Monte Carlo campaign
+        :type seed: int
 
         [...]
     """
@@ -300,18 +836,11 @@ def sesmg_main_montecarlo(model_definition_file: str, result_path: str, num_thre
     # defines a logging file
     logger.define_logging(logpath=result_path)
     
-    # imports the excel sheets, inserts random numbers and saves
-    # the modified model definition
-    nodes_data = create_energy_system.import_model_definition_montecarlo(
-        current_run=montecarlo_dict["current_run"], montecarlo_section_runs=montecarlo_section_runs,
-        montecarlo_section=montecarlo_section,
-        filepath=model_definition_file, result_path=result_path)
-    
-    # skips runs according
-    # to selected section
-    if nodes_data=={}:
-        return None
-    
+    # inserts random numbers into the imported model definition and
+    # saves the modified parameters
+    nodes_data = create_energy_system.create_montecarlo_nodes_data(
+        nodes_data_template=nodes_data_template, current_run=current_run,
+        result_path=result_path, seed=seed)
     
     # if the user has chosen two switch the optimization criteria the
     # nodes data dict is adapted
@@ -319,90 +848,356 @@ def sesmg_main_montecarlo(model_definition_file: str, result_path: str, num_thre
         pareto_optimization.change_optimization_criterion(
                 nodes_data=nodes_data)
 
+    # deactivates the components which can not affect the optimum,
+    # e.g. components whose drawn capacity is zero
+    if presolve:
+        model_definition_presolve.presolve_model_definition(
+            nodes_data=nodes_data)
+
     # Timeseries Preprocessing
     data_preparation.timeseries_preparation(
         timeseries_prep_param=timeseries_prep,
         nodes_data=nodes_data,
         result_path=result_path)
 
-    if timeseries_prep[0] != 'none':
-        model_definition_file = result_path + "/modified_model_definition.xlsx"
+    # creates and optimizes the energy system, the drawn capacities
+    # are built as fixed capacities, thus each run is a dispatch
+    # problem
+    esys = create_and_solve_energy_system(
+        nodes_data=nodes_data, result_path=result_path,
+        num_threads=num_threads, solver=solver, cluster_dh=cluster_dh,
+        graph=graph, district_heating_path=district_heating_path,
+        solver_options=solver_options, tighten_bounds=tighten_bounds,
+        fix_investments=True)
 
-    # created an energysystem as defined in the model definition file
-    esys = create_energy_system.define_energy_system(nodes_data=nodes_data)
+    # shows and saves the results of the optimized model
+    sesmg_postprocessing(
+        nodes_data=nodes_data, energy_system=esys, result_path=result_path,
+        xlsx_results=xlsx_results, console_results=console_results,
+        cluster_dh=cluster_dh)
 
-    # creates a list where the created components will be stored
-    nodes = []
+    logging.info('\t ' + 56 * '-')
+    logging.info('\t Modelling and optimization successfully completed!') 
 
-    # creates bus objects, excess sinks, and shortage sources as defined
-    # in the model definition file
-    busd = Bus.buses(nodes_data=nodes_data, nodes=nodes)
 
-    # PARALLEL CREATION OF ALL OBJECTS OF THE MODEL DEFINITION FILE
+def create_timeseries_parameter_list(GUI_main_dict: dict,
+                                     input_value_list: list,
+                                     input_timeseries_season: str,
+                                     input_timeseries_weights=
+                                     "input_timeseries_cluster_weights",
+                                     input_timeseries_tolerance=
+                                     "input_timeseries_error_tolerance"
+                                     ) -> list:
+    """
+        Creates list of input variables as input preparation for
+        run_semsg with appending input_timseries_season value.
 
-    # creates source objects as defined in the model definition file and
-    # adds them to the list of components (nodes)
-    thread1 = Thread(target=Source.Sources, args=(nodes_data, nodes, busd))
-    thread1.start()
-    # created sink objects as defined in the model definition file and
-    # adds them to the list of components (nodes)
-    thread2 = Thread(target=Sink.Sinks, args=(nodes_data, busd, nodes))
-    thread2.start()
-    # creates transformer objects as defined in the model definition
-    # file and adds them to the list of components (nodes)
-    thread3 = Thread(target=Transformer.Transformers,
-                     args=(nodes_data, nodes, busd))
-    thread3.start()
-    # creates storage objects as defined in the model definition file
-    # and adds them to the list of components (nodes)
-    thread4 = Thread(target=Storage.Storages, args=(nodes_data, nodes, busd))
-    thread4.start()
-    # creates link objects as defined in the model definition file and
-    # adds them to the list of components (nodes)
-    thread5 = Thread(target=Link.Links, args=(nodes_data, nodes, busd))
-    thread5.start()
+        :param GUI_main_dict: global defined dict of GUI input variables
+        :type GUI_main_dict: dict
+        :param input_value_list: list of input variables which will \
+            be written in a list from the GUI_main_dict
+        :type input_value_list: list
+        :param input_timeseries_season: input value of the season drop \
+            down menu in the GUI
+        :type input_timeseries_season: str
+        :param input_timeseries_weights: key of the optional weights \
+            of the multi-attribute clustering, appended if set
+        :type input_timeseries_weights: str
+        :param input_timeseries_tolerance: key of the optional error \
+            tolerance of the automatic index selection, appended if set
+        :type input_timeseries_tolerance: str
 
-    # wait until the threads have done their tasks
-    thread1.join()
-    thread2.join()
-    thread3.join()
-    thread4.join()
-    thread5.join()
+        :return: - **parameter_list + input_value_season** (list) - \
+            list of timeseries simplification parameters
+    """
 
-    if len(nodes_data["buses"][~nodes_data["buses"][
-        "district heating conn."].isin(["0", 0])]) > 0:
-        # creates the thermal network components as defined in the model
-        # definition file and adds them to the list of components (nodes)
-        nodes = district_heating.district_heating(
-            nodes_data=nodes_data, nodes=nodes, busd=busd,
-            district_heating_path=district_heating_path,
-            result_path=result_path, cluster_dh=cluster_dh,
-            anergy_or_exergy=False)
+    # set parameter from the GUI main dict and store them in a list
+    parameter_list = \
+        [GUI_main_dict[input_value] for input_value in input_value_list]
 
-    # adds the created components to the energy system created in the
-    # beginning of this method
-    esys.add(*nodes)
+    # set input_timseries_season value
+    input_value_season = \
+        [0 if GUI_main_dict[input_timeseries_season] == "None"
+         else GUI_main_dict[input_timeseries_season]]
 
-    # creates the energy system graph
-    ESGraphRenderer(energy_system=esys, filepath=result_path, view=graph,
-                    legend=True)
+    # the weights of the multi-attribute clustering and the error
+    # tolerance of the automatic index selection are optional, unset
+    # weights are passed as None if the tolerance is set
+    input_value_optional = \
+        [GUI_main_dict.get(input_timeseries_weights) or None,
+         GUI_main_dict.get(input_timeseries_tolerance) or None]
+    while input_value_optional and input_value_optional[-1] is None:
+        input_value_optional.pop()
 
-    # optimizes the energysystem and returns the optimized energy system
-    om = optimize_model.least_cost_model(
-        energy_system=esys, num_threads=num_threads, nodes_data=nodes_data,
-        busd=busd, solver=solver, result_path=result_path
-    )
+    # append input_timseries_season value and return
+    return parameter_list + input_value_season + input_value_optional
 
-    # shows and saves results iof the optimized model / postprocessing
-    if xlsx_results:
-        create_results.xlsx(nodes_data=nodes_data, optimization_model=om,
-                            filepath=result_path)
 
-    # creates the data used for the results presentation in the GUI
-    create_results.Results(
-        nodes_data=nodes_data, optimization_model=om, energy_system=esys,
-        result_path=result_path, console_log=console_results,
-        cluster_dh=cluster_dh)
+def run_SESMG(GUI_main_dict: dict,
+              model_definition: str,
+              save_path: str) -> None:
+    """
+        Function to run SESMG main based on the GUI input values dict.
 
-    logging.info('\t ' + 56 * '-')
-    logging.info('\t Modelling and optimization successfully completed!') 
+        :param GUI_main_dict: global defined dict of GUI input variables
+        :type GUI_main_dict: dict
+        :param model_definition: file path of the model definition to \
+            be optimized
+        :type model_definition: str
+        :param save_path: file path where the results will be saved
+        :type save_path: str
+    """
+
+    # prepare timeseries parameter list
+    timeseries_prep_parameter_list = \
+        ["input_timeseries_algorithm", "input_timeseries_cluster_index",
+         "input_timeseries_criterion", "input_timeseries_period"]
+
+    # create timeseries parameter list as an input variable for run_sesmg
+    timeseries_prep = create_timeseries_parameter_list(
+        GUI_main_dict=GUI_main_dict,
+        input_value_list=timeseries_prep_parameter_list,
+        input_timeseries_season="input_timeseries_season")
+
+    if not GUI_main_dict["input_activate_premodeling"]:
+
+        sesmg_main(
+            model_definition_file=model_definition,
+            result_path=save_path,
+            num_threads=GUI_main_dict["input_num_threads"],
+            timeseries_prep=timeseries_prep,
+            criterion_switch=GUI_main_dict["input_criterion_switch"],
+            xlsx_results=GUI_main_dict["input_xlsx_results"],
+            console_results=GUI_main_dict["input_console_results"],
+            solver=GUI_main_dict["input_solver"],
+            district_heating_path=GUI_main_dict["input_dh_folder"],
+            cluster_dh=GUI_main_dict["input_cluster_dh"],
+            resume=GUI_main_dict.get("input_resume", False),
+            checkpoints=GUI_main_dict.get("input_checkpoints", False),
+            solver_options=GUI_main_dict.get("input_solver_options"),
+            dry_run=GUI_main_dict.get("input_dry_run", False),
+            presolve=GUI_main_dict.get("input_presolve", False),
+            tighten_bounds=GUI_main_dict.get("input_tighten_bounds", False))
+
+    # If pre-modeling is activated a second run will be carried out
+    else:
+
+        # prepare pre-model timeseries parameter list
+        timeseries_prep_parameter_list = \
+            ["input_premodeling_timeseries_algorithm",
+             "input_premodeling_timeseries_cluster_index",
+             "input_premodeling_timeseries_criterion",
+             "input_premodeling_timeseries_period"]
+
+        # create pre-model timeseries parameter list as an input variable
+        # for run_sesmg
+        premodel_timeseries_prep = create_timeseries_parameter_list(
+            GUI_main_dict=GUI_main_dict,
+            input_value_list=timeseries_prep_parameter_list,
+            input_timeseries_season="input_premodeling_timeseries_season")
+
+        sesmg_main_including_premodel(
+            model_definition_file=model_definition,
+            result_path=save_path,
+            num_threads=GUI_main_dict["input_num_threads"],
+            timeseries_prep=timeseries_prep,
+            criterion_switch=GUI_main_dict["input_criterion_switch"],
+            xlsx_results=GUI_main_dict["input_xlsx_results"],
+            console_results=GUI_main_dict["input_console_results"],
+            solver=GUI_main_dict["input_solver"],
+            district_heating_path=GUI_main_dict["input_dh_folder"],
+            cluster_dh=GUI_main_dict["input_cluster_dh"],
+            pre_model_timeseries_prep=premodel_timeseries_prep,
+            investment_boundaries=GUI_main_dict["input_premodeling_invest_boundaries"],
+            investment_boundary_factor=GUI_main_dict["input_premodeling_tightening_factor"],
+            graph=False,
+            solver_options=GUI_main_dict.get("input_solver_options"),
+            presolve=GUI_main_dict.get("input_presolve", False),
+            tighten_bounds=GUI_main_dict.get("input_tighten_bounds", False))
+
+
+def run_montecarlo_runs(runs: list, processes: int, num_threads: int):
+    """
+        Generator solving the given Monte Carlo runs either one after
+        another (processes = 1) or concurrently within a process pool.
+        The runs are yielded as soon as they are finished, thus the
+        order may differ from the order of the given list. In the
+        parallel case the number of threads is split across the worker
+        processes.
+
+        :param runs: list of dicts holding the keyword arguments of \
+            sesmg_main_montecarlo for each run
+        :type runs: list
+        :param processes: maximum number of runs solved concurrently
+        :type processes: int
+        :param num_threads: total number of threads available for all \
+            concurrently solved runs
+        :type num_threads: int
+
+        :return: - **-** (tuple) - (run, error) for every finished run, \
+            error is None if the run succeeded
+    """
+    processes = min(processes, len(runs))
+    # serial execution
+    if processes <= 1:
+        for run in runs:
+            try:
+                sesmg_main_montecarlo(**run)
+                yield run, None
+            except Exception as error:
+                yield run, error
+        return
+
+    # thread budget of every worker process
+    threads_per_process = max(1, num_threads // processes)
+    logging.info("\t Solving " + str(len(runs)) + " Monte Carlo runs within "
+                 + str(processes) + " processes using "
+                 + str(threads_per_process) + " threads each.")
+    # spawn is used since forking a process holding the streamlit
+    # server threads is not safe
+    with ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = {
+            executor.submit(sesmg_main_montecarlo,
+                            **dict(run, num_threads=threads_per_process)): run
+            for run in runs}
+        for future in as_completed(futures):
+            yield futures[future], future.exception()
+
+
+def run_SESMG_montecarlo(GUI_main_dict: dict,
+                         model_definition: str,
+                         result_path=None) -> str:
+    """
+        Function to run a Monte Carlo simulation via SESMG main based on 
+        the GUI input values dict.
+
+        Every run draws its parameter variation from its own random
+        number generator seeded by the campaign seed and the run index,
+        therefore only the runs of the selected section are carried
+        out. If "input_montecarlo_processes" is larger than 1, the runs
+        are solved within a process pool and the results are collected
+        as soon as a run is finished.
+
+        :param GUI_main_dict: global defined dict of GUI input variables
+        :type GUI_main_dict: dict
+        :param model_definition: file path of the model definition to \
+            be optimized
+        :type model_definition: str
+        :param result_path: directory in which the timestamped Monte \
+            Carlo result folder is created. If not given the results \
+            folder of the SESMG repository is used.
+        :type result_path: str
+
+        :return: - **directory** (str) - path where the Monte Carlo \
+            runs were stored
+    """
+    # creating a dictionary to store the 
+    # relevant parameters during the monte carlo runs
+    montecarlo_dict = {"costs": [], 
+                       "emissions": [], 
+                       "folder": [], 
+                       "main_directory": "",
+                       "sub_directory": "",
+                       "folder_failed": []
+                      }
+        
+    # sets the corresponding directory and the initial result folder number depending on
+    # whether a pareto run was performed in advance or not
+    if GUI_main_dict["montecarlo_with_pareto"]:
+        directory = GUI_main_dict["res_path"]
+        first_folder_number = 2
+    else:
+        if result_path is None:
+            result_path = os.path.join(
+                os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+                "results")
+        directory = os.path.join(
+            result_path, datetime.now().strftime("%Y-%m-%d--%H-%M-%S"))
+        os.mkdir(directory)
+        first_folder_number = 1
+        
+    montecarlo_dict["main_directory"] = directory
+
+    # If pre-modeling is activated an error message will occur
+    if GUI_main_dict["input_activate_premodeling"]:
+        logging.info("   " + "Pre-modeling with monte carlo currently not supported.")
+        return directory
+
+    # Monte Carlo uses the GUI's model definition upload, it is stored
+    # within the result directory to be accessible by its file path
+    model_definition = pareto_optimization.save_model_definition_to_directory(
+        model_definition, directory)
+
+    # the model definition is parsed once for the whole campaign, every
+    # run varies a copy of it
+    nodes_data_template = create_energy_system.import_model_definition(
+        filepath=model_definition)
+
+    # prepare timeseries parameter list
+    timeseries_prep_parameter_list = \
+        ["input_timeseries_algorithm", "input_timeseries_cluster_index",
+         "input_timeseries_criterion", "input_timeseries_period"]
+
+    # create timeseries parameter list as an input variable for run_sesmg
+    timeseries_prep = create_timeseries_parameter_list(
+        GUI_main_dict=GUI_main_dict,
+        input_value_list=timeseries_prep_parameter_list,
+        input_timeseries_season="input_timeseries_season")
+
+    # set up the run indices of the selected section
+    montecarlo_section_runs = GUI_main_dict["input_montecarlo_number_of_runs"]
+    montecarlo_section = GUI_main_dict["input_montecarlo_section"]
+    first_run = montecarlo_section_runs * (montecarlo_section - 1)
+
+    # create a separate folder for every run of the selected section
+    runs = []
+    for number, current_run in enumerate(
+            range(first_run, first_run + montecarlo_section_runs)):
+        folder_number = first_folder_number + number
+        save_path = create_model_definition_save_folder(
+            model_definition, directory, str(folder_number))
+        runs.append({
+            "result_path": save_path,
+            "num_threads": GUI_main_dict["input_num_threads"],
+            "timeseries_prep": timeseries_prep,
+            "criterion_switch": GUI_main_dict["input_criterion_switch"],
+            "xlsx_results": GUI_main_dict["input_xlsx_results"],
+            "console_results": GUI_main_dict["input_console_results"],
+            "solver": GUI_main_dict["input_solver"],
+            "district_heating_path": GUI_main_dict["input_dh_folder"],
+            "cluster_dh": GUI_main_dict["input_cluster_dh"],
+            "nodes_data_template": nodes_data_template,
+            "current_run": current_run,
+            "seed": GUI_main_dict.get("input_montecarlo_seed", 1),
+            "solver_options": GUI_main_dict.get("input_solver_options"),
+            "presolve": GUI_main_dict.get("input_presolve", False),
+            "tighten_bounds": GUI_main_dict.get("input_tighten_bounds",
+                                                False)})
+
+    # run the monte carlo samples and collect their results as soon
+    # as they are finished
+    for run, error in run_montecarlo_runs(
+            runs=runs,
+            processes=int(GUI_main_dict.get("input_montecarlo_processes", 1)),
+            num_threads=GUI_main_dict["input_num_threads"]):
+        folder_number = first_folder_number + run["current_run"] - first_run
+        if error is None:
+            montecarlo_dict["sub_directory"] = run["result_path"]
+            montecarlo_dict["folder"].append(folder_number)
+            # append results of current run
+            create_results.montecarlo_results(montecarlo_dict)
+        # if a run doesn't succeed its number will be saved
+        else:
+            logging.error("   " + "Monte Carlo run " + str(folder_number)
+                          + " failed: " + str(error))
+            montecarlo_dict["folder_failed"].append(folder_number)
+            create_results.montecarlo_failed_runs(montecarlo_dict)
+
+    # create a final csv of failed runs  
+    create_results.montecarlo_failed_runs(montecarlo_dict)
+    
+    logging.info("   " + "Monte Carlo runs successfully completed.")
+
+    return directory
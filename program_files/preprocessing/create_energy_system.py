@@ -6,16 +6,233 @@
 """
 import pandas
 import logging
+import hashlib
+import io
+import os
+import pickle
+import stat
+import tempfile
 from program_files.preprocessing.import_weather_data \
     import import_open_fred_weather_data
 from oemof.solph import EnergySystem
-import random
+from program_files.preprocessing.data_preparation import SEGMENTS_SHEET
+from program_files.preprocessing.data_preparation_algorithms.segmentation \
+    import get_segment_timeindex
+import numpy
 pandas.options.mode.chained_assignment = None
 
+# name of the directory (within the temp directory) where the parsed
+# model definitions are cached, the user id is appended
+MODEL_DEFINITION_CACHE_NAME = "SESMG_model_definition_cache"
+# format of the cache entries which is part of the entries' key,
+# entries of other formats or pandas versions are not used
+MODEL_DEFINITION_CACHE_FORMAT = "1-pandas" + pandas.__version__
+# maximum size of the model definition cache in bytes
+MODEL_DEFINITION_CACHE_SIZE = 512 * 1024 ** 2
+
+
+def read_model_definition_content(filepath) -> bytes:
+    """
+        Reads the binary content of a model definition which is given
+        either as file path or as file-like object (e.g. the streamlit
+        UploadedFile).
+
+        :param filepath: path to excel model definition file or \
+            file-like object
+        :type filepath: str / streamlit.UploadedFile
+
+        :raises: - **FileNotFoundError** - excel spreadsheet not found
+
+        :return: - **-** (bytes) - content of the model definition
+    """
+    if hasattr(filepath, "getvalue"):
+        return filepath.getvalue()
+    try:
+        with open(filepath, "rb") as infile:
+            return infile.read()
+    except FileNotFoundError:
+        raise FileNotFoundError("Problem importing model definition file.")
+
+
+def parse_model_definition(content: bytes) -> dict:
+    """
+        Parses all sheets of a spreadsheet model definition.
+
+        :param content: content of the excel model definition file
+        :type content: bytes
+
+        :return: - **nodes_data** (dict) - dictionary containing excel \
+            sheets including the unit row
+    """
+    xls = pandas.ExcelFile(io.BytesIO(content))
+    return {
+        "buses": xls.parse("buses"),
+        "energysystem": xls.parse("energysystem"),
+        "sinks": xls.parse("sinks"),
+        "links": xls.parse("links"),
+        "sources": xls.parse("sources"),
+        "timeseries": xls.parse("time series", parse_dates=["timestamp"]),
+        "transformers": xls.parse("transformers"),
+        "storages": xls.parse("storages"),
+        "weather data": xls.parse("weather data", parse_dates=["timestamp"]),
+        "competition constraints": xls.parse("competition constraints"),
+        "insulation": xls.parse("insulation"),
+        "district heating": xls.parse("district heating"),
+        "pipe types": xls.parse("pipe types"),
+        # optional sheet created by the upscaling tool's aggregation of
+        # identical buildings
+        "aggregated buildings": xls.parse("aggregated buildings")
+        if "aggregated buildings" in xls.sheet_names else pandas.DataFrame()
+    }
+
+
+def parse_model_definition_sheets(content: bytes) -> dict:
+    """
+        Parses all sheets of a spreadsheet model definition without
+        any adaption, e.g. to write an updated copy of the model
+        definition.
+
+        :param content: content of the excel model definition file
+        :type content: bytes
+
+        :return: - **-** (dict) - dictionary containing all excel \
+            sheets by their sheet name
+    """
+    return pandas.read_excel(io.BytesIO(content), sheet_name=None)
+
+
+def get_model_definition_cache_path():
+    """
+        Returns the model definition cache directory of the current
+        user. Since the cache entries are unpickled, the directory is
+        created accessible for its owner only. A directory which is
+        not owned by the user or accessible by others (e.g. created in
+        advance by another user of a shared node) is not used.
+
+        :return: - **cache_path** (str) - directory of the model \
+            definition cache, None if no safe directory is available
+    """
+    name = MODEL_DEFINITION_CACHE_NAME
+    # the temp directory of windows is a per-user directory already
+    if hasattr(os, "getuid"):
+        name += "_" + str(os.getuid())
+    cache_path = os.path.join(tempfile.gettempdir(), name)
+    try:
+        os.makedirs(cache_path, mode=0o700, exist_ok=True)
+        status = os.lstat(cache_path)
+    except OSError:
+        return None
+    if hasattr(os, "getuid") and (
+            not stat.S_ISDIR(status.st_mode)
+            or status.st_uid != os.getuid()
+            or stat.S_IMODE(status.st_mode) & 0o077):
+        logging.warning("\t The model definition cache " + cache_path
+                        + " is not private and therefore not used.")
+        return None
+    return cache_path
+
+
+def evict_model_definition_cache(cache_path=None,
+                                 max_size=MODEL_DEFINITION_CACHE_SIZE
+                                 ) -> None:
+    """
+        Removes the least recently used entries of the model definition
+        cache until its size is below the given maximum size.
+
+        :param cache_path: directory of the model definition cache, \
+            if None the directory of get_model_definition_cache_path \
+            is used
+        :type cache_path: str
+        :param max_size: maximum size of the cache in bytes
+        :type max_size: int
+    """
+    if cache_path is None:
+        cache_path = get_model_definition_cache_path()
+        if cache_path is None:
+            return
+    entries = []
+    for file in os.listdir(cache_path):
+        if file.endswith(".pkl"):
+            status = os.stat(os.path.join(cache_path, file))
+            entries.append((status.st_mtime, status.st_size, file))
+    total_size = sum(entry[1] for entry in entries)
+    # oldest entries first
+    for mtime, size, file in sorted(entries):
+        if total_size <= max_size:
+            break
+        try:
+            os.remove(os.path.join(cache_path, file))
+        except OSError:
+            # entry has already been removed by a concurrent run
+            pass
+        total_size -= size
+
+
+def import_cached_model_definition(content: bytes, cache_path=None,
+                                   parser=parse_model_definition) -> dict:
+    """
+        Returns the parsed sheets of a model definition. The sheets are
+        cached as pickle file named by the SHA-256 hash of the cache
+        format, the parser and the content, thus an unchanged model
+        definition is only parsed once, no matter under which name it
+        is stored. Every call returns new DataFrames, so that the
+        caller is allowed to adapt them.
+
+        :param content: content of the excel model definition file
+        :type content: bytes
+        :param cache_path: directory of the model definition cache, \
+            if None the directory of get_model_definition_cache_path \
+            is used
+        :type cache_path: str
+        :param parser: function parsing the content \
+            (parse_model_definition or parse_model_definition_sheets)
+        :type parser: function
+
+        :return: - **nodes_data** (dict) - dictionary containing excel \
+            sheets including the unit row
+    """
+    if cache_path is None:
+        cache_path = get_model_definition_cache_path()
+        # no private cache directory available
+        if cache_path is None:
+            return parser(content)
+    key = hashlib.sha256(
+        (MODEL_DEFINITION_CACHE_FORMAT + ";" + parser.__name__ + ";").encode()
+        + content)
+    cache_file = os.path.join(cache_path, key.hexdigest() + ".pkl")
+    # load cached model definition
+    if os.path.exists(cache_file):
+        try:
+            with open(cache_file, "rb") as infile:
+                nodes_data = pickle.load(infile)
+            # mark entry as recently used
+            os.utime(cache_file)
+            return nodes_data
+        except Exception:
+            # corrupted or incompatible cache entry, parse again
+            logging.info("\t Invalid model definition cache entry ignored.")
+
+    nodes_data = parser(content)
+    
+    # store the parsed sheets, the file is written under a temporary
+    # name first so that concurrent runs never read a partial entry
+    try:
+        os.makedirs(cache_path, mode=0o700, exist_ok=True)
+        temp_file = cache_file + "." + str(os.getpid()) + ".tmp"
+        with open(temp_file, "wb") as outfile:
+            pickle.dump(nodes_data, outfile, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, cache_file)
+        evict_model_definition_cache(cache_path=cache_path)
+    except OSError:
+        logging.info("\t Model definition could not be cached.")
+    return nodes_data
+
 
 def import_model_definition(filepath: str, delete_units=True) -> dict:
     """
-        Imports data from a spreadsheet model definition file.
+        Imports data from a spreadsheet model definition file. Repeated
+        imports of an unchanged file are served by the model
+        definition cache (see import_cached_model_definition).
     
         The excel sheet has to contain the following sheets:
     
@@ -32,9 +249,11 @@ def import_model_definition(filepath: str, delete_units=True) -> dict:
             - insulation
             - district heating
             - pipe types
+            - aggregated buildings (optional)
     
-        :param filepath: path to excel model definition file
-        :type filepath: str
+        :param filepath: path to excel model definition file or \
+            file-like object
+        :type filepath: str / streamlit.UploadedFile
         :param delete_units: boolean which defines rather the unit \
             row in the imported spreadsheets is removed or not
         :type delete_units: bool
@@ -43,27 +262,10 @@ def import_model_definition(filepath: str, delete_units=True) -> dict:
     
         :return: - **nodes_data** (dict) - dictionary containing excel sheets
     """
-    # creates nodes from excel sheet
-    try:
-        xls = pandas.ExcelFile(filepath)
-    except FileNotFoundError:
-        raise FileNotFoundError("Problem importing model definition file.")
-    
-    nodes_data = {
-        "buses": xls.parse("buses"),
-        "energysystem": xls.parse("energysystem"),
-        "sinks": xls.parse("sinks"),
-        "links": xls.parse("links"),
-        "sources": xls.parse("sources"),
-        "timeseries": xls.parse("time series", parse_dates=["timestamp"]),
-        "transformers": xls.parse("transformers"),
-        "storages": xls.parse("storages"),
-        "weather data": xls.parse("weather data", parse_dates=["timestamp"]),
-        "competition constraints": xls.parse("competition constraints"),
-        "insulation": xls.parse("insulation"),
-        "district heating": xls.parse("district heating"),
-        "pipe types": xls.parse("pipe types")
-    }
+    # creates nodes from excel sheet, the parsed sheets are cached by
+    # the content of the model definition
+    nodes_data = import_cached_model_definition(
+        content=read_model_definition_content(filepath))
     if delete_units:
         # delete spreadsheet row within technology or units specific
         # parameters
@@ -86,189 +288,149 @@ def import_model_definition(filepath: str, delete_units=True) -> dict:
     return nodes_data
 
 
-def import_model_definition_montecarlo(current_run: int, montecarlo_section_runs: int,
-                            montecarlo_section: int,
-                            filepath: str, result_path:str, delete_units=True) -> dict:
+def import_model_definition_sheets(filepath: str) -> dict:
     """
-        Imports data from a spreadsheet model definition file and
-        variates parameters. Returns the data needed to start a
-        simulation if the selected section is carried out, returns
-        None to skip the rest of runs if not.
-    
-        The excel sheet has to contain the following sheets:
-    
-            - energysystem
-            - buses
-            - transformers
-            - sinks
-            - sources
-            - storages
-            - links
-            - time series
-            - weather data
-            - competition constraints
-            - insulation
-            - district heating
-            - pipe types
-        
-        [...]
-        
-        :param filepath: path to excel model definition file
-        :type filepath: str
-        :param delete_units: boolean which defines rather the unit \
-            row in the imported spreadsheets is removed or not
-        :type delete_units: bool
-    
+        Imports all sheets of a spreadsheet model definition file
+        without any adaption (see parse_model_definition_sheets).
+        Repeated imports of an unchanged file are served by the model
+        definition cache (see import_cached_model_definition).
+
+        :param filepath: path to excel model definition file or \
+            file-like object
+        :type filepath: str / streamlit.UploadedFile
+
         :raises: - **FileNotFoundError** - excel spreadsheet not found
-    
-        :return: - **nodes_data** (dict) - dictionary containing excel sheets
+
+        :return: - **-** (dict) - dictionary containing all excel \
+            sheets by their sheet name
     """
-    # creates nodes from excel sheet
-    try:
-        xls = pandas.ExcelFile(filepath)
-           
-    except FileNotFoundError:
-        raise FileNotFoundError("Problem importing model definition file.")
-   
-    # varies buses, if no building is connected to the 
+    return import_cached_model_definition(
+        content=read_model_definition_content(filepath),
+        parser=parse_model_definition_sheets)
+
+
+def create_montecarlo_rng(seed: int, current_run: int
+                          ) -> numpy.random.Generator:
+    """
+        Creates the random number generator of a single Monte Carlo
+        run. The generator is seeded by the campaign seed and the run's
+        index (counter-based seeding), so that the random draws of a
+        run do not depend on the runs carried out before. Hence, every
+        run can be generated independently, e.g. in a separate process.
+
+        :param seed: seed of the Monte Carlo campaign
+        :type seed: int
+        :param current_run: index of the Monte Carlo run
+        :type current_run: int
+
+        :return: - **-** (numpy.random.Generator) - random number \
+            generator of the given run
+    """
+    return numpy.random.default_rng([seed, current_run])
+
+
+def draw_montecarlo_capacities(sheet: pandas.DataFrame,
+                               rng: numpy.random.Generator) -> None:
+    """
+        Draws a random integer capacity between 0 and the maximum
+        investment capacity for every row of the given sheet at once
+        and fixes the minimum and maximum investment capacity to the
+        drawn value.
+
+        :param sheet: sources, transformers, storages or links sheet \
+            without the unit row
+        :type sheet: pandas.DataFrame
+        :param rng: random number generator of the current run
+        :type rng: numpy.random.Generator
+    """
+    if len(sheet) == 0:
+        return
+    max_capacities = numpy.floor(pandas.to_numeric(
+        sheet["max. investment capacity"]).to_numpy()).astype(numpy.int64)
+    capacities = rng.integers(0, max_capacities, endpoint=True)
+    sheet["min. investment capacity"] = capacities
+    sheet["max. investment capacity"] = capacities
+
+
+def create_montecarlo_nodes_data(nodes_data_template: dict, current_run: int,
+                                 result_path: str, seed=1) -> dict:
+    """
+        Creates the varied nodes data of the given Monte Carlo run
+        from the model definition which was imported once per
+        campaign (see import_model_definition). All random values of
+        a sheet are drawn in one vectorized pass. The random draws only
+        depend on the campaign seed and the run index (see
+        create_montecarlo_rng).
+
+        The following parameters are varied:
+
+            - district heating connection of the heat buses (0 or 1), \
+              the central heat buses and the district heating sheet \
+              are activated if at least one building is connected
+            - investment capacity of sources, transformers, storages \
+              and links (fixed between 0 and the max. investment \
+              capacity)
+            - "existing with costs" (0 or 1) and area of insulations
+
+        :param nodes_data_template: dictionary containing the excel \
+            sheets of the base model definition (unit row deleted)
+        :type nodes_data_template: dict
+        :param current_run: index of the Monte Carlo run
+        :type current_run: int
+        :param result_path: path where the varied parameters are saved
+        :type result_path: str
+        :param seed: seed of the Monte Carlo campaign
+        :type seed: int
+
+        :return: - **nodes_data** (dict) - dictionary containing the \
+            varied excel sheets
+    """
+    # the template is reused by every run, therefore all sheets are
+    # copied since the following steps adapt the nodes data in place
+    nodes_data = {key: sheet.copy() for key, sheet in
+                  nodes_data_template.items()}
+
+    # random number generator of the current run
+    rng = create_montecarlo_rng(seed=seed, current_run=current_run)
+
+    # varies buses, if no building is connected to the
     # district heating, the grid will be deactivated
-    buses_varied = xls.parse("buses")
-    
-    connected_buildings = 0
-    for i, index in buses_varied["district heating conn."][1:].items():
-        if buses_varied["sector"][i] == "heat":
-            index = random.randint(0,1)
-            buses_varied["district heating conn."][i] = index
-            connected_buildings += index
-            logging.info("House connection: " + str(buses_varied["district heating conn."][i]))
-
-    for i, index in buses_varied["district heating conn."][1:].items():
-        if buses_varied["sector"][i] == "central_heat":
-            if connected_buildings != 0:
-                buses_varied["district heating conn."][i] = "dh-system"
-            else:
-                buses_varied["district heating conn."][i] = 0
-            logging.info("District heating connection: " +str(buses_varied["district heating conn."][i]))
-
-    # varies sources
-    sources_varied = xls.parse("sources")
-    sources = xls.parse("sources")
-    
-    for i, index in sources_varied["min. investment capacity"][1:].items():
-        index = random.randint(0 , sources["max. investment capacity"][i])
-        sources_varied["min. investment capacity"][i] = index
-        sources_varied["max. investment capacity"][i] = sources_varied["min. investment capacity"][i]
-        logging.info("Sources: " + str(index))
+    buses = nodes_data["buses"]
+    heat_buses = buses["sector"] == "heat"
+    connections = rng.integers(0, 1, endpoint=True, size=heat_buses.sum())
+    buses.loc[heat_buses, "district heating conn."] = connections
+    connected_buildings = int(connections.sum())
+    buses.loc[buses["sector"] == "central_heat", "district heating conn."] = \
+        "dh-system" if connected_buildings != 0 else 0
 
-    
-    # varies transformers
-    transformers_varied = xls.parse("transformers")
-    transformers = xls.parse("transformers")
-    for i, index in transformers_varied["min. investment capacity"][1:].items():
-        index = random.randint(0 , transformers["max. investment capacity"][i])
-        transformers_varied["min. investment capacity"][i] = index
-        transformers_varied["max. investment capacity"][i] = transformers_varied["min. investment capacity"][i]
-        logging.info("Transformers: " + str(index))
-
-    # varies storages
-    storages_varied = xls.parse("storages")
-    storages = xls.parse("storages")
-    for i, index in storages_varied["min. investment capacity"][1:].items():
-        index = random.randint(0 , storages["max. investment capacity"][i])
-        storages_varied["min. investment capacity"][i] = index
-        storages_varied["max. investment capacity"][i] = storages_varied["min. investment capacity"][i]
-        logging.info("Storages: " + str(index))
-
-    # varies links
-    links_varied = xls.parse("links")
-    links = xls.parse("links")
-    for i, index in links_varied["min. investment capacity"][1:].items():
-        index = random.randint(0 , links_varied["max. investment capacity"][i])
-        links_varied["min. investment capacity"][i] = index
-        links_varied["max. investment capacity"][i] = links_varied["min. investment capacity"][i]
-        logging.info("Links: " + str(index))
-
-    # varies insulation and its area   
-    insulation_varied = xls.parse("insulation")
-    insulation = xls.parse("insulation")
-    
-    for i, index in insulation_varied["existing with costs"][1:].items():
-        index = random.randint(0,1)
-        insulation_varied["existing with costs"][i] = index
-        logging.info("Insulation: " + str(index))
-    for i, index in insulation_varied["area"][1:].items():
-        index = random.uniform(0 , insulation["area"][i])
-        insulation_varied["area"][i] = index
-        logging.info("Insulation area: " + str(index))
+    # varies the capacities of sources, transformers, storages and links
+    for sheet in ["sources", "transformers", "storages", "links"]:
+        draw_montecarlo_capacities(sheet=nodes_data[sheet], rng=rng)
+
+    # varies insulation and its area
+    insulation = nodes_data["insulation"]
+    if len(insulation) > 0:
+        insulation["existing with costs"] = rng.integers(
+            0, 1, endpoint=True, size=len(insulation))
+        insulation["area"] = rng.uniform(
+            0, pandas.to_numeric(insulation["area"]).to_numpy())
 
     # activates district heating if
     # at least one house connection is available
-    district_heating = xls.parse("district heating")
-    
-    for i, index in district_heating["active"][1:].items():
-        if connected_buildings != 0:
-            district_heating["active"][i] = 1
-        else:
-            district_heating["active"][i] = 0   
-        logging.info("District heating: " + str(district_heating["active"][i]))
-    
-    
-    # read and return varied data if current run is in the selected section
-    if current_run >= montecarlo_section_runs * (montecarlo_section-1) and \
-    current_run < montecarlo_section_runs * montecarlo_section:
-    
-        nodes_data = {
-        "buses": buses_varied,
-        "energysystem": xls.parse("energysystem"),
-        "sinks": xls.parse("sinks"),
-        "links": links_varied,
-        "sources": sources_varied,
-        "timeseries": xls.parse("time series", parse_dates=["timestamp"]),
-        "transformers": transformers_varied,
-        "storages": storages_varied,
-        "weather data": xls.parse("weather data", parse_dates=["timestamp"]),
-        "competition constraints": xls.parse("competition constraints"),
-        "insulation": insulation_varied,
-        "district heating": district_heating,
-        "pipe types": xls.parse("pipe types")
-        }
-        
-        if delete_units:
-            # delete spreadsheet row within technology or units specific
-            # parameters
-            for index in nodes_data.keys():
-                if index not in ["timeseries", "weather data"] \
-                        and len(nodes_data[index]) > 0:
-                    nodes_data[index] = nodes_data[index].drop(index=0)
-
-        # returns logging info
-        logging.info("\t Spreadsheet scenario successfully imported.")
-        # if the user imported coordinates for the OpenFred weather data
-        # download the import algorithm is triggered
-        if nodes_data["energysystem"].loc[1, "weather data lat"] \
-                not in ["None", "none"]:
-            logging.info("\t Start import weather data")
-            lat = nodes_data["energysystem"].loc[1, "weather data lat"]
-            lon = nodes_data["energysystem"].loc[1, "weather data lon"]
-            nodes_data = import_open_fred_weather_data(nodes_data, lat, lon)
-   
-        # save changed files as a separate sheet
-        path = result_path + "/montecarlo_used_parameters.xlsx"
-        writer = pandas.ExcelWriter(path, engine='xlsxwriter')
-        nodes_data['buses'].to_excel(writer, sheet_name='buses')
-        nodes_data['sources'].to_excel(writer, sheet_name='sources')
-        nodes_data['transformers'].to_excel(writer, sheet_name='transformers')
-        nodes_data['storages'].to_excel(writer, sheet_name='storages')
-        nodes_data['links'].to_excel(writer, sheet_name='links')
-        nodes_data['insulation'].to_excel(writer, sheet_name='insulation')
-        nodes_data['district heating'].to_excel(writer, sheet_name='district heating')
-        writer.close()
-   
-    else:
-        
-        # skips not selected runs
-        nodes_data={}
-        
+    nodes_data["district heating"]["active"] = \
+        1 if connected_buildings != 0 else 0
+
+    logging.info("\t Monte Carlo run " + str(current_run) + ": "
+                 + str(connected_buildings) + " house connection(s).")
+
+    # save changed files as a separate sheet
+    path = result_path + "/montecarlo_used_parameters.xlsx"
+    writer = pandas.ExcelWriter(path, engine='xlsxwriter')
+    for sheet in ["buses", "sources", "transformers", "storages", "links",
+                  "insulation", "district heating"]:
+        nodes_data[sheet].to_excel(writer, sheet_name=sheet)
+    writer.close()
+
     # returns nodes data
     return nodes_data
 
@@ -307,9 +469,15 @@ def define_energy_system(nodes_data: dict) -> EnergySystem:
     datetime_index = pandas.date_range(start=start_date,
                                        end=end_date,
                                        freq=temp_resolution)
+    timeincrement = None
+    # the segmentation of the timeseries preparation results in
+    # timesteps of variable length
+    if SEGMENTS_SHEET in nodes_data:
+        datetime_index, timeincrement = get_segment_timeindex(
+            nodes_data=nodes_data)
     
     # initialisation of the energy system
-    esys = EnergySystem(timeindex=datetime_index)
+    esys = EnergySystem(timeindex=datetime_index, timeincrement=timeincrement)
     # setting the index column for time series and weather data
     for sheet in ["timeseries", "weather data"]:
         # defines a time series
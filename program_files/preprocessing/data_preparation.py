@@ -8,12 +8,101 @@ from datetime import datetime
 import logging
 
 
+# number of (hourly) time steps of the period types
+PERIOD_TIMESTEPS = {"hours": 1, "days": 24, "weeks": 168}
+# nodes_data sheet holding the chronological cluster order of the
+# typical period modes (see processing.storage_linking)
+TYPICAL_PERIODS_SHEET = "typical periods"
+# nodes_data sheet holding the segments of variable length of the
+# segmentation (see data_preparation_algorithms.segmentation)
+SEGMENTS_SHEET = "segments"
+
+
+def create_period_matrix(data_set: pandas.DataFrame, period: str,
+                         column_names=None) -> np.ndarray:
+    """
+        Reshapes the given columns of a data set (weather data or
+        timeseries) once into a (periods x time steps x columns) array,
+        so that the timeseries preparation algorithms can work on
+        whole periods by vectorized numpy operations instead of
+        extracting the periods column by column. Incomplete periods at
+        the end of the data set are dropped. Caution: data set must be
+        available in hourly resolution!
+
+        :param data_set: weather data set or timeseries to be reshaped
+        :type data_set: pandas.DataFrame
+        :param period: indicates what kind of periods shall be \
+            extracted. Possible arguments: "days", "weeks", "hours".
+        :type period: str
+        :param column_names: columns to be reshaped, if None all \
+            columns except the first one (timestamp) are used
+        :type column_names: list
+
+        :return: - **-** (numpy.ndarray) - period matrix
+    """
+    if column_names is None:
+        column_names = list(data_set.columns[1:])
+    timesteps = PERIOD_TIMESTEPS.get(str(period))
+    periods = len(data_set) // timesteps
+    values = data_set[column_names].to_numpy()[:periods * timesteps]
+    return values.reshape(periods, timesteps, len(column_names))
+
+
+def period_matrix_to_data_set(period_matrix: np.ndarray, column_names: list
+                              ) -> pandas.DataFrame:
+    """
+        Concatenates the periods of a period matrix (see
+        create_period_matrix) to a chronological data set.
+
+        :param period_matrix: (periods x time steps x columns) array
+        :type period_matrix: numpy.ndarray
+        :param column_names: names of the matrix' columns
+        :type column_names: list
+
+        :return: - **-** (pandas.DataFrame) - data set holding one \
+            column per column name
+    """
+    # the columns of data sets with mixed types are reshaped as objects
+    return pandas.DataFrame(
+        period_matrix.reshape(-1, len(column_names)),
+        columns=column_names).infer_objects()
+
+
+def calculate_period_means(period_matrix: np.ndarray, cluster_number: int,
+                           cluster_labels) -> np.ndarray:
+    """
+        Calculates the mean period of every cluster of a period matrix
+        by one matrix product of the cluster assignment and the
+        flattened periods.
+
+        :param period_matrix: (periods x time steps x columns) array
+        :type period_matrix: numpy.ndarray
+        :param cluster_number: Number of clusters
+        :type cluster_number: int
+        :param cluster_labels: Chronological list, which period of the \
+            period matrix belongs to which cluster
+        :type cluster_labels: np.array
+
+        :return: - **-** (numpy.ndarray) - (clusters x time steps x \
+            columns) array holding the mean periods, nan for empty \
+            clusters
+    """
+    periods = period_matrix.shape[0]
+    labels = np.asarray(cluster_labels, dtype=int)[:periods]
+    assignment = np.zeros((cluster_number, periods))
+    assignment[labels, np.arange(periods)] = 1
+    sums = assignment @ period_matrix.reshape(periods, -1).astype(float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / assignment.sum(axis=1)[:, np.newaxis]
+    return means.reshape((cluster_number,) + period_matrix.shape[1:])
+
+
 def extract_single_periods(data_set: pandas.DataFrame, column_name: str,
-                           period: str) -> list:
+                           period: str) -> np.ndarray:
     """
         Extracts individual periods of a certain column of a weather data
-        set as lists. Caution: weather data set must be available in
-        hourly resolution!
+        set. Caution: weather data set must be available in hourly
+        resolution!
 
         :param data_set: weather data set to be extracted
         :type data_set: pandas.DataFrame
@@ -24,26 +113,12 @@ def extract_single_periods(data_set: pandas.DataFrame, column_name: str,
             extracted. Possible arguments: "days", "weeks", "hours".
         :type period: str
 
-        :return: - **cluster_vectors** (list) - list, containing a \
-            list/vector for every single day
+        :return: - **cluster_vectors** (numpy.ndarray) - (periods x \
+            time steps) array, containing a vector for every single \
+            period
     """
-    # dictionary holding the factor which the clusters are divided by
-    factor_dict = {"hours": 1, "days": 24, "weeks": 168}
-
-    # extract data_set of cluster_criterion
-    cluster_df = data_set[column_name]
-    # extract single periods as lists and add them to a list
-    cluster_vectors = []
-    timesteps = factor_dict.get(str(period))
-    # iterate threw the length of the timeseries after shortening
-    for i in range(0, int(len(cluster_df) / timesteps)):
-        cluster_vector = []
-        for j in range(timesteps):
-            cluster_vector.append(cluster_df[i * timesteps + j])
-        cluster_vectors.append(cluster_vector)
-
-    # returns the list with extracted day data sets
-    return cluster_vectors
+    return create_period_matrix(data_set=data_set, period=period,
+                                column_names=[column_name])[:, :, 0]
 
 
 def calculate_cluster_means(data_set: pandas.DataFrame, cluster_number: int,
@@ -67,39 +142,16 @@ def calculate_cluster_means(data_set: pandas.DataFrame, cluster_number: int,
             pandas dataframe containing the prepared weather data set
        
     """
-    column_names = [data_set.columns[i] for i in
-                    range(1, len(data_set.columns))]
-    # Define pandas Dataframe for final data_set
-    prep_data_set = pandas.DataFrame()
-    # Loop for every column of the weather data set
-    for i in range(len(column_names)):
-        # Extract individual weather data set for the current weather
-        # data column
-        data_set_column = extract_single_periods(data_set=data_set,
-                                                 column_name=column_names[i],
-                                                 period=period)
-        # Define empty list used later
-        reference_data_set = []
-        # Loop for every k_means cluster
-        for j in range(0, cluster_number):
-            # Define empty list used later
-            cluster_dataset = []
-            # Loop for every day of the weather data set
-            for k in range(len(data_set_column)):
-                # if the day belongs to the current cluster, it will be
-                # appended to 'cluster_dataset'
-                if cluster_labels[k] == j:
-                    cluster_dataset.append(data_set_column[k])
-            # Calculates the mean for ever hour of the current cluster
-            cluster_dataset_array = np.array(cluster_dataset)
-            # Appends the calculated mean values to the 'reference_data_
-            # set' list
-            reference_data_set += cluster_dataset_array.mean(axis=0).tolist()
-        # Appends the calculated reference days for the current weather
-        # data column to the final weather data set
-        prep_data_set[column_names[i]] = reference_data_set
-
-    return prep_data_set
+    column_names = list(data_set.columns[1:])
+    # all columns are reshaped at once and the mean periods of the
+    # clusters are concatenated chronologically
+    period_matrix = create_period_matrix(data_set=data_set, period=period,
+                                         column_names=column_names)
+    return period_matrix_to_data_set(
+        period_matrix=calculate_period_means(period_matrix=period_matrix,
+                                             cluster_number=cluster_number,
+                                             cluster_labels=cluster_labels),
+        column_names=column_names)
 
 
 def append_timeseries_to_weatherdata_sheet(nodes_data: dict
@@ -138,8 +190,8 @@ def append_timeseries_to_weatherdata_sheet(nodes_data: dict
     return nodes_data['timeseries']
 
 
-def variable_costs_date_adaption(nodes_data: dict, clusters: int, period: str
-                                 ) -> None:
+def variable_costs_date_adaption(nodes_data: dict, clusters: int, period: str,
+                                 typical_periods=False) -> None:
     """
         To be able to work with the adapted weather data set some
         parameters from nodes_data must be changed.
@@ -151,9 +203,13 @@ def variable_costs_date_adaption(nodes_data: dict, clusters: int, period: str
         :type clusters: int
         :param period: defines rather hours, days or weeks were selected
         :type period: str
+        :param typical_periods: if True the costs are not multiplied \
+            by the variable cost factor, since the typical periods are \
+            weighted by their occurrence within the model (see \
+            get_typical_period_weights)
+        :type typical_periods: bool
     """
-    factor_dict = {"hours": 1, "days": 24, "weeks": 168}
-    timesteps = factor_dict.get(period)
+    timesteps = PERIOD_TIMESTEPS.get(period)
     variable_cost_factor = \
         int(nodes_data['energysystem']['periods']) / (timesteps * clusters)
     # log the calculated variable cost factor
@@ -161,11 +217,12 @@ def variable_costs_date_adaption(nodes_data: dict, clusters: int, period: str
     logging.info("\t " + str(variable_cost_factor))
     
     # Adapting Costs and Constraint Costs
-    for sheet in nodes_data:
-        for column in nodes_data[sheet].columns:
-            if (sheet == "buses" and "costs" in column) \
-                    or ("variable" in column):
-                nodes_data[sheet][column] *= variable_cost_factor
+    if not typical_periods:
+        for sheet in nodes_data:
+            for column in nodes_data[sheet].columns:
+                if (sheet == "buses" and "costs" in column) \
+                        or ("variable" in column):
+                    nodes_data[sheet][column] *= variable_cost_factor
 
     # Adapting Demands
     nodes_data['sinks']['annual demand'] = \
@@ -309,6 +366,90 @@ def timeseries_adaption(nodes_data: dict, clusters: int,
     nodes_data['timeseries'] = prep_timeseries
 
 
+def store_cluster_order(nodes_data: dict, cluster_labels: np.array,
+                        period: str) -> None:
+    """
+        Stores the chronological cluster labels of the real periods
+        and the number of timesteps per period within the sheet
+        TYPICAL_PERIODS_SHEET of nodes_data, which is used to link the
+        storage contents of the typical periods across the real
+        calendar.
+
+        :param nodes_data: system parameters imported from the users \
+            model definition spread sheet, changed in place
+        :type nodes_data: dict
+        :param cluster_labels: Chronological list, which period of the \
+            weather data set belongs to which cluster
+        :type cluster_labels: np.array
+        :param period: defines rather hours, days or weeks were selected
+        :type period: str
+    """
+    nodes_data[TYPICAL_PERIODS_SHEET] = pandas.DataFrame({
+        "period": range(len(cluster_labels)),
+        "cluster": [int(label) for label in cluster_labels],
+        "timesteps": PERIOD_TIMESTEPS[period]})
+
+
+def get_typical_period_weights(nodes_data: dict) -> list:
+    """
+        Returns the weight of every timestep of the concatenated
+        typical periods, i.e. the timestep length in hours times the
+        number of real periods represented by the timestep's typical
+        period. The weights are used as objective weighting of the
+        flows' costs and emissions, thus the typical periods enter the
+        objective as often as the inter-period storage linking.
+
+        :param nodes_data: system parameters imported from the users \
+            model definition spread sheet including the sheet \
+            TYPICAL_PERIODS_SHEET
+        :type nodes_data: dict
+
+        :return: - **-** (list) - weight of every timestep
+    """
+    typical_periods = nodes_data[TYPICAL_PERIODS_SHEET]
+    occurrences = np.bincount(typical_periods["cluster"].astype(int))
+    resolution = next(nodes_data["energysystem"].iterrows())[1][
+        "temporal resolution"]
+    hours = pandas.tseries.frequencies.to_offset(resolution).nanos / 3.6e12
+    return [float(occurrence) * hours for occurrence in np.repeat(
+        occurrences, int(typical_periods["timesteps"].iloc[0]))]
+
+
+def expand_typical_period_results(energy_system, nodes_data: dict) -> None:
+    """
+        Expands the result sequences of an energy system built on
+        typical periods to the real periods of the cluster order, so
+        that the postprocessing sums up the flows of every typical
+        period as often as it occurs.
+
+        :param energy_system: optimized energy system holding its main \
+            results, changed in place
+        :type energy_system: oemof.solph.EnergySystem
+        :param nodes_data: system parameters imported from the users \
+            model definition spread sheet including the sheet \
+            TYPICAL_PERIODS_SHEET
+        :type nodes_data: dict
+    """
+    typical_periods = nodes_data[TYPICAL_PERIODS_SHEET]
+    timesteps = int(typical_periods["timesteps"].iloc[0])
+    clusters = typical_periods["cluster"].astype(int).to_numpy()
+    positions = (clusters[:, np.newaxis] * timesteps
+                 + np.arange(timesteps)).flatten()
+    row = next(nodes_data["energysystem"].iterrows())[1]
+    timeindex = pandas.date_range(start=row["start date"],
+                                  periods=len(positions),
+                                  freq=row["temporal resolution"])
+    model_timesteps = (int(clusters.max()) + 1) * timesteps
+    for values in energy_system.results["main"].values():
+        sequences = values["sequences"]
+        if len(sequences) == model_timesteps:
+            sequences = sequences.iloc[positions]
+            sequences.index = timeindex
+            values["sequences"] = sequences
+    energy_system.timeindex = timeindex
+    energy_system.timeincrement = None
+
+
 def timeseries_preparation(timeseries_prep_param: list, nodes_data: dict,
                            result_path: str) -> None:
     """
@@ -317,7 +458,10 @@ def timeseries_preparation(timeseries_prep_param: list, nodes_data: dict,
 
         :param timeseries_prep_param: List of timeseries preparation \
             parameters with the scheme [algorithm, cluster_index, \
-            cluster_criterion, cluster_period, cluster_season]
+            cluster_criterion, cluster_period, cluster_season] and \
+            optionally the weights of the multi-attribute clustering \
+            and the error tolerance of the automatic index selection \
+            (cluster_index "auto")
         :type timeseries_prep_param: list
         :param nodes_data: Dictionary containing the energy systems \
             resulting from the user's model definition
@@ -328,7 +472,8 @@ def timeseries_preparation(timeseries_prep_param: list, nodes_data: dict,
     """
     from program_files.preprocessing.data_preparation_algorithms \
         import slicing, downsampling, averaging, heuristic_selection, \
-        random_sampling, k_means_medoids
+        random_sampling, k_means_medoids, segmentation, \
+        cluster_count_selection
     
     data_prep = timeseries_prep_param[0]
     days_per_cluster = timeseries_prep_param[1]
@@ -336,18 +481,39 @@ def timeseries_preparation(timeseries_prep_param: list, nodes_data: dict,
     cluster_criterion = timeseries_prep_param[2]
     cluster_period = timeseries_prep_param[3]
     cluster_seasons = int(timeseries_prep_param[4])
+    cluster_weights = timeseries_prep_param[5] \
+        if len(timeseries_prep_param) > 5 else None
+    error_tolerance = timeseries_prep_param[6] \
+        if len(timeseries_prep_param) > 6 else None
+    # the typical period modes of the k-means and k-medoids algorithm
+    # keep the chronological cluster order
+    typical_periods = data_prep.endswith(" typical periods")
+    data_prep = data_prep.replace(" typical periods", "")
 
     if data_prep != 'none':
         # Adapting Standard Load Profile-Sinks
         slp_sink_adaption(nodes_data=nodes_data)
 
+    # AUTOMATIC INDEX SELECTION
+    # evaluates the candidate indices and selects the smallest model
+    # meeting the error tolerance
+    if str(days_per_cluster) == cluster_count_selection.AUTO_INDEX:
+        days_per_cluster = cluster_count_selection.automatic_index_selection(
+            nodes_data=nodes_data, algorithm=data_prep,
+            criterion=cluster_criterion, period=cluster_period,
+            result_path=result_path, tolerance=error_tolerance,
+            weights=cluster_weights)
+        n_timesteps = days_per_cluster
+
     # K-MEANS ALGORITHM
     if data_prep == 'k_means':
         k_means_medoids.k_means_algorithm(cluster_period=cluster_period,
                                           days_per_cluster=days_per_cluster,
                                           criterion=cluster_criterion,
                                           nodes_data=nodes_data,
-                                          period=cluster_period)
+                                          period=cluster_period,
+                                          weights=cluster_weights,
+                                          typical_periods=typical_periods)
 
     # K-MEDOIDS ALGORITHM
     elif data_prep == 'k_medoids':
@@ -355,7 +521,9 @@ def timeseries_preparation(timeseries_prep_param: list, nodes_data: dict,
                                             days_per_cluster=days_per_cluster,
                                             criterion=cluster_criterion,
                                             nodes_data=nodes_data,
-                                            period=cluster_period)
+                                            period=cluster_period,
+                                            weights=cluster_weights,
+                                            typical_periods=typical_periods)
 
     # AVERAGING ALGORITHM
     elif data_prep == 'averaging':
@@ -398,6 +566,13 @@ def timeseries_preparation(timeseries_prep_param: list, nodes_data: dict,
                                         period=cluster_period,
                                         number_of_samples=int(n_timesteps))
 
+    # SEGMENTATION ALGORITHM
+    # merge consecutive similar timesteps into segments of variable
+    # length
+    elif data_prep == 'segmentation':
+        segmentation.timeseries_segmentation(
+            nodes_data=nodes_data, segment_number=int(n_timesteps))
+
     # ADAPTS THE PARAMETERS OF THE ENERGY SYSTEM
     if data_prep != 'none':
         path = result_path + "/modified_model_definition.xlsx"
@@ -406,4 +581,7 @@ def timeseries_preparation(timeseries_prep_param: list, nodes_data: dict,
         nodes_data['timeseries'].to_excel(writer, sheet_name='time series')
         nodes_data['energysystem'].to_excel(writer, sheet_name='energysystem')
         nodes_data['sinks'].to_excel(writer, sheet_name='sinks')
+        for sheet in [TYPICAL_PERIODS_SHEET, SEGMENTS_SHEET]:
+            if sheet in nodes_data:
+                nodes_data[sheet].to_excel(writer, sheet_name=sheet)
         writer.close()
@@ -0,0 +1,282 @@
+"""
+    Automatic selection of the index (number of clusters, slicing or
+    averaging factor) of the timeseries preparation.
+
+    Instead of guessing the index and comparing several model runs, the
+    candidate indices of the chosen algorithm are evaluated on the
+    period matrix of the merged timeseries and weather data only: for
+    every candidate the year is reconstructed from the representative
+    periods (e.g. every period replaced by the mean period of its
+    cluster) and compared to the original data set by
+
+        - the root mean squared error of the duration curves and
+        - the error of the peak value
+
+    of every column, both relative to the column's value range. The
+    resulting model size is estimated by the number of timesteps and
+    the number of flow variables per timestep of the model definition.
+    The smallest model whose largest duration curve error does not
+    exceed the given error tolerance is selected and the evaluated
+    trade-off between error and model size is stored within
+    cluster_count_selection.csv.
+"""
+import logging
+import os
+import numpy as np
+import pandas
+
+from program_files.preprocessing.data_preparation import \
+    append_timeseries_to_weatherdata_sheet, calculate_period_means, \
+    create_period_matrix
+from program_files.preprocessing.data_preparation_algorithms.\
+    k_means_medoids import calculate_k_means_clusters, \
+    calculate_k_medoids_clusters
+
+# index value of the timeseries preparation activating the selection
+AUTO_INDEX = "auto"
+# default tolerance of the relative duration curve error
+DEFAULT_ERROR_TOLERANCE = 0.05
+# estimated number of flow variables per timestep of every component
+# type of the model definition
+FLOWS_PER_COMPONENT = {"sources": 1, "sinks": 1, "transformers": 2,
+                       "storages": 3, "links": 2}
+
+
+def reconstruct_period_matrix(period_matrix: np.ndarray, algorithm: str,
+                              index: int, cluster_labels=None
+                              ) -> (np.ndarray, int):
+    """
+        Reconstructs the periods of the given period matrix from the
+        representative periods of the given algorithm and index.
+
+        :param period_matrix: (periods x time steps x columns) array
+        :type period_matrix: numpy.ndarray
+        :param algorithm: timeseries preparation algorithm ("k_means", \
+            "k_medoids", "averaging", "slicing A", "slicing B")
+        :type algorithm: str
+        :param index: index of the timeseries preparation
+        :type index: int
+        :param cluster_labels: cluster label of every period, required \
+            by the k_means and k_medoids algorithm
+        :type cluster_labels: np.array
+
+        :return: - **reconstruction** (numpy.ndarray) - reconstructed \
+                    period matrix
+                 - **representatives** (int) - number of \
+                    representative periods within the model
+
+        :raise: - **ValueError** - Error raised if the algorithm is \
+            not supported
+    """
+    periods = np.arange(period_matrix.shape[0])
+    if algorithm in ["k_means", "k_medoids", "averaging"]:
+        # averaging merges consecutive periods into one cluster
+        if algorithm == "averaging":
+            cluster_labels = periods // index
+        cluster_labels = np.asarray(cluster_labels, dtype=int)
+        clusters = int(cluster_labels.max()) + 1
+        means = calculate_period_means(period_matrix=period_matrix,
+                                       cluster_number=clusters,
+                                       cluster_labels=cluster_labels)
+        return means[cluster_labels], clusters
+    # every n-th period is used for the n periods starting with it
+    if algorithm == "slicing A":
+        representatives = (periods // index) * index
+    # every n-th period is removed and replaced by its predecessor
+    elif algorithm == "slicing B":
+        representatives = np.where(periods % index == index - 1,
+                                   periods - 1, periods)
+    else:
+        raise ValueError("The automatic index selection does not support "
+                         "the algorithm " + str(algorithm) + ".")
+    return period_matrix[representatives], len(np.unique(representatives))
+
+
+def calculate_reconstruction_errors(period_matrix: np.ndarray,
+                                    reconstruction: np.ndarray,
+                                    column_names: list) -> dict:
+    """
+        Returns the relative duration curve RMSE and peak error of
+        every non-constant column of the reconstructed period matrix.
+
+        :param period_matrix: original (periods x time steps x \
+            columns) array
+        :type period_matrix: numpy.ndarray
+        :param reconstruction: reconstructed period matrix
+        :type reconstruction: numpy.ndarray
+        :param column_names: names of the matrix' columns
+        :type column_names: list
+
+        :return: - **errors** (dict) - "duration curve RMSE <column>" \
+            and "peak error <column>" of every column
+    """
+    original = period_matrix.reshape(-1, len(column_names)).astype(float)
+    reconstructed = reconstruction.reshape(-1, len(column_names))
+    value_range = original.max(axis=0) - original.min(axis=0)
+    duration_curve_errors = np.sqrt(np.mean(
+        (np.sort(original, axis=0) - np.sort(reconstructed, axis=0)) ** 2,
+        axis=0))
+    peak_errors = np.abs(original.max(axis=0) - reconstructed.max(axis=0))
+    errors = {}
+    for number, column in enumerate(column_names):
+        if value_range[number] > 0:
+            errors["duration curve RMSE " + str(column)] = \
+                duration_curve_errors[number] / value_range[number]
+            errors["peak error " + str(column)] = \
+                peak_errors[number] / value_range[number]
+    return errors
+
+
+def count_flows_per_timestep(nodes_data: dict) -> int:
+    """
+        Estimates the number of flow variables per timestep by the
+        active components of the model definition.
+
+        :param nodes_data: dictionary containing the excel worksheets \
+            from the used model definition workbook
+        :type nodes_data: dict
+
+        :return: - **-** (int) - estimated number of flow variables
+    """
+    return sum(int((nodes_data[sheet]["active"] == 1).sum()) * flows
+               for sheet, flows in FLOWS_PER_COMPONENT.items()
+               if sheet in nodes_data
+               and "active" in nodes_data[sheet].columns)
+
+
+def evaluate_indices(nodes_data: dict, algorithm: str, criterion: str,
+                     period: str, weights=None) -> pandas.DataFrame:
+    """
+        Evaluates the candidate indices of the given algorithm, i.e.
+        every index resulting in a different number of representative
+        periods.
+
+        :param nodes_data: dictionary containing the excel worksheets \
+            from the used model definition workbook
+        :type nodes_data: dict
+        :param algorithm: timeseries preparation algorithm
+        :type algorithm: str
+        :param criterion: cluster criterion of the k_means and \
+            k_medoids algorithm
+        :type criterion: str
+        :param period: period type (hours, days, weeks)
+        :type period: str
+        :param weights: weights of the multi-attribute clustering
+        :type weights: dict
+
+        :return: - **evaluation** (pandas.DataFrame) - index, number of \
+            representative periods, timesteps, estimated flow \
+            variables and errors of every candidate
+    """
+    # the clustering algorithms cluster the merged data sets
+    data_set = append_timeseries_to_weatherdata_sheet(
+        {"timeseries": nodes_data["timeseries"].copy(),
+         "weather data": nodes_data["weather data"].copy()})
+    column_names = list(data_set.select_dtypes(include="number").columns)
+    period_matrix = create_period_matrix(data_set=data_set, period=period,
+                                         column_names=column_names)
+    periods, timesteps = period_matrix.shape[:2]
+    flows = count_flows_per_timestep(nodes_data=nodes_data)
+
+    evaluation = []
+    evaluated_counts = set()
+    # removing every period (slicing B with index 1) is not possible
+    for index in range(2 if algorithm == "slicing B" else 1, periods + 1):
+        count = periods // index
+        if count in evaluated_counts:
+            continue
+        evaluated_counts.add(count)
+        cluster_labels = None
+        if algorithm in ["k_means", "k_medoids"]:
+            cluster_algorithm = calculate_k_means_clusters \
+                if algorithm == "k_means" else calculate_k_medoids_clusters
+            cluster_labels = cluster_algorithm(
+                cluster_number=count, weather_data=data_set,
+                cluster_criterion=criterion, period=period,
+                sinks=nodes_data.get("sinks"), weights=weights)
+        reconstruction, representatives = reconstruct_period_matrix(
+            period_matrix=period_matrix, algorithm=algorithm, index=index,
+            cluster_labels=cluster_labels)
+        errors = calculate_reconstruction_errors(
+            period_matrix=period_matrix, reconstruction=reconstruction,
+            column_names=column_names)
+        evaluation.append({
+            "index": index,
+            "representative periods": representatives,
+            "timesteps": representatives * timesteps,
+            "estimated flow variables": representatives * timesteps * flows,
+            "max. duration curve RMSE": max(
+                [value for key, value in errors.items()
+                 if key.startswith("duration curve RMSE")], default=0.0),
+            **errors})
+    return pandas.DataFrame(evaluation).sort_values("timesteps",
+                                                    ignore_index=True)
+
+
+def select_index(evaluation: pandas.DataFrame, tolerance: float) -> int:
+    """
+        Returns the index of the smallest model whose largest duration
+        curve error does not exceed the given tolerance, the index of
+        the largest model if no candidate meets the tolerance.
+
+        :param evaluation: evaluated candidates (see evaluate_indices)
+        :type evaluation: pandas.DataFrame
+        :param tolerance: tolerance of the relative duration curve RMSE
+        :type tolerance: float
+
+        :return: - **-** (int) - selected index
+    """
+    feasible = evaluation[evaluation["max. duration curve RMSE"]
+                          <= tolerance]
+    if feasible.empty:
+        logging.warning("\t No index meets the error tolerance of "
+                        + str(tolerance) + ", the largest model is used.")
+        return int(evaluation["index"].iloc[-1])
+    return int(feasible["index"].iloc[0])
+
+
+def automatic_index_selection(nodes_data: dict, algorithm: str,
+                              criterion: str, period: str, result_path: str,
+                              tolerance=None, weights=None) -> int:
+    """
+        Evaluates the candidate indices of the given algorithm, selects
+        the smallest model meeting the error tolerance and stores the
+        evaluation within result_path/cluster_count_selection.csv.
+
+        :param nodes_data: dictionary containing the excel worksheets \
+            from the used model definition workbook
+        :type nodes_data: dict
+        :param algorithm: timeseries preparation algorithm
+        :type algorithm: str
+        :param criterion: cluster criterion of the k_means and \
+            k_medoids algorithm
+        :type criterion: str
+        :param period: period type (hours, days, weeks)
+        :type period: str
+        :param result_path: path of the run's result folder
+        :type result_path: str
+        :param tolerance: tolerance of the relative duration curve \
+            RMSE, if None DEFAULT_ERROR_TOLERANCE is used
+        :type tolerance: float
+        :param weights: weights of the multi-attribute clustering
+        :type weights: dict
+
+        :return: - **index** (int) - selected index
+    """
+    tolerance = DEFAULT_ERROR_TOLERANCE if tolerance is None \
+        else float(tolerance)
+    evaluation = evaluate_indices(nodes_data=nodes_data, algorithm=algorithm,
+                                  criterion=criterion, period=period,
+                                  weights=weights)
+    index = select_index(evaluation=evaluation, tolerance=tolerance)
+    evaluation["selected"] = evaluation["index"] == index
+    evaluation.to_csv(os.path.join(result_path,
+                                   "cluster_count_selection.csv"),
+                      index=False)
+    selected = evaluation[evaluation["selected"]].iloc[0]
+    logging.info("\t Selected index " + str(index) + " of "
+                 + str(len(evaluation)) + " evaluated candidates: "
+                 + str(int(selected["timesteps"])) + " timesteps, "
+                 + "max. duration curve RMSE "
+                 + str(round(selected["max. duration curve RMSE"], 4)))
+    return index
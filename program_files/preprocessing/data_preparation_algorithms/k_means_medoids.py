@@ -1,6 +1,8 @@
 """
     Christian Klemm - christian.klemm@fh-muenster.de
 """
+import hashlib
+import json
 import pandas
 import numpy as np
 import logging
@@ -12,12 +14,160 @@ from sklearn.neighbors import KNeighborsClassifier
 from program_files.preprocessing.data_preparation \
     import calculate_cluster_means, append_timeseries_to_weatherdata_sheet,\
     variable_costs_date_adaption, extract_single_periods, \
-    timeseries_adaption
+    timeseries_adaption, create_period_matrix, store_cluster_order
+
+# cluster criterion of the clustering on several weighted attributes
+MULTI_ATTRIBUTE_CRITERION = "multi-attribute"
+# attributes of the multi-attribute clustering and their default
+# weights, the demand attributes are the summed demand timeseries of
+# the sinks of the respective sector
+DEFAULT_FEATURE_WEIGHTS = {"temperature": 1, "ghi": 1, "windspeed": 1,
+                           "electricity demand": 1, "heat demand": 1}
+# sinks sector of the demand attributes
+DEMAND_FEATURES = {"electricity demand": "electricity",
+                   "heat demand": "heat"}
+# feature matrices of previously clustered data sets by their hash
+FEATURE_CACHE = {}
+# maximum number of cached feature matrices
+FEATURE_CACHE_SIZE = 8
+
+
+def calculate_demand_sums(data_set: pandas.DataFrame, sinks: pandas.DataFrame
+                          ) -> pandas.DataFrame:
+    """
+        Sums up the demand timeseries (timeseries column times nominal
+        value) of the active sinks of every sector of
+        DEMAND_FEATURES.
+
+        :param data_set: timeseries holding the "<sink label>.fix" \
+            columns
+        :type data_set: pandas.DataFrame
+        :param sinks: sinks sheet of the model definition
+        :type sinks: pandas.DataFrame
+
+        :return: - **-** (pandas.DataFrame) - summed demand of every \
+            sector which has at least one timeseries sink
+    """
+    demand_sums = {}
+    for num, sink in sinks.iterrows():
+        column = str(sink["label"]) + ".fix"
+        if sink.get("active", 1) != 1 or column not in data_set:
+            continue
+        for feature, sector in DEMAND_FEATURES.items():
+            if sink.get("sector") == sector:
+                demand = data_set[column].to_numpy(dtype=float) \
+                    * float(sink["nominal value"])
+                demand_sums[feature] = demand_sums.get(feature, 0) + demand
+    return pandas.DataFrame(demand_sums)
+
+
+def create_feature_matrix(data_set: pandas.DataFrame,
+                          sinks: pandas.DataFrame, period: str,
+                          weights=None) -> np.ndarray:
+    """
+        Creates the feature matrix of the multi-attribute clustering.
+        Every attribute (weather data column or summed demand) is
+        normalized to [0, 1] and multiplied by the square root of its
+        weight, so that the weight scales its share of the squared
+        distances minimized by the clustering. The vectors of all
+        attributes of a period are concatenated. Attributes which are
+        not part of the data set or have a weight of 0 are skipped.
+        The feature matrices are cached, thus the extraction is only
+        done once for the same data set.
+
+        :param data_set: merged weather data and timeseries (see \
+            append_timeseries_to_weatherdata_sheet)
+        :type data_set: pandas.DataFrame
+        :param sinks: sinks sheet of the model definition
+        :type sinks: pandas.DataFrame
+        :param period: defines rather days or weeks were selected
+        :type period: str
+        :param weights: weights of the attributes, if None \
+            DEFAULT_FEATURE_WEIGHTS are used
+        :type weights: dict
+
+        :return: - **-** (numpy.ndarray) - (periods x (time steps * \
+            attributes)) feature matrix
+
+        :raise: - **ValueError** - Error raised if none of the \
+            attributes is available
+    """
+    weights = dict(weights or DEFAULT_FEATURE_WEIGHTS)
+    features = pandas.concat(
+        [data_set[[column for column in weights
+                   if column in data_set and column not in DEMAND_FEATURES]
+                  ].reset_index(drop=True),
+         calculate_demand_sums(data_set=data_set, sinks=sinks)], axis=1)
+    features = features[[column for column in features
+                         if float(weights.get(column, 0)) > 0]]
+    if features.empty:
+        raise ValueError("None of the multi-attribute clustering "
+                         "attributes " + str(list(weights))
+                         + " is available.")
+
+    key = hashlib.sha256(
+        pandas.util.hash_pandas_object(features, index=False).to_numpy()
+        .tobytes())
+    key.update(json.dumps([period, sorted(weights.items())]).encode())
+    key = key.hexdigest()
+    if key not in FEATURE_CACHE:
+        values = features.to_numpy(dtype=float)
+        value_range = values.max(axis=0) - values.min(axis=0)
+        # constant attributes do not distinguish the periods
+        value_range[value_range == 0] = 1
+        values = (values - values.min(axis=0)) / value_range \
+            * np.sqrt([float(weights[column]) for column in features])
+        period_matrix = create_period_matrix(
+            data_set=pandas.DataFrame(values), period=period,
+            column_names=list(range(values.shape[1])))
+        if len(FEATURE_CACHE) >= FEATURE_CACHE_SIZE:
+            FEATURE_CACHE.clear()
+        FEATURE_CACHE[key] = period_matrix.transpose(0, 2, 1).reshape(
+            len(period_matrix), -1)
+    logging.info("\t Multi-attribute clustering on: "
+                 + ", ".join(str(column) for column in features.columns))
+    return FEATURE_CACHE[key]
+
+
+def get_cluster_vectors(weather_data: pandas.DataFrame,
+                        cluster_criterion: str, period: str, sinks=None,
+                        weights=None) -> np.ndarray:
+    """
+        Returns the vectors the periods are clustered by, i.e. the
+        values of the cluster criterion column or the feature matrix
+        of the multi-attribute clustering.
+
+        :param weather_data: weather_data, the clusters should be \
+            applied to
+        :type weather_data: pandas.DataFrame
+        :param cluster_criterion: weather_parameter/column name which \
+            should be applied as cluster criterion or \
+            MULTI_ATTRIBUTE_CRITERION
+        :type cluster_criterion: str
+        :param period: defines rather days or weeks were selected
+        :type period: str
+        :param sinks: sinks sheet of the model definition used for the \
+            demand attributes of the multi-attribute clustering
+        :type sinks: pandas.DataFrame
+        :param weights: weights of the multi-attribute clustering
+        :type weights: dict
+
+        :return: - **-** (numpy.ndarray) - vector of every period
+    """
+    if cluster_criterion == MULTI_ATTRIBUTE_CRITERION:
+        return create_feature_matrix(
+            data_set=weather_data,
+            sinks=sinks if sinks is not None else pandas.DataFrame(),
+            period=period, weights=weights)
+    return extract_single_periods(data_set=weather_data,
+                                  column_name=cluster_criterion,
+                                  period=period)
 
 
 def calculate_k_means_clusters(cluster_number: int,
                                weather_data: pandas.DataFrame,
-                               cluster_criterion: str, period: str
+                               cluster_criterion: str, period: str,
+                               sinks=None, weights=None
                                ) -> np.array:
     """
         Applies the k-means algorithm to a list of day-weather-vectors.
@@ -32,14 +182,19 @@ def calculate_k_means_clusters(cluster_number: int,
         :type cluster_criterion: str
         :param period: defines rather days or weeks were selected
         :type period: str
+        :param sinks: sinks sheet of the model definition (see \
+            get_cluster_vectors)
+        :type sinks: pandas.DataFrame
+        :param weights: weights of the multi-attribute clustering
+        :type weights: dict
 
         :return: - **model.labels_** (np.array) - Chronological list, \
             which days of the weather data set belongs to which cluster
 
     """
-    cluster_vectors = extract_single_periods(data_set=weather_data,
-                                             column_name=cluster_criterion,
-                                             period=period)
+    cluster_vectors = get_cluster_vectors(
+        weather_data=weather_data, cluster_criterion=cluster_criterion,
+        period=period, sinks=sinks, weights=weights)
     kmeans = KMeans(n_clusters=cluster_number)
     model = kmeans.fit(cluster_vectors)
     return model.labels_
@@ -47,7 +202,8 @@ def calculate_k_means_clusters(cluster_number: int,
 
 def calculate_k_medoids_clusters(cluster_number: int,
                                  weather_data: pandas.DataFrame,
-                                 cluster_criterion: str, period: str
+                                 cluster_criterion: str, period: str,
+                                 sinks=None, weights=None
                                  ) -> np.array:
     """
         Applies the k-medoids algorithm to a list of
@@ -64,14 +220,19 @@ def calculate_k_medoids_clusters(cluster_number: int,
         :type cluster_criterion: str
         :param period: defines rather days or weeks were selected
         :type period: str
+        :param sinks: sinks sheet of the model definition (see \
+            get_cluster_vectors)
+        :type sinks: pandas.DataFrame
+        :param weights: weights of the multi-attribute clustering
+        :type weights: dict
 
         :return: - **model.labels_** (np.array) - Chronological list, \
             which days of the weather data set belongs to which cluster
 
     """
-    cluster_vectors = extract_single_periods(data_set=weather_data,
-                                             column_name=cluster_criterion,
-                                             period=period)
+    cluster_vectors = get_cluster_vectors(
+        weather_data=weather_data, cluster_criterion=cluster_criterion,
+        period=period, sinks=sinks, weights=weights)
     kmedoids = KMedoids(n_clusters=cluster_number)
     model = kmedoids.fit(cluster_vectors)
     return model.labels_
@@ -121,7 +282,8 @@ def k_medoids_timeseries_adaption(nodes_data: dict, clusters: int,
 
 
 def k_means_algorithm(cluster_period: int, days_per_cluster: int,
-                      criterion: str, nodes_data: dict, period: str) -> None:
+                      criterion: str, nodes_data: dict, period: str,
+                      weights=None, typical_periods=False) -> None:
     """
         identifies k-cluster periods based on the k-means algorithm
         based on a given criteria. Based on the selected periods, for
@@ -132,7 +294,9 @@ def k_means_algorithm(cluster_period: int, days_per_cluster: int,
         multiplied by the shortening factor (variable cost factor) of
         the time-series to ensure the same ratio between variable and
         periodical costs for the energy system optimization model in
-        which the time-series will be applied.
+        which the time-series will be applied. In the typical period
+        mode the typical periods are weighted by their occurrence
+        within the model instead.
         
         :param cluster_period: contains the gui input of the chosen \
             period type (possible entries: days, weeks)
@@ -147,6 +311,15 @@ def k_means_algorithm(cluster_period: int, days_per_cluster: int,
         :type nodes_data: dict
         :param period: defines rather days or weeks were selected
         :type period: str
+        :param weights: weights of the attributes of the \
+            multi-attribute clustering (criterion \
+            MULTI_ATTRIBUTE_CRITERION), if None \
+            DEFAULT_FEATURE_WEIGHTS are used
+        :type weights: dict
+        :param typical_periods: if True the chronological cluster \
+            order is stored to link the storages of the typical \
+            periods (see store_cluster_order)
+        :type typical_periods: bool
         
         :raise: - **ValueError** - Error raised if the chosen period \
             is not supported
@@ -174,7 +347,9 @@ def k_means_algorithm(cluster_period: int, days_per_cluster: int,
     cluster_labels = calculate_k_means_clusters(cluster_number=clusters,
                                                 weather_data=weather_data,
                                                 cluster_criterion=criterion,
-                                                period=period)
+                                                period=period,
+                                                sinks=nodes_data["sinks"],
+                                                weights=weights)
     
     weather_data = nodes_data['weather data'].copy()
     
@@ -191,12 +366,16 @@ def k_means_algorithm(cluster_period: int, days_per_cluster: int,
     nodes_data['weather data'] = prep_weather_data
     
     # Adapts Other Parameters (despite weather data) of the energy system
-    variable_costs_date_adaption(nodes_data, clusters, period)
+    variable_costs_date_adaption(nodes_data, clusters, period,
+                                 typical_periods=typical_periods)
     timeseries_adaption(nodes_data, clusters, cluster_labels, period)
+    if typical_periods:
+        store_cluster_order(nodes_data, cluster_labels, period)
     
     
 def k_medoids_algorithm(cluster_period: int, days_per_cluster: int,
-                        criterion: str, nodes_data: dict, period: str) -> None:
+                        criterion: str, nodes_data: dict, period: str,
+                        weights=None, typical_periods=False) -> None:
     """
         identifies k-cluster periods based on the k-medoids algorithm
         based on a given criteria. Based on the selected periods, for
@@ -207,7 +386,9 @@ def k_medoids_algorithm(cluster_period: int, days_per_cluster: int,
         multiplied by the shortening factor (variable cost factor) of
         the time-series to ensure the same ratio between variable and
         periodical costs for the energy system optimization model in
-        which the time-series will be applied.
+        which the time-series will be applied. In the typical period
+        mode the typical periods are weighted by their occurrence
+        within the model instead.
         
         :param cluster_period: contains the gui input of the chosen \
             period type (possible entries: hours, days, weeks)
@@ -222,6 +403,15 @@ def k_medoids_algorithm(cluster_period: int, days_per_cluster: int,
         :type nodes_data: dict
         :param period: defines rather days or weeks were selected
         :type period: str
+        :param weights: weights of the attributes of the \
+            multi-attribute clustering (criterion \
+            MULTI_ATTRIBUTE_CRITERION), if None \
+            DEFAULT_FEATURE_WEIGHTS are used
+        :type weights: dict
+        :param typical_periods: if True the chronological cluster \
+            order is stored to link the storages of the typical \
+            periods (see store_cluster_order)
+        :type typical_periods: bool
         
         :raise: - **ValueError** - Error raised if the chosen period \
             is not supported
@@ -247,14 +437,19 @@ def k_medoids_algorithm(cluster_period: int, days_per_cluster: int,
     cluster_labels = calculate_k_medoids_clusters(cluster_number=clusters,
                                                   weather_data=weather_data,
                                                   cluster_criterion=criterion,
-                                                  period=period)
+                                                  period=period,
+                                                  sinks=nodes_data["sinks"],
+                                                  weights=weights)
 
     weather_data = nodes_data['timeseries'].copy()
     nodes_data['weather data'] = weather_data
     nodes_data['timeseries'] = weather_data
 
     # Adapts Other Parameters (despite weather data) of the energy system
-    variable_costs_date_adaption(nodes_data, clusters, period)
+    variable_costs_date_adaption(nodes_data, clusters, period,
+                                 typical_periods=typical_periods)
 
     k_medoids_timeseries_adaption(nodes_data, clusters,
                                   cluster_labels, period)
+    if typical_periods:
+        store_cluster_order(nodes_data, cluster_labels, period)
@@ -3,10 +3,12 @@
 """
 
 import random
+import numpy as np
 import pandas
 
 from program_files.preprocessing.data_preparation \
-    import variable_costs_date_adaption, extract_single_periods
+    import variable_costs_date_adaption, extract_single_periods, \
+    create_period_matrix, period_matrix_to_data_set
 
 
 def create_new_random_data_set(random_integers: list,
@@ -33,28 +35,17 @@ def create_new_random_data_set(random_integers: list,
         :return: - **prep_data_set** (pandas.DataFrame) - dataframe \
             containing the sampled data dataframe
     """
-    column_names = [data_set.columns[i]
-                    for i in range(1, len(data_set.columns))]
-    # create an empty DataFrame for upcoming adaption
-    prep_data_set = pandas.DataFrame()
-    
-    for index in range(len(column_names)):
-        # Extract individual weather data set for the current weather
-        # data column
-        data_set_column = extract_single_periods(
-            data_set=data_set,
-            column_name=column_names[index],
-            period=period)
-
-        reference_data_set = []
-        for r_index in range(len(random_integers)):
-            column = r_index if weatherdata_or_timeseries \
-                else random_integers[r_index]
-            reference_data_set += data_set_column[column]
-
-        # Appends the calculated reference days for the current weather
-        # data column to the final weather data set
-        prep_data_set[column_names[index]] = reference_data_set
+    column_names = list(data_set.columns[1:])
+    # all columns are reshaped at once and the sampled periods are
+    # selected by one indexing operation
+    period_matrix = create_period_matrix(data_set=data_set, period=period,
+                                         column_names=column_names)
+    if weatherdata_or_timeseries:
+        periods = np.arange(len(random_integers))
+    else:
+        periods = np.asarray(random_integers, dtype=int)
+    prep_data_set = period_matrix_to_data_set(
+        period_matrix=period_matrix[periods], column_names=column_names)
     
     return prep_data_set
 
@@ -0,0 +1,252 @@
+"""
+    Adaptive temporal segmentation of the timeseries and weather data.
+
+    Downsampling and averaging reduce the temporal resolution uniformly,
+    i.e. peaks and ramps are cut or smoothed regardless of the profile.
+    The segmentation instead merges consecutive similar timesteps into
+    segments of variable length: starting with one segment per
+    timestep, the two adjacent segments whose merge increases the
+    squared deviation of all (min-max normalized) timeseries columns
+    from their segment means the least are merged (Ward criterion)
+    until the given number of segments is reached. Every segment is
+    represented by the mean of its timesteps.
+
+    The length of the segments is stored within the sheet
+    SEGMENTS_SHEET of nodes_data and used as timeincrement of the
+    energy system, thus the flows, variable costs and emissions are
+    weighted by the segment length and no variable cost factor is
+    needed. After the optimization the results are expanded to the
+    original timesteps, so that the postprocessing remains unchanged.
+"""
+import heapq
+import logging
+import numpy as np
+import pandas
+
+from program_files.preprocessing.data_preparation import SEGMENTS_SHEET
+
+
+def create_normalized_matrix(data_sets: list) -> np.ndarray:
+    """
+        Concatenates the numeric columns of the given data sets and
+        normalizes every column to values between 0 and 1, constant
+        columns are dropped.
+
+        :param data_sets: data sets of the same length
+        :type data_sets: list
+
+        :return: - **matrix** (numpy.ndarray) - (timesteps x columns) \
+            matrix of the normalized columns
+    """
+    matrix = np.concatenate(
+        [data_set.select_dtypes(include="number").to_numpy(dtype=float)
+         for data_set in data_sets], axis=1)
+    value_range = matrix.max(axis=0) - matrix.min(axis=0)
+    matrix = matrix[:, value_range > 0]
+    return (matrix - matrix.min(axis=0)) / value_range[value_range > 0]
+
+
+def calculate_segment_durations(matrix: np.ndarray, segment_number: int
+                                ) -> list:
+    """
+        Merges the consecutive timesteps of the given matrix into the
+        given number of segments (see module description).
+
+        :param matrix: (timesteps x columns) matrix of the profiles
+        :type matrix: numpy.ndarray
+        :param segment_number: number of segments to be created
+        :type segment_number: int
+
+        :return: - **durations** (list) - number of timesteps of every \
+            segment in chronological order
+
+        :raise: - **ValueError** - Error raised if the number of \
+            segments is not between 1 and the number of timesteps
+    """
+    timesteps = len(matrix)
+    if not 1 <= segment_number <= timesteps:
+        raise ValueError("The number of segments has to be between 1 and "
+                         + str(timesteps) + ".")
+    sizes = [1] * timesteps
+    sums = [row for row in np.array(matrix, dtype=float)]
+    previous = list(range(-1, timesteps - 1))
+    following = list(range(1, timesteps + 1))
+    versions = [0] * timesteps
+
+    def merge_costs(left: int, right: int) -> float:
+        difference = sums[left] / sizes[left] - sums[right] / sizes[right]
+        return sizes[left] * sizes[right] / (sizes[left] + sizes[right]) \
+            * float(difference @ difference)
+
+    heap = [(merge_costs(left, left + 1), left, 0, 0)
+            for left in range(timesteps - 1)]
+    heapq.heapify(heap)
+    segments = timesteps
+    while segments > segment_number:
+        costs, left, left_version, right_version = heapq.heappop(heap)
+        right = following[left]
+        # skip merges of segments changed since the costs were computed
+        if sizes[left] == 0 or versions[left] != left_version \
+                or right >= timesteps or versions[right] != right_version:
+            continue
+        # merge the right segment into the left one
+        sizes[left] += sizes[right]
+        sums[left] = sums[left] + sums[right]
+        sizes[right] = 0
+        versions[left] += 1
+        following[left] = following[right]
+        if following[left] < timesteps:
+            previous[following[left]] = left
+        segments -= 1
+        for neighbour_left, neighbour_right in [(previous[left], left),
+                                                (left, following[left])]:
+            if neighbour_left >= 0 and neighbour_right < timesteps:
+                heapq.heappush(heap, (
+                    merge_costs(neighbour_left, neighbour_right),
+                    neighbour_left, versions[neighbour_left],
+                    versions[neighbour_right]))
+    return [size for size in sizes if size > 0]
+
+
+def segment_data_set(data_set: pandas.DataFrame, durations: list
+                     ) -> pandas.DataFrame:
+    """
+        Replaces the timesteps of every segment by their mean, the
+        timestamp of a segment is the timestamp of its first timestep.
+
+        :param data_set: timeseries or weather data set
+        :type data_set: pandas.DataFrame
+        :param durations: number of timesteps of every segment
+        :type durations: list
+
+        :return: - **segmented_data_set** (pandas.DataFrame) - data set \
+            holding one row per segment
+    """
+    starts = np.cumsum([0] + list(durations))[:-1]
+    segmented_data_set = data_set.iloc[starts].reset_index(drop=True)
+    for column in data_set.select_dtypes(include="number").columns:
+        segmented_data_set[column] = \
+            np.add.reduceat(data_set[column].to_numpy(dtype=float), starts) \
+            / np.array(durations)
+    return segmented_data_set
+
+
+def calculate_segmentation_error(matrix: np.ndarray, durations: list
+                                 ) -> float:
+    """
+        Returns the root mean squared deviation of the normalized
+        profiles from their segment means.
+
+        :param matrix: (timesteps x columns) matrix of the normalized \
+            profiles
+        :type matrix: numpy.ndarray
+        :param durations: number of timesteps of every segment
+        :type durations: list
+
+        :return: - **-** (float) - root mean squared error
+    """
+    starts = np.cumsum([0] + list(durations))[:-1]
+    means = np.add.reduceat(matrix, starts, axis=0) \
+        / np.array(durations)[:, np.newaxis]
+    deviation = matrix - np.repeat(means, durations, axis=0)
+    return float(np.sqrt(np.mean(deviation ** 2))) if deviation.size else 0.0
+
+
+def timeseries_segmentation(nodes_data: dict, segment_number: int) -> None:
+    """
+        Segments the timeseries and weather data of the model
+        definition into the given number of segments of variable length
+        and stores the segments within the sheet SEGMENTS_SHEET.
+
+        :param nodes_data: dictionary containing the excel worksheets \
+            from the used model definition workbook, changed in place
+        :type nodes_data: dict
+        :param segment_number: number of segments to be created
+        :type segment_number: int
+    """
+    matrix = create_normalized_matrix(
+        data_sets=[nodes_data["timeseries"], nodes_data["weather data"]])
+    durations = calculate_segment_durations(matrix=matrix,
+                                            segment_number=segment_number)
+    for sheet in ["timeseries", "weather data"]:
+        nodes_data[sheet] = segment_data_set(data_set=nodes_data[sheet],
+                                             durations=durations)
+    nodes_data[SEGMENTS_SHEET] = pandas.DataFrame({
+        "segment": range(len(durations)),
+        "first timestep": np.cumsum([0] + durations)[:-1],
+        "duration": durations})
+    # the number of timesteps of the model equals the number of segments
+    nodes_data["energysystem"]["periods"] = len(durations)
+
+    logging.info("\t " + str(len(matrix)) + " timesteps segmented into "
+                 + str(len(durations)) + " segments (maximum length "
+                 + str(max(durations)) + "), profile RMSE: "
+                 + str(round(calculate_segmentation_error(matrix, durations),
+                             4)))
+
+
+def get_original_timeindex(nodes_data: dict) -> pandas.DatetimeIndex:
+    """
+        Returns the time index of the model definition's energysystem
+        sheet, i.e. the timesteps before the segmentation.
+
+        :param nodes_data: dictionary containing the excel worksheets \
+            from the used model definition workbook
+        :type nodes_data: dict
+
+        :return: - **-** (pandas.DatetimeIndex) - original time index
+    """
+    row = next(nodes_data["energysystem"].iterrows())[1]
+    return pandas.date_range(start=row["start date"], end=row["end date"],
+                             freq=row["temporal resolution"])
+
+
+def get_segment_timeindex(nodes_data: dict) -> (pandas.DatetimeIndex, list):
+    """
+        Returns the time index of the segments (the timestamps of their
+        first timesteps) and their length in hours used as
+        timeincrement of the energy system.
+
+        :param nodes_data: dictionary containing the excel worksheets \
+            from the used model definition workbook including the \
+            sheet SEGMENTS_SHEET
+        :type nodes_data: dict
+
+        :return: - **timeindex** (pandas.DatetimeIndex) - time index \
+                    of the segments
+                 - **timeincrement** (list) - length of every segment \
+                    in hours
+    """
+    original_timeindex = get_original_timeindex(nodes_data=nodes_data)
+    segments = nodes_data[SEGMENTS_SHEET]
+    hours = original_timeindex.freq.nanos / 3.6e12
+    return (original_timeindex[segments["first timestep"].to_numpy()],
+            [float(duration) * hours for duration in segments["duration"]])
+
+
+def expand_segmented_results(energy_system, nodes_data: dict) -> None:
+    """
+        Expands the result sequences of an energy system built on
+        segments to the original timesteps by repeating every segment's
+        value for each of its timesteps.
+
+        :param energy_system: optimized energy system holding its main \
+            results, changed in place
+        :type energy_system: oemof.solph.EnergySystem
+        :param nodes_data: dictionary containing the excel worksheets \
+            from the used model definition workbook including the \
+            sheet SEGMENTS_SHEET
+        :type nodes_data: dict
+    """
+    durations = list(nodes_data[SEGMENTS_SHEET]["duration"])
+    positions = np.repeat(np.arange(len(durations)), durations)
+    timeindex = get_original_timeindex(nodes_data=nodes_data)[
+        :len(positions)]
+    for values in energy_system.results["main"].values():
+        sequences = values["sequences"]
+        if len(sequences) == len(durations):
+            sequences = sequences.iloc[positions]
+            sequences.index = timeindex
+            values["sequences"] = sequences
+    energy_system.timeindex = timeindex
+    energy_system.timeincrement = None
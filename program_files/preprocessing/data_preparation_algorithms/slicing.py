@@ -1,10 +1,12 @@
 """
     Christian Klemm - christian.klemm@fh-muenster.de
 """
+import numpy as np
 import pandas
 
 from program_files.preprocessing.data_preparation \
-    import extract_single_periods, variable_costs_date_adaption
+    import variable_costs_date_adaption, create_period_matrix, \
+    period_matrix_to_data_set
 
 
 def adaption_energy_system_parameter(prep_weather_data: pandas.DataFrame,
@@ -68,34 +70,18 @@ def data_set_slicing(n_days: int, data_set: pandas.DataFrame, period: str
             sliced pandas.DataFrame
     """
     
-    column_names = [data_set.columns[i] for i in
-                    range(1, len(data_set.columns))]
+    column_names = list(data_set.columns[1:])
+    period_matrix = create_period_matrix(data_set=data_set, period=period,
+                                         column_names=column_names)
     
-    prep_data_set = pandas.DataFrame()
+    # If the data set is not divisible by the corresponding number
+    # of periods, the data set is shortened accordingly
+    periods = len(period_matrix) - len(period_matrix) % n_days
     
-    # Loop for every column of the weather data set
-    for i in range(len(column_names)):
-        # Extract individual weather data set for the current weather
-        # data column
-        data_set_column = extract_single_periods(data_set=data_set,
-                                                 column_name=column_names[i],
-                                                 period=period)
-        
-        # If the data set is not divisible by the corresponding number
-        # of periods, the data set is shortened accordingly
-        if len(data_set_column) % n_days > 0:
-            data_set_column = \
-                data_set_column[0:-(len(data_set_column) % n_days)]
-        
-        sliced_column = data_set_column[0::n_days]
-        
-        reference_data_set = []
-        for j in range(len(sliced_column)):
-            reference_data_set = reference_data_set + sliced_column[j]
-        
-        # Appends the calculated reference days for the current weather
-        # data column to the final weather data set
-        prep_data_set[column_names[i]] = reference_data_set
+    # Appends every n-th period of all columns to the final data set
+    prep_data_set = period_matrix_to_data_set(
+        period_matrix=period_matrix[0:periods:n_days],
+        column_names=column_names)
     
     return prep_data_set
 
@@ -117,35 +103,19 @@ def data_set_slicing2(n_days: int, data_set: pandas.DataFrame, period: str
             sliced pandas.DataFrame
     """
     
-    column_names = [data_set.columns[i] for i in
-                    range(1, len(data_set.columns))]
+    column_names = list(data_set.columns[1:])
+    period_matrix = create_period_matrix(data_set=data_set, period=period,
+                                         column_names=column_names)
     
-    prep_data_set = pandas.DataFrame()
+    # If the data set is not divisible by the corresponding number
+    # of periods, the data set is shortened accordingly
+    periods = len(period_matrix) - len(period_matrix) % n_days
     
-    # Loop for every column of the weather data set
-    for i in range(len(column_names)):
-        # Extract individual weather data set for the current weather
-        # data column
-        data_set_column = extract_single_periods(data_set=data_set,
-                                                 column_name=column_names[i],
-                                                 period=period)
-        
-        # If the data set is not divisible by the corresponding number
-        # of periods, the data set is shortened accordingly
-        if len(data_set_column) % n_days > 0:
-            data_set_column = data_set_column[
-                              0:-(len(data_set_column) % n_days)]
-        
-        sliced_column = data_set_column
-        del sliced_column[n_days - 1::n_days]
-        
-        reference_data_set = []
-        for j in range(len(sliced_column)):
-            reference_data_set = reference_data_set + sliced_column[j]
-        
-        # Appends the calculated reference days for the current weather
-        # data column to the final weather data set
-        prep_data_set[column_names[i]] = reference_data_set
+    # Removes every n-th period of all columns from the final data set
+    prep_data_set = period_matrix_to_data_set(
+        period_matrix=np.delete(period_matrix[:periods],
+                                np.s_[n_days - 1::n_days], axis=0),
+        column_names=column_names)
     
     return prep_data_set
 
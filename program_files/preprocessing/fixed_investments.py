@@ -0,0 +1,286 @@
+"""
+    Conversion of investments with a fixed capacity into fixed nominal
+    values before the model is constructed.
+
+    The Monte Carlo simulation draws the capacity of every source,
+    transformer, storage and link and sets their minimum and maximum
+    investment capacity to the drawn value (see
+    create_energy_system.draw_montecarlo_capacities). Each run is thus
+    a pure dispatch problem, but would still be built with investment
+    variables, investment constraints and the invest_status binaries
+    of non-convex investments. The investments whose minimum equals
+    their maximum are therefore replaced by flows (storages) with the
+    fixed nominal value (nominal storage capacity) existing + maximum
+    and their periodical and fix costs (constraint costs) are added to
+    the objective (second criterion limit) as constants. Non-convex
+    investments are built with their maximum, i.e. the option of not
+    building the component at all is dropped.
+
+    The original investment objects are kept within the attribute
+    fixed_investment and are restored together with the invest results
+    after the optimization, so that the postprocessing remains
+    unchanged.
+"""
+import logging
+import pandas
+from oemof import solph
+from oemof.solph.components import GenericStorage
+
+# investment attributes of the periodical and fix costs per criterion
+COST_ATTRIBUTES = {
+    "costs": ["ep_costs", "offset"],
+    "emissions": ["periodical_constraint_costs", "fix_constraint_costs"]}
+
+
+def is_fixed_investment(investment) -> bool:
+    """
+        Checks whether the given investment has a fixed capacity, i.e.
+        its minimum equals its maximum.
+
+        :param investment: oemof investment object or None
+        :type investment: oemof.solph.Investment
+
+        :return: - **-** (bool) - True if the capacity is fixed
+    """
+    return isinstance(investment, solph.Investment) \
+        and float(investment.minimum) == float(investment.maximum)
+
+
+def get_investment(flow: solph.Flow):
+    """
+        Returns the investment of the given flow, the replaced
+        investment if its capacity is fixed (see fix_flow).
+
+        :param flow: oemof flow
+        :type flow: oemof.solph.Flow
+
+        :return: - **-** (oemof.solph.Investment) - investment of the \
+            flow, None if the flow has no investment
+    """
+    if flow.investment is not None:
+        return flow.investment
+    return getattr(flow, "fixed_investment", None)
+
+
+def get_investment_costs(investment: solph.Investment, cost_type: str
+                         ) -> float:
+    """
+        Returns the periodical plus fix costs (cost_type "costs") or
+        constraint costs (cost_type "emissions") of building the
+        maximum capacity of the given investment.
+
+        :param investment: oemof investment object
+        :type investment: oemof.solph.Investment
+        :param cost_type: "costs" or "emissions"
+        :type cost_type: str
+
+        :return: - **costs** (float) - constant costs of the investment
+    """
+    periodical, fix = COST_ATTRIBUTES[cost_type]
+    costs = float(getattr(investment, periodical, 0) or 0) \
+        * float(investment.maximum)
+    # the fix costs of non-convex investments only apply if the
+    # component is built
+    if getattr(investment, "nonconvex", False) and investment.maximum > 0:
+        costs += float(getattr(investment, fix, 0) or 0)
+    return costs
+
+
+def fix_flow(flow: solph.Flow, nominal_value: float) -> None:
+    """
+        Replaces the investment of the given flow by the given fixed
+        nominal value and keeps the investment within the flow's
+        attribute fixed_investment.
+
+        :param flow: oemof investment flow, changed in place
+        :type flow: oemof.solph.Flow
+        :param nominal_value: fixed nominal value of the flow
+        :type nominal_value: float
+    """
+    flow.fixed_investment = flow.investment
+    flow.investment = None
+    flow.nominal_value = float(nominal_value)
+
+
+def fix_storage(storage: GenericStorage) -> None:
+    """
+        Replaces the investment of the given storage by its fixed
+        nominal storage capacity. The flows whose investments are
+        coupled to the storage capacity by the input / output capacity
+        ratio get the corresponding fixed nominal values (capacity *
+        ratio).
+
+        :param storage: oemof storage with a fixed investment, changed \
+            in place
+        :type storage: oemof.solph.components.GenericStorage
+    """
+    investment = storage.investment
+    capacity = float(investment.existing) + float(investment.maximum)
+    storage.fixed_investment = investment
+    storage.investment = None
+    storage.nominal_storage_capacity = capacity
+    # the storage is built by the GenericStorageBlock
+    storage._invest_group = False
+    for flows, ratio in [(storage.inputs, "invest_relation_input_capacity"),
+                         (storage.outputs,
+                          "invest_relation_output_capacity")]:
+        for flow in flows.values():
+            if flow.investment is not None \
+                    and getattr(storage, ratio) is not None:
+                fix_flow(flow=flow,
+                         nominal_value=capacity
+                         * float(getattr(storage, ratio)))
+
+
+def reset_groups(energy_system: solph.EnergySystem) -> None:
+    """
+        Discards the groups of the energy system's nodes, so that they
+        are regrouped (e.g. into the InvestmentFlow or GenericStorage
+        blocks) by the next access of energy_system.groups.
+
+        :param energy_system: energy system, changed in place
+        :type energy_system: oemof.solph.EnergySystem
+    """
+    energy_system._groups = {}
+    energy_system._first_ungrouped_node_index_ = 0
+
+
+def fix_investments(energy_system: solph.EnergySystem) -> dict:
+    """
+        Replaces all investments with a fixed capacity of the energy
+        system's flows and storages by fixed nominal values.
+
+        :param energy_system: energy system consisting a number of \
+            components, changed in place
+        :type energy_system: oemof.solph.EnergySystem
+
+        :return: - **fixed** (dict) - fixed capacity and constant \
+            costs and constraint costs indexed by the label of the \
+            flow or storage
+    """
+    fixed = {}
+    for node in energy_system.nodes:
+        if isinstance(node, GenericStorage) \
+                and is_fixed_investment(node.investment):
+            fix_storage(storage=node)
+            fixed[str(node.label)] = node.fixed_investment
+        # the flow investments of storages are coupled to the storage
+        # capacity even if their minimum equals their maximum
+        if isinstance(node, GenericStorage):
+            continue
+        for bus, flow in node.outputs.items():
+            if is_fixed_investment(flow.investment):
+                fix_flow(flow=flow,
+                         nominal_value=float(flow.investment.existing)
+                         + float(flow.investment.maximum))
+                fixed[str(node.label) + " -> " + str(bus.label)] = \
+                    flow.fixed_investment
+    if fixed:
+        reset_groups(energy_system=energy_system)
+    return {label: {"capacity": float(investment.existing)
+                    + float(investment.maximum),
+                    "costs": get_investment_costs(investment, "costs"),
+                    "constraint costs": get_investment_costs(investment,
+                                                             "emissions")}
+            for label, investment in fixed.items()}
+
+
+def get_fixed_investment_costs(energy_system: solph.EnergySystem,
+                               cost_type: str) -> float:
+    """
+        Returns the sum of the constant costs (cost_type "costs") or
+        constraint costs (cost_type "emissions") of all fixed
+        investments of the energy system (see fix_investments).
+
+        :param energy_system: energy system consisting a number of \
+            components
+        :type energy_system: oemof.solph.EnergySystem
+        :param cost_type: "costs" or "emissions"
+        :type cost_type: str
+
+        :return: - **costs** (float) - sum of the constant costs
+    """
+    costs = 0
+    for node in energy_system.nodes:
+        if getattr(node, "fixed_investment", None) is not None:
+            costs += get_investment_costs(node.fixed_investment, cost_type)
+        for flow in node.outputs.values():
+            if getattr(flow, "fixed_investment", None) is not None:
+                costs += get_investment_costs(flow.fixed_investment,
+                                              cost_type)
+    return costs
+
+
+def set_invest_result(results: dict, key: tuple, invest: float) -> None:
+    """
+        Stores the given investment within the scalars of the results
+        of the given key as done by oemof for investment variables.
+
+        :param results: oemof results (solph.processing.results), \
+            changed in place
+        :type results: dict
+        :param key: (node, node) or (node, None) tuple
+        :type key: tuple
+        :param invest: invested capacity
+        :type invest: float
+    """
+    if key not in results:
+        results[key] = {"scalars": pandas.Series(dtype=float),
+                        "sequences": pandas.DataFrame()}
+    results[key]["scalars"]["invest"] = invest
+
+
+def restore_fixed_investments(energy_system: solph.EnergySystem,
+                              results=None) -> None:
+    """
+        Restores the investments replaced by fix_investments after the
+        optimization and stores their capacities as invest results, so
+        that the postprocessing treats them like optimized investments.
+
+        :param energy_system: optimized energy system, changed in place
+        :type energy_system: oemof.solph.EnergySystem
+        :param results: main results of the optimization, changed in \
+            place, if None the results are not changed
+        :type results: dict
+    """
+    for node in energy_system.nodes:
+        if getattr(node, "fixed_investment", None) is not None:
+            node.investment = node.fixed_investment
+            node.fixed_investment = None
+            node.nominal_storage_capacity = None
+            node._invest_group = True
+            if results is not None:
+                set_invest_result(results=results, key=(node, None),
+                                  invest=float(node.investment.maximum))
+        for bus, flow in node.outputs.items():
+            if getattr(flow, "fixed_investment", None) is None:
+                continue
+            flow.investment = flow.fixed_investment
+            flow.fixed_investment = None
+            flow.nominal_value = None
+            # the investment of storages is stored on the storage itself
+            if results is not None \
+                    and not isinstance(node, GenericStorage) \
+                    and not isinstance(bus, GenericStorage):
+                set_invest_result(results=results, key=(node, bus),
+                                  invest=float(flow.investment.maximum))
+    reset_groups(energy_system=energy_system)
+
+
+def save_fixed_investments(energy_system: solph.EnergySystem) -> dict:
+    """
+        Replaces the fixed investments of the energy system (see
+        fix_investments) and logs their number and constant costs.
+
+        :param energy_system: energy system consisting a number of \
+            components, changed in place
+        :type energy_system: oemof.solph.EnergySystem
+
+        :return: - **fixed** (dict) - see fix_investments
+    """
+    fixed = fix_investments(energy_system=energy_system)
+    logging.info("\t " + str(len(fixed)) + " fixed investments built as "
+                 "fixed capacities, constant costs: "
+                 + str(round(sum(values["costs"]
+                                 for values in fixed.values()), 2)))
+    return fixed
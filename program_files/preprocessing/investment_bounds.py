@@ -0,0 +1,318 @@
+"""
+    Tightening of the maximum investment capacities of the energy
+    system's investment flows before the model is constructed.
+
+    Model definitions often contain placeholder values (e.g. 999999)
+    as maximum investment capacity which result in weak LP relaxations
+    and poorly scaled big-M constraints of non-convex investments. The
+    energy flowing into a bus can never exceed the capacity of the
+    flows leaving it, thus capacity of an investment flow into a bus
+    beyond the peak of the bus' outflow capacity can not be used. The
+    outflow capacity of a bus is the sum of
+
+        - the nominal value times the fix / max profile of a flow \
+          (e.g. the peak demand of a sink),
+        - the existing plus maximum investment capacity of an \
+          investment flow and
+        - the output capacity of a transformer or link divided by its \
+          conversion factor.
+
+    The capacity of an investment flow following an availability
+    profile (e.g. the fix or max feed-in profile of a photovoltaic
+    system) can be used up to the largest ratio of the bus' outflow
+    capacity to the profile value, i.e. the capacity of a curtailable
+    source may exceed the peak outflow of the bus.
+
+    Since the tightened bounds of the outputs of a transformer or link
+    tighten the bounds of the buses upstream, the bounds are tightened
+    iteratively until no bound changes anymore.
+
+    Flows of storages (whose flow investments are coupled to the
+    storage capacity) and insulation measures (which are subject to
+    the minimum final energy reduction) are not tightened.
+"""
+import logging
+import os
+import numpy
+import pandas
+from oemof import solph
+from oemof.solph.components import GenericStorage
+from oemof.solph.custom import Link
+
+# maximum number of tightening iterations
+MAX_ITERATIONS = 20
+
+
+def get_sequence_values(sequence, timesteps: int) -> numpy.ndarray:
+    """
+        Returns the values of an oemof sequence (constant _Sequence or
+        iterable) for the given number of time steps.
+
+        :param sequence: oemof sequence, e.g. flow.max
+        :param timesteps: number of time steps of the energy system
+        :type timesteps: int
+
+        :return: - **-** (numpy.ndarray) - values of the sequence
+    """
+    # constant sequences (oemof.solph.plumbing._Sequence) return their
+    # default value for every index
+    if hasattr(sequence, "default"):
+        return numpy.full(timesteps, sequence.default, dtype=float)
+    return numpy.asarray(sequence, dtype=float)[:timesteps]
+
+
+def get_flow_capacity(flow: solph.Flow, timesteps: int) -> numpy.ndarray:
+    """
+        Returns the upper bound of the given flow in every time step
+        resulting from its own parameters.
+
+        :param flow: oemof flow
+        :type flow: oemof.solph.Flow
+        :param timesteps: number of time steps of the energy system
+        :type timesteps: int
+
+        :return: - **-** (numpy.ndarray) - upper bound of the flow, \
+            inf if the flow is not limited
+    """
+    if flow.investment is not None:
+        capacity = flow.investment.existing + flow.investment.maximum
+    elif flow.nominal_value is not None:
+        capacity = flow.nominal_value
+    else:
+        return numpy.full(timesteps, numpy.inf)
+    # fixed flows (e.g. demands) follow their profile
+    if flow.fix[0] is not None:
+        profile = get_sequence_values(flow.fix, timesteps)
+    else:
+        profile = get_sequence_values(flow.max, timesteps)
+    # an unlimited capacity times a profile value of zero is zero
+    with numpy.errstate(invalid="ignore"):
+        return numpy.nan_to_num(float(capacity) * profile, nan=0.0,
+                                posinf=numpy.inf)
+
+
+def get_conversion_capacity(bus: solph.Bus, node, timesteps: int
+                            ) -> numpy.ndarray:
+    """
+        Returns the upper bound of the flow from the bus into a
+        transformer or link resulting from the capacities of the
+        node's outputs and its conversion factors.
+
+        :param bus: input bus of the node
+        :type bus: oemof.solph.Bus
+        :param node: node consuming the energy of the bus
+        :param timesteps: number of time steps of the energy system
+        :type timesteps: int
+
+        :return: - **-** (numpy.ndarray) - upper bound of the flow, \
+            inf if the node is neither a transformer nor a link
+    """
+    capacity = numpy.full(timesteps, numpy.inf)
+    # subclasses (e.g. ExtractionTurbineCHP) have different relations
+    if type(node) is solph.Transformer:
+        input_factor = get_sequence_values(node.conversion_factors[bus],
+                                           timesteps)
+        for output, flow in node.outputs.items():
+            output_factor = get_sequence_values(
+                node.conversion_factors[output], timesteps)
+            with numpy.errstate(divide="ignore", invalid="ignore"):
+                output_capacity = numpy.where(
+                    output_factor > 0,
+                    numpy.nan_to_num(get_flow_capacity(flow, timesteps)
+                                     * input_factor, nan=0.0,
+                                     posinf=numpy.inf) / output_factor,
+                    numpy.inf)
+            capacity = numpy.minimum(capacity, output_capacity)
+    elif isinstance(node, Link):
+        for (link_input, output), factor in node.conversion_factors.items():
+            if link_input is not bus:
+                continue
+            efficiency = get_sequence_values(factor, timesteps)
+            with numpy.errstate(divide="ignore", invalid="ignore"):
+                output_capacity = numpy.where(
+                    efficiency > 0,
+                    get_flow_capacity(node.outputs[output], timesteps)
+                    / efficiency,
+                    numpy.inf)
+            capacity = numpy.minimum(capacity, output_capacity)
+    return capacity
+
+
+def get_bus_outflow_capacity(bus: solph.Bus, timesteps: int
+                             ) -> numpy.ndarray:
+    """
+        Returns the sum of the upper bounds of all flows leaving the
+        given bus in every time step.
+
+        :param bus: oemof bus
+        :type bus: oemof.solph.Bus
+        :param timesteps: number of time steps of the energy system
+        :type timesteps: int
+
+        :return: - **-** (numpy.ndarray) - outflow capacity of the bus
+    """
+    capacity = numpy.zeros(timesteps)
+    for node, flow in bus.outputs.items():
+        capacity += numpy.minimum(
+            get_flow_capacity(flow, timesteps),
+            get_conversion_capacity(bus, node, timesteps))
+    return capacity
+
+
+def get_usable_capacity(flow: solph.Flow, outflow_capacity: numpy.ndarray,
+                        timesteps: int) -> float:
+    """
+        Returns the largest total capacity of the given flow which can
+        be used by the outflow capacity of its bus, i.e. the largest
+        ratio of the outflow capacity to the flow's fix / max profile
+        within the time steps the flow is available.
+
+        :param flow: investment flow into the bus
+        :type flow: oemof.solph.Flow
+        :param outflow_capacity: outflow capacity of the bus (see \
+            get_bus_outflow_capacity)
+        :type outflow_capacity: numpy.ndarray
+        :param timesteps: number of time steps of the energy system
+        :type timesteps: int
+
+        :return: - **-** (float) - usable capacity, inf if the capacity \
+            is not limited or the flow is never available
+    """
+    if flow.fix[0] is not None:
+        profile = get_sequence_values(flow.fix, timesteps)
+    else:
+        profile = get_sequence_values(flow.max, timesteps)
+    available = profile > 0
+    if not available.any():
+        return numpy.inf
+    return float(numpy.max(outflow_capacity[available] / profile[available]))
+
+
+def get_tightenable_flows(energy_system: solph.EnergySystem) -> list:
+    """
+        Returns the investment flows into buses whose maximum
+        investment capacity can be tightened safely.
+
+        :param energy_system: energy system consisting a number of \
+            components
+        :type energy_system: oemof.solph.EnergySystem
+
+        :return: - **flows** (list) - (node, bus, flow) tuples
+    """
+    flows = []
+    for node in energy_system.nodes:
+        if isinstance(node, GenericStorage):
+            continue
+        for bus, flow in node.outputs.items():
+            if isinstance(bus, solph.Bus) and flow.investment is not None \
+                    and not hasattr(flow.investment, "constraint2"):
+                flows.append((node, bus, flow))
+    return flows
+
+
+def tighten_investment_bounds(energy_system: solph.EnergySystem) -> dict:
+    """
+        Clips the maximum investment capacity of the investment flows
+        into buses to the usable capacity of the bus' outflow capacity
+        (see get_usable_capacity, minus the existing capacity, but at
+        least the minimum investment) until no bound changes anymore.
+        Both directions of an undirected link keep equal bounds, since
+        their investments are equated.
+
+        :param energy_system: energy system consisting a number of \
+            components, changed in place
+        :type energy_system: oemof.solph.EnergySystem
+
+        :return: - **tightened** (dict) - original and tightened \
+            maximum investment capacity indexed by the flow's label
+    """
+    timesteps = len(energy_system.timeindex)
+    flows = get_tightenable_flows(energy_system=energy_system)
+    originals = {(node, bus): float(flow.investment.maximum)
+                 for node, bus, flow in flows}
+
+    for iteration in range(MAX_ITERATIONS):
+        outflow_capacities = {}
+        bounds = {}
+        for node, bus, flow in flows:
+            if bus not in outflow_capacities:
+                outflow_capacities[bus] = get_bus_outflow_capacity(
+                    bus=bus, timesteps=timesteps)
+            # an unlimited usable capacity keeps the bound unchanged
+            bounds[(node, bus)] = max(
+                get_usable_capacity(flow=flow,
+                                    outflow_capacity=outflow_capacities[bus],
+                                    timesteps=timesteps)
+                - float(flow.investment.existing),
+                float(flow.investment.minimum), 0)
+        # the investments of both directions of an undirected link are
+        # equal (see optimize_model.add_custom_constraints)
+        for node, bus, flow in flows:
+            if isinstance(node, Link) and len(node.outputs) > 1:
+                bounds[(node, bus)] = max(bounds[(node, output)]
+                                          for output in node.outputs
+                                          if (node, output) in bounds)
+
+        changed = False
+        for node, bus, flow in flows:
+            if bounds[(node, bus)] < flow.investment.maximum:
+                flow.investment.maximum = bounds[(node, bus)]
+                changed = True
+        if not changed:
+            break
+
+    tightened = {}
+    for node, bus, flow in flows:
+        if flow.investment.maximum < originals[(node, bus)]:
+            tightened[str(node.label) + " -> " + str(bus.label)] = {
+                "maximum": originals[(node, bus)],
+                "tightened maximum": float(flow.investment.maximum)}
+    return tightened
+
+
+def save_investment_bounds(energy_system: solph.EnergySystem,
+                           result_path: str) -> dict:
+    """
+        Tightens the investment bounds of the energy system, logs the
+        tightened bounds and writes them to
+        result_path/investment_bounds.csv.
+
+        :param energy_system: energy system consisting a number of \
+            components, changed in place
+        :type energy_system: oemof.solph.EnergySystem
+        :param result_path: path of the run's result folder
+        :type result_path: str
+
+        :return: - **tightened** (dict) - see tighten_investment_bounds
+    """
+    tightened = tighten_investment_bounds(energy_system=energy_system)
+    for label, bounds in tightened.items():
+        logging.info("\t Investment bound tightened: " + label + " "
+                     + str(bounds["maximum"]) + " -> "
+                     + str(round(bounds["tightened maximum"], 4)))
+    logging.info("\t " + str(len(tightened))
+                 + " investment bounds tightened.")
+    pandas.DataFrame.from_dict(tightened, orient="index").rename_axis(
+        "flow").to_csv(os.path.join(result_path, "investment_bounds.csv"))
+    return tightened
+
+
+def restore_investment_bounds(energy_system: solph.EnergySystem,
+                              tightened: dict) -> None:
+    """
+        Restores the original maximum investment capacity of the
+        tightened flows. The bounds are only read while the model is
+        built, afterwards the results (e.g. "max. invest./kW" of
+        components.csv) report the model definition's maximum again.
+
+        :param energy_system: energy system whose model has been \
+            built, changed in place
+        :type energy_system: oemof.solph.EnergySystem
+        :param tightened: tightened bounds as returned by \
+            tighten_investment_bounds
+        :type tightened: dict
+    """
+    for node, bus, flow in get_tightenable_flows(energy_system=energy_system):
+        label = str(node.label) + " -> " + str(bus.label)
+        if label in tightened:
+            flow.investment.maximum = tightened[label]["maximum"]
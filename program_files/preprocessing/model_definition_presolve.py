@@ -0,0 +1,245 @@
+"""
+    Presolve of the model definition which deactivates components that
+    can not affect the optimum before the energy system is built:
+
+        - sources, transformers, storages and links whose maximum
+          investment capacity and existing capacity are zero
+        - buses from which no sink (demand, excess sink or district
+          heating network) can be reached as well as the components
+          which only supply these buses (e.g. links between otherwise
+          isolated buses)
+
+    Competition constraints whose components are both deactivated are
+    deactivated as well. If only one of the components is deactivated,
+    it is replaced by "None" within the constraint, i.e. its term is
+    zero and the remaining component is still bound by the limit. Every
+    deactivated component saves the variables and constraints of its
+    flows for every time step.
+"""
+import logging
+from collections import deque
+import pandas
+
+# columns holding the input and output buses of the components
+INPUT_COLUMNS = {"sources": ["input"],
+                 "transformers": ["input", "input2"]}
+OUTPUT_COLUMNS = {"sources": ["output"],
+                  "transformers": ["output", "output2"],
+                  "storages": ["bus"]}
+# components which are deactivated if they have no capacity
+CAPACITY_SHEETS = ["sources", "transformers", "storages", "links"]
+
+
+def get_active_rows(nodes_data: dict, sheet: str) -> pandas.DataFrame:
+    """
+        Returns the active rows of the given sheet, an empty dataframe
+        if the sheet does not exist.
+
+        :param nodes_data: dictionary containing the parameters of the \
+            model definition
+        :type nodes_data: dict
+        :param sheet: name of the sheet
+        :type sheet: str
+
+        :return: - **-** (pandas.DataFrame) - active rows of the sheet
+    """
+    if sheet not in nodes_data or "active" not in nodes_data[sheet]:
+        return pandas.DataFrame()
+    return nodes_data[sheet][nodes_data[sheet]["active"] == 1]
+
+
+def get_bus_labels(component: pandas.Series, columns: list, buses: set
+                   ) -> list:
+    """
+        Returns the labels of the (active) buses a component refers to
+        within the given columns.
+
+        :param component: row of the component's sheet
+        :type component: pandas.Series
+        :param columns: names of the columns holding bus labels
+        :type columns: list
+        :param buses: labels of the active buses
+        :type buses: set
+
+        :return: - **-** (list) - bus labels
+    """
+    return [str(component[column]) for column in columns
+            if column in component and str(component[column]) in buses]
+
+
+def find_zero_capacity_components(nodes_data: dict) -> dict:
+    """
+        Returns the active sources, transformers, storages and links
+        whose maximum investment capacity and existing capacity are
+        zero.
+
+        :param nodes_data: dictionary containing the parameters of the \
+            model definition
+        :type nodes_data: dict
+
+        :return: - **components** (dict) - labels of the components \
+            per sheet
+    """
+    components = {}
+    for sheet in CAPACITY_SHEETS:
+        rows = get_active_rows(nodes_data, sheet)
+        if rows.empty or "max. investment capacity" not in rows \
+                or "existing capacity" not in rows:
+            continue
+        max_invest = pandas.to_numeric(rows["max. investment capacity"],
+                                       errors="coerce")
+        existing = pandas.to_numeric(rows["existing capacity"],
+                                     errors="coerce")
+        labels = rows.loc[(max_invest == 0) & (existing == 0), "label"]
+        if len(labels):
+            components[sheet] = set(labels.astype(str))
+    return components
+
+
+def find_unreachable_components(nodes_data: dict, removed: dict) -> dict:
+    """
+        Determines the buses from which no sink can be reached and the
+        components which only supply these buses. The bus graph is
+        built from the transformers and sources (input -> output bus)
+        and links (bus1 -> bus2, both directions if undirected). The
+        buses of sinks, excess sinks and district heating connections
+        are the targets of a reverse breadth-first search.
+
+        :param nodes_data: dictionary containing the parameters of the \
+            model definition
+        :type nodes_data: dict
+        :param removed: labels per sheet of components which are \
+            already removed (see find_zero_capacity_components)
+        :type removed: dict
+
+        :return: - **components** (dict) - labels of the buses and \
+            components to be deactivated per sheet
+    """
+    buses = get_active_rows(nodes_data, "buses")
+    bus_labels = set(buses["label"].astype(str)) if not buses.empty else set()
+
+    # the buses of sinks, excess sinks and district heating
+    # connections consume energy
+    targets = set()
+    for num, sink in get_active_rows(nodes_data, "sinks").iterrows():
+        targets.update(get_bus_labels(sink, ["input"], bus_labels))
+    for num, bus in buses.iterrows():
+        if bus.get("excess", 0) == 1 \
+                or str(bus.get("district heating conn.", 0)) \
+                not in ["0", "0.0"]:
+            targets.add(str(bus["label"]))
+
+    # predecessors of every bus within the bus graph
+    predecessors = {label: set() for label in bus_labels}
+    components = []
+    for sheet in ["sources", "transformers", "storages", "links"]:
+        for num, component in get_active_rows(nodes_data, sheet).iterrows():
+            if str(component["label"]) in removed.get(sheet, set()):
+                continue
+            if sheet == "links":
+                inputs = get_bus_labels(component, ["bus1"], bus_labels)
+                outputs = get_bus_labels(component, ["bus2"], bus_labels)
+                if component.get("(un)directed") == "undirected":
+                    inputs, outputs = inputs + outputs, inputs + outputs
+            else:
+                inputs = get_bus_labels(component,
+                                        INPUT_COLUMNS.get(sheet, []),
+                                        bus_labels)
+                outputs = get_bus_labels(component, OUTPUT_COLUMNS[sheet],
+                                         bus_labels)
+            for output in outputs:
+                predecessors[output].update(inputs)
+            components.append((sheet, str(component["label"]), inputs,
+                               outputs))
+
+    # reverse breadth-first search starting at the consuming buses
+    useful = set(targets)
+    queue = deque(targets)
+    while queue:
+        for predecessor in predecessors[queue.popleft()]:
+            if predecessor not in useful:
+                useful.add(predecessor)
+                queue.append(predecessor)
+
+    # components are kept if one of their outputs is useful, all buses
+    # they refer to have to be kept in this case
+    unreachable = {}
+    needed = set(useful)
+    for sheet, label, inputs, outputs in components:
+        if any(output in useful for output in outputs):
+            needed.update(inputs + outputs)
+        else:
+            unreachable.setdefault(sheet, set()).add(label)
+    unused_buses = bus_labels - needed
+    if unused_buses:
+        unreachable["buses"] = unused_buses
+    return unreachable
+
+
+def deactivate_components(nodes_data: dict, components: dict) -> None:
+    """
+        Sets the given components inactive.
+
+        :param nodes_data: dictionary containing the parameters of the \
+            model definition
+        :type nodes_data: dict
+        :param components: labels of the components per sheet
+        :type components: dict
+    """
+    for sheet, labels in components.items():
+        rows = nodes_data[sheet]["label"].astype(str).isin(labels)
+        nodes_data[sheet].loc[rows, "active"] = 0
+
+
+def presolve_model_definition(nodes_data: dict) -> dict:
+    """
+        Deactivates the zero capacity and unreachable components of the
+        model definition as well as the competition constraints
+        referring to them only and logs the deactivated components.
+
+        :param nodes_data: dictionary containing the parameters of the \
+            model definition, changed in place
+        :type nodes_data: dict
+
+        :return: - **removed** (dict) - labels of the deactivated \
+            components per sheet
+    """
+    removed = find_zero_capacity_components(nodes_data=nodes_data)
+    for sheet, labels in find_unreachable_components(
+            nodes_data=nodes_data, removed=removed).items():
+        removed.setdefault(sheet, set()).update(labels)
+    deactivate_components(nodes_data=nodes_data, components=removed)
+
+    # competition constraints referring to a deactivated component
+    removed_labels = set().union(*removed.values()) if removed else set()
+    competition = get_active_rows(nodes_data, "competition constraints")
+    if not competition.empty:
+        removed_1 = competition["component 1"].astype(str).isin(
+            removed_labels)
+        removed_2 = competition["component 2"].astype(str).isin(
+            removed_labels)
+        # the term of a single deactivated component is zero, the
+        # remaining component is still limited
+        for column, rows in [("component 1", removed_1 & ~removed_2),
+                             ("component 2", removed_2 & ~removed_1)]:
+            for index in competition.index[rows]:
+                logging.info("\t Presolve: removed "
+                             + str(competition.loc[index, column])
+                             + " from competition constraint "
+                             + str(competition.loc[index, "label"]))
+                nodes_data["competition constraints"].loc[index, column] = \
+                    "None"
+        labels = competition.loc[removed_1 & removed_2, "label"]
+        if len(labels):
+            removed["competition constraints"] = set(labels.astype(str))
+            deactivate_components(
+                nodes_data=nodes_data,
+                components={"competition constraints": removed[
+                    "competition constraints"]})
+
+    for sheet, labels in sorted(removed.items()):
+        logging.info("\t Presolve: deactivated " + str(len(labels)) + " "
+                     + sheet + ": " + ", ".join(sorted(labels)))
+    if not removed:
+        logging.info("\t Presolve: no component deactivated.")
+    return removed
@@ -5,6 +5,8 @@
 
 import os
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing
 import logging
 import pandas
 
@@ -112,8 +114,8 @@ def calc_constraint_limits(result_folders: dict, limits: list) -> dict:
 
 
 def create_transformation_model_definitions(
-        constraints: dict, model_definition, directory: str, limits: list
-) -> dict:
+        constraints: dict, model_definition, directory: str, limits: list,
+        criterion_switch=False) -> dict:
     """
         After the emission limits have been calculated in the
         calc_constraint_limits method, the transformation model
@@ -137,11 +139,16 @@ def create_transformation_model_definitions(
         :param limits: list containing the percentages of reduction \
             defined within the GUI
         :type limits: list
+        :param criterion_switch: if True the limit is stored as cost \
+            limit, which becomes the constraint cost limit when the \
+            optimization criteria are switched by sesmg_main
+        :type criterion_switch: bool
 
         :return: - **files** (dict) - dictionary holding the \
             combination of limit and path to the new created model \
             definition
     """
+    column = "cost limit" if criterion_switch else "constraint cost limit"
     files = {}
     for limit in limits:
         # append a dict entry for the limit
@@ -154,12 +161,15 @@ def create_transformation_model_definitions(
         nodes_data = import_model_definition(model_definition, False)
         # append the file path for the transformation model definition
         # to the files dict
-        file_name = directory + "/" + model_definition.name[:-5]
+        if type(model_definition) == str:
+            model_name = model_definition.split("/")[-1][:-5]
+        else:
+            model_name = model_definition.name.split("/")[-1][:-5]
+        file_name = directory + "/" + model_name
         files[str(limit)].append(file_name + "_" + str(limit) + ".xlsx")
         # create new model definition and save it to the created path
         writer = pandas.ExcelWriter(files[str(limit)][-1], engine="xlsxwriter")
-        nodes_data["energysystem"].loc[1, "constraint cost limit"] = \
-            float(constraint)
+        nodes_data["energysystem"].loc[1, column] = float(constraint)
         nodes_data["time series"] = nodes_data["timeseries"]
         nodes_data.pop("timeseries")
         for sheet in nodes_data.keys():
@@ -168,7 +178,144 @@ def create_transformation_model_definitions(
     return files
 
 
-def run_pareto(limits: list, model_definition, GUI_main_dict: dict) -> str:
+def save_model_definition_to_directory(model_definition, directory: str
+                                       ) -> str:
+    """
+        Stores the model definition given within the GUI (a streamlit
+        UploadedFile) as xlsx file within the pareto directory, so that
+        all pareto runs (which may be executed in separate processes)
+        can refer to it by its file path. If the model definition is
+        already a file path it is returned unchanged.
+
+        :param model_definition: file path of the model definition to \
+            be optimized
+        :type model_definition: str / streamlit.UploadedFile
+        :param directory: pareto directory
+        :type directory: str
+
+        :return: - **-** (str) - file path of the model definition
+    """
+    if type(model_definition) == str:
+        return model_definition
+    file_path = directory + "/" + model_definition.name.split("/")[-1]
+    with open(file_path, "wb") as outfile:
+        outfile.write(model_definition.getbuffer())
+    return file_path
+
+
+def run_pareto_points(runs: list, processes: int, num_threads: int) -> None:
+    """
+        Solves the given pareto points either one after another
+        (processes = 1) or concurrently within a process pool. In the
+        latter case the number of threads the user has chosen is split
+        across the worker processes so that the machine is not
+        oversubscribed.
+
+        :param runs: list of tuples (GUI_main_dict, model_definition, \
+            save_path) each representing one run_SESMG call
+        :type runs: list
+        :param processes: maximum number of runs solved concurrently
+        :type processes: int
+        :param num_threads: total number of threads available for all \
+            concurrently solved runs
+        :type num_threads: int
+    """
+    from program_files.preprocessing.Spreadsheet_Energy_System_Model_Generator \
+        import run_SESMG
+
+    processes = min(processes, len(runs))
+    # serial execution
+    if processes <= 1:
+        for GUI_main_dict, model_definition, save_path in runs:
+            run_SESMG(GUI_main_dict, model_definition, save_path)
+        return
+
+    # thread budget of every worker process
+    threads_per_process = max(1, num_threads // processes)
+    logging.info("\t Solving " + str(len(runs)) + " pareto runs within "
+                 + str(processes) + " processes using "
+                 + str(threads_per_process) + " threads each.")
+    # spawn is used since forking a process holding the streamlit
+    # server threads is not safe
+    with ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = {
+            executor.submit(
+                run_SESMG,
+                dict(GUI_main_dict, input_num_threads=threads_per_process),
+                model_definition,
+                save_path): save_path
+            for GUI_main_dict, model_definition, save_path in runs}
+        for future in as_completed(futures):
+            # raises the exception of a failed run
+            future.result()
+            logging.info("\t Pareto run finished: " + futures[future])
+
+
+def run_pareto_sweep(constraints: dict, model_definition: str,
+                     GUI_main_dict: dict, directory: str, limits: list,
+                     result_folders: dict) -> None:
+    """
+        Solves the semi optimal points of the pareto optimization
+        within one persistent model instead of creating, building and
+        solving a transformation model definition for every point (see
+        sesmg_main_pareto_sweep).
+
+        :param constraints: dict of constraint limits for the \
+            transformation points (see calc_constraint_limits)
+        :type constraints: dict
+        :param model_definition: file path of the model definition to \
+            be optimized
+        :type model_definition: str
+        :param GUI_main_dict: global defined dict of GUI input variables
+        :type GUI_main_dict: dict
+        :param directory: pareto directory
+        :type directory: str
+        :param limits: list containing the percentages of reduction \
+            defined within the GUI
+        :type limits: list
+        :param result_folders: dictionary holding the result paths of \
+            the pareto runs, the result paths of the semi optimal \
+            points are appended
+        :type result_folders: dict
+    """
+    from program_files.preprocessing.Spreadsheet_Energy_System_Model_Generator \
+        import sesmg_main_pareto_sweep, create_timeseries_parameter_list
+
+    result_paths = {}
+    for limit in limits:
+        result_paths[str(limit)] = create_model_definition_save_folder(
+            model_definition, directory, str(limit))
+        result_folders.update({str(limit): [result_paths[str(limit)]]})
+
+    timeseries_prep = create_timeseries_parameter_list(
+        GUI_main_dict=GUI_main_dict,
+        input_value_list=["input_timeseries_algorithm",
+                          "input_timeseries_cluster_index",
+                          "input_timeseries_criterion",
+                          "input_timeseries_period"],
+        input_timeseries_season="input_timeseries_season")
+
+    sesmg_main_pareto_sweep(
+        model_definition_file=model_definition,
+        result_paths=result_paths,
+        constraints={str(limit): constraints[limit] for limit in limits},
+        num_threads=GUI_main_dict["input_num_threads"],
+        criterion_switch=GUI_main_dict["input_criterion_switch"],
+        xlsx_results=GUI_main_dict["input_xlsx_results"],
+        console_results=GUI_main_dict["input_console_results"],
+        timeseries_prep=timeseries_prep,
+        solver=GUI_main_dict["input_solver"],
+        cluster_dh=GUI_main_dict["input_cluster_dh"],
+        district_heating_path=GUI_main_dict["input_dh_folder"],
+        solver_options=GUI_main_dict.get("input_solver_options"),
+        presolve=GUI_main_dict.get("input_presolve", False),
+        tighten_bounds=GUI_main_dict.get("input_tighten_bounds", False))
+
+
+def run_pareto(limits: list, model_definition, GUI_main_dict: dict,
+               result_path=None) -> str:
     """
         This method represents the main function of Pareto
         optimization. For this purpose, the model is first run
@@ -200,18 +347,30 @@ def run_pareto(limits: list, model_definition, GUI_main_dict: dict) -> str:
                 - investment boundaries
                 - investment boundaries factor
                 - pre model path
+                - pareto processes (optional, number of pareto runs \
+                  solved concurrently, default 1)
+                - pareto sweep (optional, if True the semi optimal \
+                  points are solved within one persistent model, \
+                  default False)
 
         :type GUI_main_dict: dict
+        :param result_path: directory in which the pareto directory is \
+            created. If not given the result path defined in the \
+            GUI_st_settings.json is used.
+        :type result_path: str
 
         :return: - **directory** (str) - path where the pareto runs \
             were stored
     """
-    from program_files.GUI_st.GUI_st_global_functions \
-        import run_SESMG, set_result_path
-
-    # create one directory to collect all runs based on the result path given
-    # in the GUI_st_settings.json
-    directory = os.path.join(set_result_path(),
+    # use the result path given in the GUI_st_settings.json if no
+    # result path was passed (e.g. by the batch runner)
+    if result_path is None:
+        from program_files.GUI_st.GUI_st_global_functions \
+            import set_result_path
+        result_path = set_result_path()
+
+    # create one directory to collect all runs based on the result path
+    directory = os.path.join(result_path,
                              datetime.now().strftime("%Y-%m-%d--%H-%M-%S"))
     os.mkdir(directory)
 
@@ -219,6 +378,15 @@ def run_pareto(limits: list, model_definition, GUI_main_dict: dict) -> str:
                  + str(limits)
                  + " started!")
 
+    # number of pareto runs which are solved concurrently
+    processes = int(GUI_main_dict.get("input_pareto_processes", 1))
+    num_threads = GUI_main_dict["input_num_threads"]
+
+    # store the model definition within the pareto directory so that
+    # it can be accessed by its file path from every run
+    model_definition = save_model_definition_to_directory(model_definition,
+                                                          directory)
+
     # FIRST CRITERION
     result_folders = {"0": []}
     # TODO enable more than one model definition (districts)
@@ -227,8 +395,6 @@ def run_pareto(limits: list, model_definition, GUI_main_dict: dict) -> str:
     # append optimum of first criterion driven run to the list of
     # result folders
     result_folders["0"].append(save_path)
-    # run the optimization of the first criterion minimum
-    run_SESMG(GUI_main_dict, model_definition, save_path)
     
     # SECOND CRITERION
     # TODO enable more than one model definition (districts)
@@ -240,30 +406,54 @@ def run_pareto(limits: list, model_definition, GUI_main_dict: dict) -> str:
     result_folders.update({"1": [save_path2]})
     
     # switch the criterion switch parameter in the gui input parameter
-    GUI_main_dict["input_criterion_switch"] = \
-        not GUI_main_dict["input_criterion_switch"]
-    # run the optimization of the second criterion minimum
-    run_SESMG(GUI_main_dict, model_definition, save_path2)
+    # of the second criterion run
+    switched_GUI_main_dict = dict(
+        GUI_main_dict,
+        input_criterion_switch=not GUI_main_dict["input_criterion_switch"])
+
+    # run the optimization of the first and second criterion minimum
+    run_pareto_points(
+        runs=[(GUI_main_dict, model_definition, save_path),
+              (switched_GUI_main_dict, model_definition, save_path2)],
+        processes=processes,
+        num_threads=num_threads)
     
     # SEMI OPTIMAL OPTIMIZATION
     # calculate the emission limits for the semi optimal model definitions
     constraints = calc_constraint_limits(result_folders, limits)
-    # create the new model definitions with specific constraint limits
-    files = create_transformation_model_definitions(
-        constraints, model_definition, directory, limits)
 
-    # switch the criterion switch parameter in the gui input parameter
-    GUI_main_dict["input_criterion_switch"] = \
-        not GUI_main_dict["input_criterion_switch"]
-    
-    # run the semi optimal optimizations
-    for limit in limits:
-        result_folders.update({str(limit): []})
-        for model_definition in files[str(limit)]:
-            save_path = create_model_definition_save_folder(model_definition,
-                                                            directory)
-            result_folders[str(limit)].append(save_path)
-            run_SESMG(GUI_main_dict, model_definition, save_path)
+    # the sweep builds the model once and only changes the limit, the
+    # pre-modeling requires a model of its own for every point
+    if GUI_main_dict.get("input_pareto_sweep", False) \
+            and not GUI_main_dict["input_activate_premodeling"]:
+        run_pareto_sweep(constraints=constraints,
+                         model_definition=model_definition,
+                         GUI_main_dict=GUI_main_dict,
+                         directory=directory,
+                         limits=limits,
+                         result_folders=result_folders)
+    else:
+        # create the new model definitions with specific constraint
+        # limits
+        files = create_transformation_model_definitions(
+            constraints, model_definition, directory, limits,
+            criterion_switch=GUI_main_dict["input_criterion_switch"])
+
+        # collect the semi optimal optimizations, since they only depend
+        # on the constraint limits they can be solved independently
+        runs = []
+        for limit in limits:
+            result_folders.update({str(limit): []})
+            for transformation_model_definition in files[str(limit)]:
+                save_path = create_model_definition_save_folder(
+                    transformation_model_definition, directory)
+                result_folders[str(limit)].append(save_path)
+                runs.append((GUI_main_dict, transformation_model_definition,
+                             save_path))
+
+        # run the semi optimal optimizations
+        run_pareto_points(runs=runs, processes=processes,
+                          num_threads=num_threads)
             
     result_dfs = {}
     for folder in result_folders:
@@ -274,21 +464,22 @@ def run_pareto(limits: list, model_definition, GUI_main_dict: dict) -> str:
     # create csv file for pareto plotting
     collect_pareto_data(
         result_dfs=dict(sorted(result_dfs.items(), reverse=True)),
-        result_path=os.path.dirname(save_path))
+        result_path=directory)
     
-    sink_types = create_sink_differentiation_dict(
-            import_model_definition(model_definition)["sinks"])
+    # the model definition is parsed once for all amount csv files
+    nodes_data = import_model_definition(model_definition)
+    sink_types = create_sink_differentiation_dict(nodes_data["sinks"])
     
     # create amount csv files
     collect_electricity_amounts(
         dataframes=result_dfs,
-        nodes_data=import_model_definition(model_definition),
-        result_path=os.path.dirname(save_path),
+        nodes_data=nodes_data,
+        result_path=directory,
         sink_known=sink_types)
 
     collect_heat_amounts(dataframes=result_dfs,
-                         nodes_data=import_model_definition(model_definition),
-                         result_path=os.path.dirname(save_path),
+                         nodes_data=nodes_data,
+                         result_path=directory,
                          sink_known=sink_types)
     
     return directory
@@ -3,6 +3,8 @@
 """
 import pandas
 import logging
+from program_files.preprocessing.create_energy_system import \
+    import_model_definition_sheets
 
 
 def filter_result_component_types(components: pandas.DataFrame,
@@ -67,10 +69,10 @@ def update_component_investment_decisions(
         components=components,
         component_type=result_type_name)
 
-    # read the component type model definition sheet
-    components_xlsx = pandas.read_excel(
-        io=model_definition_path,
-        sheet_name=model_definition_type_name)
+    # read the component type model definition sheet, the parsed
+    # sheets are cached by the content of the model definition
+    components_xlsx = import_model_definition_sheets(
+        filepath=model_definition_path)[model_definition_type_name]
     # drop first (nan) column
     components_xlsx = components_xlsx.iloc[1:, :]
     # reset of index required, so that it is uniform to the result-dataframe
@@ -246,8 +248,8 @@ def deactivate_respective_competition_constraints(
                     - DataFrame holding the updated competition \
                     constraints sheet
     """
-    competition_constraints_xlsx = pandas.read_excel(
-            model_definition_path, sheet_name='competition constraints')
+    competition_constraints_xlsx = import_model_definition_sheets(
+        filepath=model_definition_path)['competition constraints']
 
     for i, constraint in competition_constraints_xlsx.iterrows():
         if constraint['component 1'] in list_of_deactivated_components:
@@ -417,8 +419,8 @@ def update_model_according_pre_model_results(
     """
 
     # import de model definition file
-    model_definition_xlsx = pandas.read_excel(
-        io=model_definition_path, sheet_name=None)
+    model_definition_xlsx = import_model_definition_sheets(
+        filepath=model_definition_path)
 
     # import the components.csv of the pre-model's result data
     components = pandas.read_csv(filepath_or_buffer=results_components_path)
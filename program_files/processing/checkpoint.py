@@ -0,0 +1,203 @@
+"""
+    Checkpoints of the single stages of a SESMG run.
+
+    If requested, the prepared nodes data is stored after the
+    timeseries preparation and the energy system including its main
+    and meta results after the optimization within the "checkpoint"
+    folder of the result folder. A rerun with the same model definition
+    and the same parameters can therefore resume from the last
+    completed stage, and the postprocessing can be re-executed
+    against a stored solution without solving the model again.
+"""
+import hashlib
+import json
+import logging
+import os
+import pickle
+from oemof.solph import EnergySystem
+
+# name of the folder within the result folder holding the checkpoints
+CHECKPOINT_FOLDER = "checkpoint"
+# stages which can be resumed, in the order of their completion
+CHECKPOINT_STAGES = ["none", "prepared", "solved"]
+
+
+def create_checkpoint_key(model_definition_file, timeseries_prep: list,
+                          criterion_switch: bool, presolve=False,
+                          tighten_bounds=False, cluster_dh=False,
+                          district_heating_path=None, solver=None,
+                          solver_options=None) -> str:
+    """
+        Creates the key identifying the input of a run, i.e. every
+        parameter affecting the prepared model definition or the
+        optimization results. A checkpoint is only resumed if it has
+        been created with the same key.
+
+        :param model_definition_file: path to excel model definition \
+            file or file-like object
+        :type model_definition_file: str / streamlit.UploadedFile
+        :param timeseries_prep: list containing the attributes \
+            necessary for timeseries simplifications
+        :type timeseries_prep: list
+        :param criterion_switch: boolean which decides rather the \
+            first and second optimization criterion will be switched
+        :type criterion_switch: bool
+        :param presolve: boolean which decides rather the model \
+            definition presolve is applied
+        :type presolve: bool
+        :param tighten_bounds: boolean which decides rather the \
+            maximum investment capacities are tightened
+        :type tighten_bounds: bool
+        :param cluster_dh: boolean which decides rather the district \
+            heating components are clustered street wise
+        :type cluster_dh: bool
+        :param district_heating_path: path to the folder where already \
+            calculated district heating data is stored
+        :type district_heating_path: str
+        :param solver: str holding the user chosen solver
+        :type solver: str
+        :param solver_options: solver options overwriting the ones of \
+            the model definition
+        :type solver_options: dict
+
+        :return: - **-** (str) - SHA-256 hash of the model \
+            definition's content and the parameters
+    """
+    from program_files.preprocessing.create_energy_system import \
+        read_model_definition_content
+
+    key = hashlib.sha256(read_model_definition_content(model_definition_file))
+    key.update(json.dumps(
+        {"timeseries_prep": [str(param) for param in timeseries_prep],
+         "criterion_switch": bool(criterion_switch),
+         "presolve": bool(presolve),
+         "tighten_bounds": bool(tighten_bounds),
+         "cluster_dh": bool(cluster_dh),
+         "district_heating_path": str(district_heating_path or ""),
+         "solver": str(solver),
+         "solver_options": {str(option): str(value) for option, value
+                            in (solver_options or {}).items()}},
+        sort_keys=True).encode())
+    return key.hexdigest()
+
+
+def load_checkpoint_stage(result_path: str, key: str) -> str:
+    """
+        Returns the last completed stage stored within the result
+        folder.
+
+        :param result_path: path of the run's result folder
+        :type result_path: str
+        :param key: checkpoint key of the current run (see \
+            create_checkpoint_key)
+        :type key: str
+
+        :return: - **-** (str) - "none", "prepared" or "solved"
+    """
+    state_file = os.path.join(result_path, CHECKPOINT_FOLDER, "state.json")
+    if not os.path.exists(state_file):
+        return "none"
+    with open(state_file, "r", encoding="utf-8") as infile:
+        state = json.load(infile)
+    if state.get("key") != key:
+        logging.info("\t Checkpoint was created for another model definition"
+                     " and is ignored.")
+        return "none"
+    return state.get("stage", "none")
+
+
+def save_checkpoint_stage(result_path: str, key: str, stage: str) -> None:
+    """
+        Stores the last completed stage within the result folder.
+
+        :param result_path: path of the run's result folder
+        :type result_path: str
+        :param key: checkpoint key of the current run
+        :type key: str
+        :param stage: completed stage ("prepared" or "solved")
+        :type stage: str
+    """
+    os.makedirs(os.path.join(result_path, CHECKPOINT_FOLDER), exist_ok=True)
+    with open(os.path.join(result_path, CHECKPOINT_FOLDER, "state.json"),
+              "w", encoding="utf-8") as outfile:
+        json.dump({"key": key, "stage": stage}, outfile, indent=4)
+
+
+def save_prepared_nodes_data(result_path: str, key: str,
+                             nodes_data: dict) -> None:
+    """
+        Stores the nodes data after the timeseries preparation.
+
+        :param result_path: path of the run's result folder
+        :type result_path: str
+        :param key: checkpoint key of the current run
+        :type key: str
+        :param nodes_data: prepared nodes data
+        :type nodes_data: dict
+    """
+    os.makedirs(os.path.join(result_path, CHECKPOINT_FOLDER), exist_ok=True)
+    with open(os.path.join(result_path, CHECKPOINT_FOLDER, "nodes_data.pkl"),
+              "wb") as outfile:
+        pickle.dump(nodes_data, outfile, pickle.HIGHEST_PROTOCOL)
+    save_checkpoint_stage(result_path=result_path, key=key, stage="prepared")
+    logging.info("\t Checkpoint: prepared model definition stored.")
+
+
+def load_prepared_nodes_data(result_path: str) -> dict:
+    """
+        Loads the nodes data stored by save_prepared_nodes_data.
+
+        :param result_path: path of the run's result folder
+        :type result_path: str
+
+        :raises: - **FileNotFoundError** - no checkpoint stored
+
+        :return: - **nodes_data** (dict) - prepared nodes data
+    """
+    path = os.path.join(result_path, CHECKPOINT_FOLDER, "nodes_data.pkl")
+    if not os.path.exists(path):
+        raise FileNotFoundError("No prepared model definition stored in "
+                                + result_path)
+    with open(path, "rb") as infile:
+        return pickle.load(infile)
+
+
+def save_solved_energy_system(result_path: str, key: str,
+                              energy_system: EnergySystem) -> None:
+    """
+        Stores the energy system including the main and meta results
+        (energy_system.results) after the optimization.
+
+        :param result_path: path of the run's result folder
+        :type result_path: str
+        :param key: checkpoint key of the current run
+        :type key: str
+        :param energy_system: optimized energy system holding its \
+            results
+        :type energy_system: oemof.solph.EnergySystem
+    """
+    energy_system.dump(dpath=os.path.join(result_path, CHECKPOINT_FOLDER),
+                       filename="energy_system.oemof")
+    save_checkpoint_stage(result_path=result_path, key=key, stage="solved")
+    logging.info("\t Checkpoint: optimization results stored.")
+
+
+def load_solved_energy_system(result_path: str) -> EnergySystem:
+    """
+        Loads the energy system stored by save_solved_energy_system.
+
+        :param result_path: path of the run's result folder
+        :type result_path: str
+
+        :raises: - **FileNotFoundError** - no solution stored
+
+        :return: - **energy_system** (oemof.solph.EnergySystem) - \
+            optimized energy system holding its results
+    """
+    path = os.path.join(result_path, CHECKPOINT_FOLDER)
+    if not os.path.exists(os.path.join(path, "energy_system.oemof")):
+        raise FileNotFoundError("No optimization results stored in "
+                                + result_path)
+    energy_system = EnergySystem()
+    energy_system.restore(dpath=path, filename="energy_system.oemof")
+    return energy_system
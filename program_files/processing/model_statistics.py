@@ -0,0 +1,141 @@
+"""
+    Statistics of the size of an optimization model (number of
+    variables, constraints and nonzeros) broken down by the oemof
+    component type and by constraint. The statistics are stored as
+    model_statistics.json within the result folder of every run and
+    are the result of a dry run (see sesmg_main).
+"""
+import json
+import logging
+import os
+from oemof import solph
+
+
+def get_component_type(index) -> str:
+    """
+        Returns the component type (class name of the oemof node, e.g.
+        Transformer or GenericStorage) a variable or constraint belongs
+        to based on its index. Flows between a bus and a component are
+        assigned to the component.
+
+        :param index: index of the variable or constraint
+        :type index: tuple
+
+        :return: - **-** (str) - component type, "Bus" if the index \
+            only contains buses or "other" if it does not contain any \
+            node
+    """
+    from oemof.network.network import Node
+
+    if not isinstance(index, tuple):
+        index = (index,)
+    component_type = "other"
+    for element in index:
+        if isinstance(element, Node):
+            if not isinstance(element, solph.Bus):
+                return type(element).__name__
+            component_type = "Bus"
+    return component_type
+
+
+def create_model_statistics(om: solph.Model) -> dict:
+    """
+        Counts the variables (continuous, binary, integer and fixed),
+        the constraints and the nonzeros of the given model.
+
+        :param om: oemof model including the custom constraints
+        :type om: oemof.solph.Model
+
+        :return: - **statistics** (dict) - dictionary holding the \
+            total numbers ("variables", "constraints", "nonzeros"), \
+            the numbers per component type ("component types") and \
+            per constraint ("constraints by name")
+    """
+    import pyomo.environ as po
+    from pyomo.core.expr.visitor import identify_variables
+
+    def new_entry():
+        return {"continuous": 0, "binary": 0, "integer": 0, "fixed": 0,
+                "constraints": 0, "nonzeros": 0}
+
+    component_types = {}
+    # VARIABLES
+    variables = {"continuous": 0, "binary": 0, "integer": 0, "fixed": 0}
+    for var in om.component_data_objects(po.Var, active=True):
+        if var.is_fixed():
+            kind = "fixed"
+        elif var.is_binary():
+            kind = "binary"
+        elif var.is_integer():
+            kind = "integer"
+        else:
+            kind = "continuous"
+        variables[kind] += 1
+        component_type = get_component_type(var.index())
+        entry = component_types.setdefault(component_type, new_entry())
+        entry[kind] += 1
+    variables["total"] = sum(variables.values())
+
+    # CONSTRAINTS
+    constraints = {}
+    for constraint in om.component_objects(po.Constraint, active=True):
+        # custom constraints are added to the model itself, the oemof
+        # constraints to the component blocks (e.g.
+        # TransformerBlock.relation)
+        name = constraint.getname(fully_qualified=True)
+        constraint_entry = constraints.setdefault(
+            name, {"constraints": 0, "nonzeros": 0})
+        for index, constraint_data in constraint.items():
+            if not constraint_data.active:
+                continue
+            nonzeros = sum(1 for _ in identify_variables(
+                constraint_data.body, include_fixed=False))
+            constraint_entry["constraints"] += 1
+            constraint_entry["nonzeros"] += nonzeros
+            entry = component_types.setdefault(get_component_type(index),
+                                               new_entry())
+            entry["constraints"] += 1
+            entry["nonzeros"] += nonzeros
+
+    return {
+        "variables": variables,
+        "constraints": sum(entry["constraints"]
+                           for entry in constraints.values()),
+        "nonzeros": sum(entry["nonzeros"] for entry in constraints.values()),
+        "component types": component_types,
+        "constraints by name": constraints}
+
+
+def save_model_statistics(om: solph.Model, result_path: str) -> dict:
+    """
+        Creates the statistics of the given model, logs the totals and
+        the numbers per component type and writes them to
+        result_path/model_statistics.json.
+
+        :param om: oemof model including the custom constraints
+        :type om: oemof.solph.Model
+        :param result_path: path of the run's result folder
+        :type result_path: str
+
+        :return: - **statistics** (dict) - see create_model_statistics
+    """
+    statistics = create_model_statistics(om=om)
+
+    logging.info("\t " + 56 * "*")
+    logging.info("\t Model statistics: "
+                 + str(statistics["variables"]["total"]) + " variables ("
+                 + str(statistics["variables"]["binary"]) + " binary), "
+                 + str(statistics["constraints"]) + " constraints, "
+                 + str(statistics["nonzeros"]) + " nonzeros")
+    for component_type, entry in sorted(
+            statistics["component types"].items()):
+        logging.info("\t " + component_type + ": "
+                     + str(entry["continuous"]) + " continuous / "
+                     + str(entry["binary"]) + " binary variables, "
+                     + str(entry["constraints"]) + " constraints, "
+                     + str(entry["nonzeros"]) + " nonzeros")
+
+    with open(os.path.join(result_path, "model_statistics.json"), "w",
+              encoding="utf-8") as outfile:
+        json.dump(statistics, outfile, indent=4)
+    return statistics
@@ -6,6 +6,77 @@
 # -*- coding: utf-8 -*-
 from oemof import solph
 from memory_profiler import memory_usage
+from program_files.processing.run_profile import RunProfile
+from program_files.processing.solver_options import read_solver_options, \
+    translate_solver_options
+from program_files.processing.scaling import create_scaled_model, \
+    propagate_scaled_solution
+from program_files.preprocessing.fixed_investments import \
+    get_fixed_investment_costs, get_investment
+from program_files.preprocessing.data_preparation import \
+    TYPICAL_PERIODS_SHEET, get_typical_period_weights
+from program_files.processing.storage_linking import \
+    add_inter_period_storage_linking
+
+# solvers called in-process by pyomo's appsi interface, i.e. the model
+# is passed to the solver in memory instead of writing and parsing lp
+# and solution files
+IN_PROCESS_SOLVERS = {"highs": "appsi_highs"}
+
+
+def create_integral_flow_expression(om: solph.Model, flows: dict,
+                                    attribute: str):
+    """
+        Creates the linear expression
+
+        .. math::
+            \sum_{flows} \sum_{t} flow(t) \cdot weighting(t)
+            \cdot attribute(t)
+
+        where weighting(t) is the objective weighting of the model,
+        i.e. the time increment or the typical period weights (see
+        create_model)
+
+        from precomputed coefficient arrays instead of summing up the
+        single products, which would create an intermediate expression
+        node for every flow and time step. Terms with a coefficient of
+        zero (e.g. flows without emissions) are skipped.
+
+        :param om: oemof solph model holding the flow variables
+        :type om: oemof.solph.Model
+        :param flows: dictionary holding the objects which define the \
+            attribute with the (inflow, outflow) tuples as keys
+        :type flows: dict
+        :param attribute: name of the attribute holding the factor of \
+            the flow (scalar or time series)
+        :type attribute: str
+
+        :return: - **-** (pyomo LinearExpression) - sum of the \
+            weighted flows
+    """
+    import numpy
+    from pyomo.core.expr.numeric_expr import LinearExpression
+    from oemof.solph.plumbing import sequence
+
+    timesteps = list(om.TIMESTEPS)
+    weighting = numpy.array([om.objective_weighting[t] for t in timesteps],
+                            dtype=float)
+    linear_coefs = []
+    linear_vars = []
+    for (inflow, outflow), flow in flows.items():
+        factor = getattr(flow, attribute)
+        if numpy.isscalar(factor):
+            coefficients = weighting * float(factor)
+        else:
+            factor = sequence(factor)
+            coefficients = weighting * numpy.array(
+                [factor[t] for t in timesteps], dtype=float)
+        # only the time steps with a non zero coefficient are added
+        for index in numpy.flatnonzero(coefficients):
+            linear_coefs.append(float(coefficients[index]))
+            linear_vars.append(om.flow[inflow, outflow, timesteps[index]])
+    return LinearExpression(constant=0, linear_coefs=linear_coefs,
+                            linear_vars=linear_vars)
 
 
 def constraint_optimization_against_two_values(
@@ -19,7 +90,8 @@ def constraint_optimization_against_two_values(
             added
         :type om: oemof.solph.Model
         :param limit: maximum value for the second parameter for the \
-            whole energysystem
+            whole energysystem, stored as mutable parameter \
+            om.second_criterion_limit
         :type limit: int
         :param storages: boolean indicating whether or not the energy \
             system has a storage as an investment alternative.
@@ -29,7 +101,6 @@ def constraint_optimization_against_two_values(
             within the added constraints
     """
     import pyomo.environ as po
-    from oemof.solph.plumbing import sequence
     
     periodical_flows = {}
     nonconvex_flows = {}
@@ -103,14 +174,8 @@ def constraint_optimization_against_two_values(
         om,
         "integral_limit_variable_constraints",
         po.Expression(
-            expr=sum(
-                om.flow[inflow, outflow, t]
-                * om.timeincrement[t]
-                * sequence(getattr(variable_flows[inflow, outflow],
-                                   "emission_factor"))[t]
-                for (inflow, outflow) in variable_flows
-                for t in om.TIMESTEPS
-            )
+            expr=create_integral_flow_expression(
+                om=om, flows=variable_flows, attribute="emission_factor")
         ),
     )
     
@@ -124,7 +189,9 @@ def constraint_optimization_against_two_values(
     comp_fix = {}
     # extract all investment flows where periodical / fix constraints
     # apply
-    if storages:
+    # storages with a fixed capacity are not part of the investment
+    # storage block (see preprocessing/fixed_investments.py)
+    if storages and hasattr(om, "GenericInvestmentStorageBlock"):
         invest_storages = om.GenericInvestmentStorageBlock.INVESTSTORAGES
         for num in invest_storages.data():
             if hasattr(num.investment, "periodical_constraint_costs"):
@@ -162,7 +229,19 @@ def constraint_optimization_against_two_values(
     else:
         setattr(om, "invest_limit_storage", 0)
         setattr(om, "invest_limit_fix_storage", 0)
+
+    # constant constraint costs of the investments with a fixed
+    # capacity
+    setattr(om, "invest_limit_fixed_investments",
+            get_fixed_investment_costs(energy_system=om.es,
+                                       cost_type="emissions"))
         
+    # The limit is held as mutable parameter, so that the model can be
+    # solved for several limits without being rebuilt (see
+    # update_second_criterion_limit)
+    setattr(om, "second_criterion_limit",
+            po.Param(initialize=limit, mutable=True))
+
     # Setting the equation representing the overall limit for the sum of
     # all appearing constraints
     setattr(
@@ -176,8 +255,9 @@ def constraint_optimization_against_two_values(
                     + getattr(om, "integral_limit_variable_constraints")
                     + getattr(om, "invest_limit_storage")
                     + getattr(om, "invest_limit_fix_storage")
+                    + getattr(om, "invest_limit_fixed_investments")
                 )
-                <= limit
+                <= getattr(om, "second_criterion_limit")
             )
         ),
     )
@@ -185,8 +265,28 @@ def constraint_optimization_against_two_values(
     return om
 
 
+def create_flow_index(om: solph.Model) -> dict:
+    """
+        Creates an index of the model's flows by the label of their
+        inflow component, so that the custom constraints can look up
+        the flows of a component without scanning all flows of the
+        model.
+
+        :param om: oemof solph model
+        :type om: oemof.solph.Model
+
+        :return: - **flow_index** (dict) - dictionary holding the \
+            list of (inflow, outflow) tuples for every component label
+    """
+    flow_index = {}
+    for inflow, outflow in om.flows:
+        flow_index.setdefault(str(inflow), []).append((inflow, outflow))
+    return flow_index
+
+
 def competition_constraint(om: solph.Model, nodes_data: dict,
-                           energy_system: solph.EnergySystem) -> solph.Model:
+                           energy_system: solph.EnergySystem,
+                           flow_index=None) -> solph.Model:
     """
         The outflow_competition method is used to optimise the sum of
         the outflows of two given components multiplied by two
@@ -202,58 +302,78 @@ def competition_constraint(om: solph.Model, nodes_data: dict,
         :param energy_system: the oemof created energy_system \
             containing all created components
         :type energy_system: oemof.solph.energy_system
+        :param flow_index: flows of the model by the label of their \
+            inflow component (see create_flow_index), created if not \
+            given
+        :type flow_index: dict
         
         :return: - **om** (oemof.solph.Model) - oemof solph Model \
             within the newly added competition constraints
     """
     import pyomo.environ as po
 
+    if flow_index is None:
+        flow_index = create_flow_index(om=om)
+
     for num, row in nodes_data["competition constraints"].iterrows():
         if row["active"]:
             flows = {}
-            # Create a list in which the limit value for each time step of
-            # the energy_system is defined, since the constraints are applied
-            # to the flow, and here the system is to be dimensioned for the
-            # time step with the maximum added space/energy requirement
-            # get the two outflows which are competitive
-            for inflow, outflow in om.flows:
-                if inflow == energy_system.groups[row["component 1"]]:
-                    # first output flow of the component is used to set up
-                    # the competition
-                    if outflow == (list(energy_system.groups[
-                                            row["component 1"]].outputs)[0]):
+            # get the two outflows which are competitive, a component
+            # deactivated by the presolve (see
+            # preprocessing/model_definition_presolve.py) is "None"
+            # and does not contribute
+            if row["component 1"] != "None":
+                component_1 = energy_system.groups[row["component 1"]]
+                # first output flow of the first component is used to
+                # set up the competition
+                first_output = list(component_1.outputs)[0]
+                for inflow, outflow in flow_index.get(str(component_1),
+                                                      []):
+                    if outflow == first_output:
                         setattr(om.flows[inflow, outflow],
                                 "competition_factor",
                                 row["factor 1"])
                         flows[(inflow, outflow)] = om.flows[inflow, outflow]
-                elif inflow == energy_system.groups[row["component 2"]]:
+            if row["component 2"] not in [row["component 1"], "None"]:
+                component_2 = energy_system.groups[row["component 2"]]
+                for inflow, outflow in flow_index.get(str(component_2), []):
                     setattr(om.flows[inflow, outflow],
                             "competition_factor",
                             row["factor 2"])
                     flows[(inflow, outflow)] = om.flows[inflow, outflow]
 
-            # rule which is used for the constraint
-            # rule : (outflow(comp1) * factor1 + outflow(comp2) * factor2)
-            # <= limit
-
-            def competition_rule(om):
-                competition_flow = sum(
-                    om.InvestmentFlow.invest[inflow, outflow]
-                    * om.flows[inflow, outflow].competition_factor
-                    for (inflow, outflow) in flows
-                )
-                limit = row["limit"]
-                limit = limit - (
-                    sum(om.flows[inflow, outflow].investment.existing
-                        for (inflow, outflow) in flows)
-                )
-                return limit >= competition_flow
+            # constraint : (invest(comp1) * factor1 + invest(comp2)
+            # * factor2) <= limit - existing capacities
+            # Since the constraint only refers to the invested
+            # capacities, which do not depend on the time step, it is
+            # created once and not for every time step.
+            # flows with a fixed capacity (see
+            # preprocessing/fixed_investments.py) contribute their
+            # fixed investment as constant
+            competition_flow = sum(
+                (om.InvestmentFlow.invest[inflow, outflow]
+                 if om.flows[inflow, outflow].investment is not None
+                 else om.flows[inflow, outflow].fixed_investment.maximum)
+                * om.flows[inflow, outflow].competition_factor
+                for (inflow, outflow) in flows
+            )
+            limit = row["limit"] - sum(
+                get_investment(om.flows[inflow, outflow]).existing
+                for (inflow, outflow) in flows)
+            if not any(om.flows[inflow, outflow].investment is not None
+                       for (inflow, outflow) in flows):
+                if competition_flow > limit:
+                    raise ValueError(
+                        "The fixed capacities of " + row["component 1"]
+                        + " and " + row["component 2"] + " violate "
+                        "their competition constraint.")
+                continue
 
             setattr(
                 om,
                 row["component 1"] + "_" + row["component 2"]
                 + "competition_constraint",
-                po.Constraint(om.TIMESTEPS, expr=competition_rule),
+                po.Constraint(expr=(limit >= competition_flow)),
             )
 
     return om
@@ -278,7 +398,6 @@ def constraint_optimization_of_criterion_adherence_to_a_minval(
             within the newly added constraints
     """
     import pyomo.environ as po
-    from oemof.solph.plumbing import sequence
 
     flows = {}
     # Search for all flows that contain the parameter constraint2,
@@ -294,13 +413,8 @@ def constraint_optimization_of_criterion_adherence_to_a_minval(
         om,
         "limit_constraint2",
         po.Expression(
-            expr=sum(
-                om.flow[inflow, outflow, t]
-                * om.timeincrement[t]
-                * sequence(getattr(flows[inflow, outflow], "constraint2"))[t]
-                for (inflow, outflow) in flows
-                for t in om.TIMESTEPS
-            )
+            expr=create_integral_flow_expression(
+                om=om, flows=flows, attribute="constraint2")
         ),
     )
     
@@ -314,7 +428,8 @@ def constraint_optimization_of_criterion_adherence_to_a_minval(
 
 
 def least_cost_model(energy_system: solph.EnergySystem, num_threads: int,
-                     nodes_data: dict, busd: dict, solver: str) -> solph.Model:
+                     nodes_data: dict, busd: dict, solver: str,
+                     profile=None, solver_options=None) -> solph.Model:
     """
         Solves a given energy system for least costs and returns the
         optimized energy system.
@@ -332,16 +447,332 @@ def least_cost_model(energy_system: solph.EnergySystem, num_threads: int,
         :type busd: dict
         :param solver: str holding the user chosen solver label
         :type solver: str
+        :param profile: profile collecting the runtime and memory \
+            usage of the model construction, the custom constraints \
+            and the solver call
+        :type profile: RunProfile
+        :param solver_options: solver options overwriting the ones of \
+            the model definition (see processing/solver_options.py)
+        :type solver_options: dict
 
         :return: - **om** (oemof.solph.Model) - solved oemof model
     """
+    if profile is None:
+        profile = RunProfile()
+
+    om = create_model(energy_system=energy_system, nodes_data=nodes_data,
+                      busd=busd, profile=profile)
+    solve_model(om=om, solver=solver, num_threads=num_threads,
+                profile=profile,
+                solver_options=read_solver_options(
+                    nodes_data=nodes_data, solver_options=solver_options))
+    return om
+
+
+def create_model(energy_system: solph.EnergySystem, nodes_data: dict,
+                 busd: dict, profile=None) -> solph.Model:
+    """
+        Creates the least cost model of the given energy system
+        including the SESMG specific constraints without solving it.
+
+        :param energy_system: energy system consisting a number of \
+            components
+        :type energy_system: oemof.solph.Energysystem
+        :param nodes_data: dictionary containing all components \
+                           information out of the excel spreadsheet
+        :type nodes_data: dict
+        :param busd: dictionary containing the buses of the energysystem
+        :type busd: dict
+        :param profile: profile collecting the runtime and memory \
+            usage of the model construction and the custom constraints
+        :type profile: RunProfile
+
+        :return: - **om** (oemof.solph.Model) - oemof model
+    """
     import logging
 
+    if profile is None:
+        profile = RunProfile()
+
     # add nodes and flows to energy system
     logging.info("\t " + 56 * "*")
     logging.info("\t Create Energy System...")
+    # the costs and emissions of the typical periods are weighted by
+    # their occurrence
+    model_kwargs = {}
+    if TYPICAL_PERIODS_SHEET in nodes_data:
+        model_kwargs["objective_weighting"] = get_typical_period_weights(
+            nodes_data=nodes_data)
     # creation of a least cost model from the energy system
-    om = solph.Model(energy_system)
+    with profile.stage("model construction"):
+        om = solph.Model(energy_system, **model_kwargs)
+    # adds the SESMG specific constraints
+    with profile.stage("custom constraints"):
+        om = add_custom_constraints(om=om, energy_system=energy_system,
+                                    nodes_data=nodes_data, busd=busd)
+    # the costs of the investments with a fixed capacity are constant
+    fixed_costs = get_fixed_investment_costs(energy_system=energy_system,
+                                             cost_type="costs")
+    if fixed_costs:
+        om.objective.set_value(om.objective.expr + fixed_costs)
+    return om
+
+
+def solve_model(om: solph.Model, solver: str, num_threads: int,
+                profile=None, warmstart=False, persistent_solver=None,
+                solver_options=None, result_path=None) -> None:
+    """
+        Solves the given model. The solver results are stored in
+        om.es.results as done by oemof's Model.solve. If the solver
+        option "scaling" is set, a scaled copy of the model is solved
+        and its solution is transferred to the model (see
+        processing/scaling.py).
+
+        :param om: oemof model to be solved
+        :type om: oemof.solph.Model
+        :param solver: str holding the user chosen solver label
+        :type solver: str
+        :param num_threads: number of threads the solver is allowed to \
+            use
+        :type num_threads: int
+        :param profile: profile collecting the runtime and memory \
+            usage of the solver call
+        :type profile: RunProfile
+        :param warmstart: if True the current variable values are \
+            passed to the solver as start solution
+        :type warmstart: bool
+        :param persistent_solver: persistent solver interface holding \
+            the model (see create_persistent_solver), if given the \
+            model is solved by this interface
+        :type persistent_solver: pyomo.solvers.plugins.solvers.\
+            persistent_solver.PersistentSolver
+        :param solver_options: solver independent options as returned \
+            by solver_options.read_solver_options
+        :type solver_options: dict
+        :param result_path: path of the run's result folder where the \
+            coefficient ranges of a scaled model are stored
+        :type result_path: str
+    """
+    import logging
+
+    if profile is None:
+        profile = RunProfile()
+
+    logging.info("\t " + 56 * "*")
+    logging.info("\t " + "Starting Optimization with " + solver + "-Solver")
+
+    scaling = (solver_options or {}).get("scaling", "off")
+    scaled_model = None
+    if scaling != "off" and persistent_solver is not None:
+        logging.info("\t The scaling is not applied to persistent "
+                     "solver interfaces.")
+    elif scaling != "off":
+        with profile.stage("scaling"):
+            scaled_model = create_scaled_model(
+                om=om, scaling=scaling, result_path=result_path)
+
+    # solving the linear problem using the given solver
+    with profile.stage("solver"):
+        if scaled_model is not None:
+            solve_scaled_model(om=om, scaled_model=scaled_model,
+                               solver=solver, num_threads=num_threads,
+                               warmstart=warmstart,
+                               solver_options=solver_options)
+        elif persistent_solver is not None:
+            solver_results = persistent_solver.solve(tee=False)
+            # store the results as oemof's Model.solve does
+            om.es.results = solver_results
+            om.solver_results = solver_results
+        elif solver in IN_PROCESS_SOLVERS:
+            solve_model_in_process(om=om, solver=solver,
+                                   num_threads=num_threads,
+                                   solver_options=solver_options or {})
+        else:
+            solve_kwargs = {"warmstart": True} if warmstart else {}
+            om.solve(solver=solver,
+                     cmdline_options=translate_solver_options(
+                         solver=solver, num_threads=num_threads,
+                         solver_options=solver_options or {}),
+                     solve_kwargs=solve_kwargs)
+    logging.info("\t Memory Usage during processing: "
+                 + str(memory_usage()[0]))
+
+
+def solve_scaled_model(om: solph.Model, scaled_model, solver: str,
+                       num_threads: int, warmstart: bool,
+                       solver_options: dict) -> None:
+    """
+        Solves the scaled copy of the given model (see
+        scaling.create_scaled_model) and transfers the unscaled
+        solution to the model. The solver results are stored in
+        om.es.results as done by oemof's Model.solve.
+
+        :param om: oemof model
+        :type om: oemof.solph.Model
+        :param scaled_model: scaled copy of the model
+        :type scaled_model: pyomo.core.base.PyomoModel.ConcreteModel
+        :param solver: str holding the user chosen solver label
+        :type solver: str
+        :param num_threads: number of threads the solver is allowed to \
+            use
+        :type num_threads: int
+        :param warmstart: if True the current variable values are \
+            passed to the solver as start solution
+        :type warmstart: bool
+        :param solver_options: solver independent options as returned \
+            by solver_options.read_solver_options
+        :type solver_options: dict
+
+        :raises: - **ImportError** - in-process solver interface not \
+            installed
+    """
+    import logging
+    import pyomo.environ as po
+
+    opt = po.SolverFactory(IN_PROCESS_SOLVERS.get(solver, solver))
+    if solver in IN_PROCESS_SOLVERS \
+            and not opt.available(exception_flag=False):
+        raise ImportError("The solver " + solver + " is not available. "
+                          "Make sure that highspy is installed.")
+    opt.options.update(translate_solver_options(
+        solver=solver, num_threads=num_threads,
+        solver_options=solver_options))
+    solve_kwargs = {"warmstart": True} if warmstart else {}
+    solver_results = opt.solve(scaled_model, tee=False, **solve_kwargs)
+    propagate_scaled_solution(scaled_model=scaled_model, om=om)
+    # store the results as oemof's Model.solve does
+    om.es.results = solver_results
+    om.solver_results = solver_results
+    logging.info("\t Solver status: " + str(solver_results.solver.status)
+                 + ", termination condition: "
+                 + str(solver_results.solver.termination_condition))
+
+
+def solve_model_in_process(om: solph.Model, solver: str, num_threads: int,
+                           solver_options: dict) -> None:
+    """
+        Solves the given model by a solver which is called in-process
+        (see IN_PROCESS_SOLVERS), e.g. HiGHS via highspy. The solver
+        results are stored in om.es.results as done by oemof's
+        Model.solve.
+
+        :param om: oemof model to be solved
+        :type om: oemof.solph.Model
+        :param solver: str holding the user chosen solver label
+        :type solver: str
+        :param num_threads: number of threads the solver is allowed to \
+            use
+        :type num_threads: int
+        :param solver_options: solver independent options as returned \
+            by solver_options.read_solver_options
+        :type solver_options: dict
+
+        :raises: - **ImportError** - solver interface not installed
+    """
+    import logging
+    import pyomo.environ as po
+
+    opt = po.SolverFactory(IN_PROCESS_SOLVERS[solver])
+    if not opt.available(exception_flag=False):
+        raise ImportError("The solver " + solver + " is not available. "
+                          "Make sure that highspy is installed.")
+    opt.options.update(translate_solver_options(
+        solver=solver, num_threads=num_threads,
+        solver_options=solver_options))
+    solver_results = opt.solve(om, tee=False)
+    # store the results as oemof's Model.solve does
+    om.es.results = solver_results
+    om.solver_results = solver_results
+    logging.info("\t Solver status: " + str(solver_results.solver.status)
+                 + ", termination condition: "
+                 + str(solver_results.solver.termination_condition))
+
+
+def create_persistent_solver(om: solph.Model, solver: str, num_threads: int,
+                             solver_options=None):
+    """
+        Creates a persistent solver interface holding the given model
+        if the solver provides one (gurobi, cplex) and it is installed.
+        A persistent solver keeps the model in memory between several
+        solves, thus only the changed constraints have to be passed to
+        the solver and the previous solution is used as start point.
+
+        :param om: oemof model
+        :type om: oemof.solph.Model
+        :param solver: str holding the user chosen solver label
+        :type solver: str
+        :param num_threads: number of threads the solver is allowed to \
+            use
+        :type num_threads: int
+        :param solver_options: solver independent options as returned \
+            by solver_options.read_solver_options
+        :type solver_options: dict
+
+        :return: - **-** (PersistentSolver) - persistent solver \
+            interface or None if not available
+    """
+    import pyomo.environ as po
+
+    persistent_solvers = {"gurobi": "gurobi_persistent",
+                          "cplex": "cplex_persistent"}
+    if solver not in persistent_solvers:
+        return None
+    persistent_solver = po.SolverFactory(persistent_solvers[solver])
+    if not persistent_solver.available(exception_flag=False):
+        return None
+    persistent_solver.set_instance(om)
+    persistent_solver.options.update(translate_solver_options(
+        solver=solver, num_threads=num_threads,
+        solver_options=solver_options or {}))
+    return persistent_solver
+
+
+def update_second_criterion_limit(om: solph.Model, limit: float,
+                                  persistent_solver=None) -> None:
+    """
+        Changes the limit (right hand side) of the second criterion
+        constraint of a model which has already been built (see
+        constraint_optimization_against_two_values).
+
+        :param om: oemof model containing the second criterion \
+            constraint
+        :type om: oemof.solph.Model
+        :param limit: new maximum value for the second criterion
+        :type limit: float
+        :param persistent_solver: persistent solver interface holding \
+            the model which has to be informed about the change
+        :type persistent_solver: PersistentSolver
+    """
+    om.second_criterion_limit.set_value(limit)
+    if persistent_solver is not None:
+        persistent_solver.remove_constraint(
+            om.second_criterion_constraint_equation)
+        persistent_solver.add_constraint(
+            om.second_criterion_constraint_equation)
+
+
+def add_custom_constraints(om: solph.Model, energy_system: solph.EnergySystem,
+                           nodes_data: dict, busd: dict) -> solph.Model:
+    """
+        Adds the SESMG specific constraints (second criterion limit,
+        minimum final energy reduction, competition constraints,
+        undirected links and the storage linking of typical periods)
+        to the given model.
+
+        :param om: oemof model
+        :type om: oemof.solph.Model
+        :param energy_system: energy system consisting a number of \
+            components
+        :type energy_system: oemof.solph.Energysystem
+        :param nodes_data: dictionary containing all components \
+                           information out of the excel spreadsheet
+        :type nodes_data: dict
+        :param busd: dictionary containing the buses of the energysystem
+        :type busd: dict
+
+        :return: - **om** (oemof.solph.Model) - oemof model including \
+            the custom constraints
+    """
     column_label = "constraint cost limit"
     if str(next(nodes_data["energysystem"].iterrows())[1][column_label]) \
             not in ["none", "None"]:
@@ -365,36 +796,42 @@ def least_cost_model(energy_system: solph.EnergySystem, num_threads: int,
         om = constraint_optimization_of_criterion_adherence_to_a_minval(
             om=om, limit=limit)
 
+    # flows of the model by the label of their inflow component, used
+    # by the constraints referring to single components
+    flow_index = create_flow_index(om=om)
+
     # limit for two given outflows e.g area_competition
     if "competition constraints" in nodes_data:
         om = competition_constraint(om=om,
                                     nodes_data=nodes_data,
-                                    energy_system=energy_system)
+                                    energy_system=energy_system,
+                                    flow_index=flow_index)
 
     for num, row in nodes_data["links"].iterrows():
-        for comp, outflow in om.flows.keys():
-            # searching for the output-flows of the link labeled
-            # z['label']
-            if isinstance(comp, solph.custom.Link) \
-                    and str(comp) == row["label"]:
-                # check if the link is undirected and ensure that the
-                # solver has to invest the same amount on both
-                # directions
-                if row["(un)directed"] == "undirected":
-                    comp = energy_system.groups[row["label"]]
-                    solph.constraints.equate_variables(
-                        model=om,
-                        var1=om.InvestmentFlow.invest[comp, busd[row["bus1"]]],
-                        var2=om.InvestmentFlow.invest[comp, busd[row["bus2"]]],
-                    )
-    logging.info("\t " + 56 * "*")
-    logging.info("\t " + "Starting Optimization with " + solver + "-Solver")
+        # check if the link is undirected and ensure that the solver
+        # has to invest the same amount on both directions
+        if row["(un)directed"] != "undirected":
+            continue
+        # searching for the output-flows of the link labeled
+        # row['label']
+        link_flows = flow_index.get(row["label"], [])
+        if link_flows and isinstance(link_flows[0][0], solph.custom.Link):
+            comp = energy_system.groups[row["label"]]
+            # the fixed capacities of both directions are already equal
+            if any(om.flows[flow].investment is None
+                   for flow in link_flows):
+                continue
+            solph.constraints.equate_variables(
+                model=om,
+                var1=om.InvestmentFlow.invest[comp, busd[row["bus1"]]],
+                var2=om.InvestmentFlow.invest[comp, busd[row["bus2"]]],
+            )
 
-    # solving the linear problem using the given solver
-    if solver == 'gurobi':
-        om.solve(solver=solver, cmdline_options={"threads": num_threads})
-    else:
-        om.solve(solver=solver)
-    logging.info("\t Memory Usage during processing: "
-                 + str(memory_usage()[0]))
+    # links the storage contents of the typical periods across the
+    # real calendar
+    if TYPICAL_PERIODS_SHEET in nodes_data:
+        typical_periods = nodes_data[TYPICAL_PERIODS_SHEET]
+        om = add_inter_period_storage_linking(
+            om=om, cluster_order=list(typical_periods["cluster"]),
+            timesteps=int(typical_periods["timesteps"].iloc[0]))
     return om
@@ -0,0 +1,133 @@
+"""
+    Per-stage profile (wall time, CPU time and peak memory) of a SESMG
+    run which is stored as run_profile.json within the result folder.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+import psutil
+
+
+class RunProfile:
+    """
+        Collects the wall time, the CPU time and the peak resident set
+        size (RSS) of the single stages of a run.
+
+        The peak RSS is determined by a background thread sampling the
+        process' RSS while at least one stage is active. Stages which
+        are executed concurrently (e.g. the component creation threads)
+        are measured with the CPU time of their own thread, the other
+        stages with the CPU time of the whole process.
+
+        :param interval: sampling interval of the RSS in seconds
+        :type interval: float
+    """
+
+    def __init__(self, interval=0.05):
+        """
+            Inits the RunProfile class.
+        """
+        self.interval = interval
+        self.stages = []
+        self.start_time = time.perf_counter()
+        self._process = psutil.Process(os.getpid())
+        self._lock = threading.Lock()
+        # peak RSS of the currently active stages
+        self._active = {}
+        self._sampler = None
+
+    def _rss(self) -> int:
+        """
+            Returns the current RSS of the process in bytes.
+        """
+        return self._process.memory_info().rss
+
+    def _sample(self) -> None:
+        """
+            Samples the RSS until no stage is active anymore.
+        """
+        while True:
+            rss = self._rss()
+            with self._lock:
+                if not self._active:
+                    self._sampler = None
+                    return
+                for key in self._active:
+                    self._active[key] = max(self._active[key], rss)
+            time.sleep(self.interval)
+
+    @contextmanager
+    def stage(self, name: str, thread=False):
+        """
+            Context manager measuring the enclosed stage.
+
+            :param name: name of the stage
+            :type name: str
+            :param thread: if True the CPU time of the current thread \
+                is measured instead of the process' CPU time
+            :type thread: bool
+        """
+        cpu_time = time.thread_time if thread else time.process_time
+        key = object()
+        with self._lock:
+            self._active[key] = self._rss()
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._sample,
+                                                 daemon=True)
+                self._sampler.start()
+        wall_start = time.perf_counter()
+        cpu_start = cpu_time()
+        try:
+            yield
+        finally:
+            wall_time = time.perf_counter() - wall_start
+            cpu_used = cpu_time() - cpu_start
+            rss = self._rss()
+            with self._lock:
+                peak = max(self._active.pop(key), rss)
+                self.stages.append({
+                    "stage": name,
+                    "wall_time": round(wall_time, 3),
+                    "cpu_time": round(cpu_used, 3),
+                    "peak_rss_mb": round(peak / 1024 ** 2, 1),
+                    "concurrent": thread})
+            logging.info("\t Stage " + name + " finished after "
+                         + str(round(wall_time, 2)) + " s")
+
+    def call(self, name: str, function, *args, thread=False):
+        """
+            Calls the given function within the stage of the given name
+            and returns its return value. Used as thread target.
+
+            :param name: name of the stage
+            :type name: str
+            :param function: function to be called
+            :type function: callable
+            :param thread: see RunProfile.stage
+            :type thread: bool
+        """
+        with self.stage(name=name, thread=thread):
+            return function(*args)
+
+    def save(self, result_path: str, file_name="run_profile.json"
+             ) -> None:
+        """
+            Writes the collected stages to result_path/file_name.
+
+            :param result_path: path of the run's result folder
+            :type result_path: str
+            :param file_name: name of the json file
+            :type file_name: str
+        """
+        profile = {
+            "total_wall_time": round(time.perf_counter() - self.start_time,
+                                     3),
+            "peak_rss_mb": max([stage["peak_rss_mb"]
+                                for stage in self.stages], default=0),
+            "stages": self.stages}
+        with open(os.path.join(result_path, file_name), "w",
+                  encoding="utf-8") as outfile:
+            json.dump(profile, outfile, indent=4)
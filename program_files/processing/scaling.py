@@ -0,0 +1,278 @@
+"""
+    Optional scaling of the optimization model before it is solved.
+
+    The coefficients of SESMG models span many orders of magnitude
+    (e.g. periodical costs, emission factors, kWh demands and big-M
+    investment maximums, especially after the variable costs have been
+    multiplied by the cluster factor of the timeseries preparation).
+    The rows (constraints) and columns (variables) of the constraint
+    matrix as well as the objective are therefore scaled by geometric
+    mean scaling, i.e. every row and column is divided by the geometric
+    mean of its smallest and largest absolute coefficient. All factors
+    are rounded to powers of two, thus the scaling does not introduce
+    rounding errors. Binary and integer variables are not scaled, since
+    a scaled integer variable would no longer be integral.
+
+    The scaled model is created by pyomo's core.scale_model
+    transformation (a scaled copy of the model), solved, and its
+    solution is propagated back to the original (unscaled) model. The
+    scaling is activated by the solver option "scaling" ("on": one
+    scaling pass, "aggressive": four passes) and the coefficient ranges
+    before and after the scaling are stored within
+    coefficient_ranges.json.
+"""
+import json
+import logging
+import math
+import os
+
+# number of geometric mean scaling passes of the scaling levels
+SCALING_PASSES = {"on": 1, "aggressive": 4}
+
+
+def power_of_two(value: float) -> float:
+    """
+        Rounds the given positive value to the nearest power of two.
+
+        :param value: value to be rounded
+        :type value: float
+
+        :return: - **-** (float) - power of two
+    """
+    return 2.0 ** round(math.log2(value))
+
+
+def geometric_mean_factor(values: list) -> float:
+    """
+        Returns the geometric mean of the smallest and largest of the
+        given absolute values rounded to a power of two, 1 if no values
+        are given.
+
+        :param values: absolute (positive) values
+        :type values: list
+
+        :return: - **-** (float) - scaling factor
+    """
+    if not values:
+        return 1.0
+    return power_of_two(math.sqrt(min(values) * max(values)))
+
+
+def collect_coefficients(om) -> (list, list, dict):
+    """
+        Collects the linear coefficients of the active constraints and
+        the objective of the given model.
+
+        :param om: pyomo (oemof) model
+        :type om: pyomo.core.base.PyomoModel.ConcreteModel
+
+        :return: - **rows** (list) - (constraint, {variable id: \
+                    coefficient}, right hand sides) tuple of every \
+                    constraint
+                 - **objective** (list) - (objective, {variable id: \
+                    coefficient}) tuple of the active objective
+                 - **variables** (dict) - variables indexed by their id
+    """
+    import pyomo.environ as po
+    from pyomo.repn import generate_standard_repn
+
+    def linear_coefficients(expression) -> (dict, float):
+        repn = generate_standard_repn(expression, compute_values=True)
+        coefficients = {}
+        for variable, coefficient in zip(repn.linear_vars,
+                                         repn.linear_coefs):
+            variables[id(variable)] = variable
+            coefficients[id(variable)] = \
+                coefficients.get(id(variable), 0) + coefficient
+        return coefficients, repn.constant
+
+    variables = {}
+    rows = []
+    for constraint in om.component_data_objects(po.Constraint, active=True):
+        coefficients, constant = linear_coefficients(constraint.body)
+        # right hand sides of the constraint without the constant
+        # part of its body
+        rhs = [po.value(bound) - constant
+               for bound in [constraint.lower, constraint.upper]
+               if bound is not None]
+        rows.append((constraint, coefficients, rhs))
+    objective = next(om.component_data_objects(po.Objective, active=True))
+    objective = (objective, linear_coefficients(objective.expr)[0])
+    return rows, objective, variables
+
+
+def compute_scaling_factors(rows: list, objective: tuple, passes: int,
+                            unscaled_variables=None
+                            ) -> (list, dict, float):
+    """
+        Computes the row, column and objective scaling factors by the
+        given number of geometric mean scaling passes. The scaled
+        coefficient of row i and column j is a_ij * r_i / s_j.
+
+        :param rows: rows as returned by collect_coefficients
+        :type rows: list
+        :param objective: objective as returned by collect_coefficients
+        :type objective: tuple
+        :param passes: number of scaling passes
+        :type passes: int
+        :param unscaled_variables: ids of the variables whose column \
+            factor remains 1 (e.g. binary and integer variables)
+        :type unscaled_variables: set
+
+        :return: - **row_factors** (list) - factor r_i of every row
+                 - **column_factors** (dict) - factor s_j of every \
+                    variable indexed by its id
+                 - **objective_factor** (float) - factor of the \
+                    objective
+    """
+    unscaled_variables = unscaled_variables or set()
+    row_factors = [1.0] * len(rows)
+    column_factors = {}
+    for scaling_pass in range(passes):
+        # ROWS
+        for number, (constraint, coefficients, rhs) in enumerate(rows):
+            row_factors[number] = 1 / geometric_mean_factor(
+                [abs(coefficient) / column_factors.get(variable, 1.0)
+                 for variable, coefficient in coefficients.items()
+                 if coefficient != 0])
+        # COLUMNS
+        column_values = {}
+        for number, (constraint, coefficients, rhs) in enumerate(rows):
+            for variable, coefficient in coefficients.items():
+                if coefficient != 0 and variable not in unscaled_variables:
+                    column_values.setdefault(variable, []).append(
+                        abs(coefficient) * row_factors[number])
+        column_factors = {variable: geometric_mean_factor(values)
+                          for variable, values in column_values.items()}
+    # OBJECTIVE
+    objective_factor = 1 / geometric_mean_factor(
+        [abs(coefficient) / column_factors.get(variable, 1.0)
+         for variable, coefficient in objective[1].items()
+         if coefficient != 0])
+    return row_factors, column_factors, objective_factor
+
+
+def get_coefficient_ranges(rows: list, objective: tuple, variables: dict,
+                           row_factors=None, column_factors=None,
+                           objective_factor=1.0) -> dict:
+    """
+        Returns the ranges (smallest and largest absolute non-zero
+        value) of the matrix coefficients, the objective coefficients,
+        the right hand sides and the variable bounds, optionally after
+        applying the given scaling factors.
+
+        :param rows: rows as returned by collect_coefficients
+        :type rows: list
+        :param objective: objective as returned by collect_coefficients
+        :type objective: tuple
+        :param variables: variables as returned by collect_coefficients
+        :type variables: dict
+        :param row_factors: row factors, None if not scaled
+        :type row_factors: list
+        :param column_factors: column factors, None if not scaled
+        :type column_factors: dict
+        :param objective_factor: objective factor
+        :type objective_factor: float
+
+        :return: - **ranges** (dict) - [min, max] of "matrix", \
+            "objective", "rhs" and "bounds" (None if there is no \
+            non-zero value)
+    """
+    row_factors = row_factors or [1.0] * len(rows)
+    column_factors = column_factors or {}
+    values = {"matrix": [], "objective": [], "rhs": [], "bounds": []}
+    for number, (constraint, coefficients, rhs) in enumerate(rows):
+        values["matrix"] += [
+            abs(coefficient) * row_factors[number]
+            / column_factors.get(variable, 1.0)
+            for variable, coefficient in coefficients.items()]
+        values["rhs"] += [abs(value) * row_factors[number] for value in rhs]
+    values["objective"] = [
+        abs(coefficient) * objective_factor
+        / column_factors.get(variable, 1.0)
+        for variable, coefficient in objective[1].items()]
+    for variable_id, variable in variables.items():
+        values["bounds"] += [
+            abs(bound) * column_factors.get(variable_id, 1.0)
+            for bound in [variable.lb, variable.ub]
+            if bound is not None and not math.isinf(bound)]
+
+    ranges = {}
+    for key, key_values in values.items():
+        key_values = [value for value in key_values if value != 0]
+        ranges[key] = [min(key_values), max(key_values)] \
+            if key_values else None
+    return ranges
+
+
+def create_scaled_model(om, scaling: str, result_path=None):
+    """
+        Creates the scaled copy of the given model, logs the
+        coefficient ranges before and after the scaling and stores
+        them within result_path/coefficient_ranges.json.
+
+        :param om: oemof model
+        :type om: oemof.solph.Model
+        :param scaling: scaling level ("on" or "aggressive")
+        :type scaling: str
+        :param result_path: path of the run's result folder, if None \
+            the coefficient ranges are only logged
+        :type result_path: str
+
+        :return: - **scaled_model** (pyomo.core.base.PyomoModel.\
+            ConcreteModel) - scaled copy of the model
+    """
+    import pyomo.environ as po
+
+    rows, objective, variables = collect_coefficients(om=om)
+    # scaled binary and integer variables would lose their integrality
+    row_factors, column_factors, objective_factor = compute_scaling_factors(
+        rows=rows, objective=objective, passes=SCALING_PASSES[scaling],
+        unscaled_variables={variable_id for variable_id, variable
+                            in variables.items() if variable.is_integer()})
+    coefficient_ranges = {
+        "before scaling": get_coefficient_ranges(
+            rows=rows, objective=objective, variables=variables),
+        "after scaling": get_coefficient_ranges(
+            rows=rows, objective=objective, variables=variables,
+            row_factors=row_factors, column_factors=column_factors,
+            objective_factor=objective_factor)}
+
+    # pyomo's scaling factors of the variables (scaled variable =
+    # factor * variable), constraints and objective
+    om.scaling_factor = po.Suffix(direction=po.Suffix.EXPORT)
+    for number, (constraint, coefficients, rhs) in enumerate(rows):
+        om.scaling_factor[constraint] = row_factors[number]
+    for variable_id, factor in column_factors.items():
+        om.scaling_factor[variables[variable_id]] = factor
+    om.scaling_factor[objective[0]] = objective_factor
+    scaled_model = po.TransformationFactory(
+        "core.scale_model").create_using(om)
+    om.del_component(om.scaling_factor)
+
+    for key in ["matrix", "objective", "rhs", "bounds"]:
+        logging.info("\t Coefficient range " + key + ": "
+                     + str(coefficient_ranges["before scaling"][key])
+                     + " -> " + str(coefficient_ranges["after scaling"][key]))
+    if result_path is not None:
+        with open(os.path.join(result_path, "coefficient_ranges.json"), "w",
+                  encoding="utf-8") as outfile:
+            json.dump(coefficient_ranges, outfile, indent=4)
+    return scaled_model
+
+
+def propagate_scaled_solution(scaled_model, om) -> None:
+    """
+        Transfers the (unscaled) solution of the scaled model to the
+        original model.
+
+        :param scaled_model: solved scaled copy of the model (see \
+            create_scaled_model)
+        :type scaled_model: pyomo.core.base.PyomoModel.ConcreteModel
+        :param om: original oemof model
+        :type om: oemof.solph.Model
+    """
+    import pyomo.environ as po
+
+    po.TransformationFactory("core.scale_model").propagate_solution(
+        scaled_model, om)
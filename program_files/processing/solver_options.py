@@ -0,0 +1,147 @@
+"""
+    Solver independent options (threads, MIP gap, time limit, presolve
+    and cuts level) and their translation into the option names of the
+    single solvers as well as the SESMG's own model scaling (see
+    processing/scaling.py).
+
+    The options are read from the optional columns "mip gap",
+    "absolute mip gap", "time limit", "presolve", "cuts" and "scaling"
+    of the model definition's energysystem sheet and may be overwritten by the
+    batch runner (job key "input_solver_options" holding a dict with
+    the same keys). The number of threads is the one chosen within the
+    GUI / batch job.
+"""
+import logging
+
+# solver independent option names, equal to the columns of the
+# energysystem sheet
+SOLVER_OPTION_KEYS = ["mip gap", "absolute mip gap", "time limit",
+                      "presolve", "cuts", "scaling"]
+# levels of the presolve, cuts and scaling options
+SOLVER_OPTION_LEVELS = ["off", "on", "aggressive"]
+# options which are applied by the SESMG instead of the solver
+SESMG_OPTION_KEYS = ["scaling"]
+
+# option names of the single solvers
+SOLVER_OPTION_NAMES = {
+    "cbc": {"threads": "threads",
+            "mip gap": "ratioGap",
+            "absolute mip gap": "allowableGap",
+            "time limit": "sec",
+            "presolve": "presolve",
+            "cuts": "cuts"},
+    "gurobi": {"threads": "threads",
+               "mip gap": "MIPGap",
+               "absolute mip gap": "MIPGapAbs",
+               "time limit": "TimeLimit",
+               "presolve": "Presolve",
+               "cuts": "Cuts"},
+    "cplex": {"threads": "threads",
+              "mip gap": "mip_tolerances_mipgap",
+              "absolute mip gap": "mip_tolerances_absmipgap",
+              "time limit": "timelimit",
+              "presolve": "preprocessing_presolve"},
+    "glpk": {"mip gap": "mipgap",
+             "time limit": "tmlim",
+             "presolve": "presol"},
+    "highs": {"threads": "threads",
+              "mip gap": "mip_rel_gap",
+              "absolute mip gap": "mip_abs_gap",
+              "time limit": "time_limit",
+              "presolve": "presolve"},
+}
+
+# values of the presolve and cuts levels of the single solvers, a
+# level translated to None is not passed to the solver
+SOLVER_OPTION_LEVEL_VALUES = {
+    "cbc": {"presolve": {"off": "off", "on": "on", "aggressive": "more"},
+            "cuts": {"off": "off", "on": "on", "aggressive": "forceOn"}},
+    "gurobi": {"presolve": {"off": 0, "on": -1, "aggressive": 2},
+               "cuts": {"off": 0, "on": -1, "aggressive": 2}},
+    "cplex": {"presolve": {"off": 0, "on": 1, "aggressive": 1}},
+    # glpk's presolver is activated by the flag --presol
+    "glpk": {"presolve": {"off": None, "on": "", "aggressive": ""}},
+    "highs": {"presolve": {"off": "off", "on": "choose", "aggressive": "on"}},
+}
+
+
+def read_solver_options(nodes_data: dict, solver_options=None) -> dict:
+    """
+        Reads the solver options from the energysystem sheet of the
+        model definition. Options given by solver_options (e.g. by the
+        batch runner) overwrite the ones of the model definition.
+
+        :param nodes_data: dictionary containing the parameters of the \
+            model definition
+        :type nodes_data: dict
+        :param solver_options: dictionary holding solver options \
+            (keys see SOLVER_OPTION_KEYS)
+        :type solver_options: dict
+
+        :raises: - **ValueError** - unknown solver option or level
+
+        :return: - **options** (dict) - dictionary holding the set \
+            solver options
+    """
+    options = {}
+    energysystem = next(nodes_data["energysystem"].iterrows())[1]
+    for key in SOLVER_OPTION_KEYS:
+        value = energysystem.get(key, "none")
+        # empty cells are imported as nan
+        if str(value) not in ["none", "None", "nan", ""]:
+            options[key] = value
+    options.update(solver_options or {})
+
+    for key, value in options.items():
+        if key not in SOLVER_OPTION_KEYS:
+            raise ValueError("Unknown solver option " + str(key) + ".")
+        if key in ["presolve", "cuts", "scaling"]:
+            if str(value) not in SOLVER_OPTION_LEVELS:
+                raise ValueError("The solver option " + key + " has to be "
+                                 + "one of " + str(SOLVER_OPTION_LEVELS))
+            options[key] = str(value)
+        else:
+            options[key] = float(value)
+    return options
+
+
+def translate_solver_options(solver: str, num_threads: int,
+                             solver_options: dict) -> dict:
+    """
+        Translates the solver independent options into the options of
+        the given solver. Options which are not supported by the solver
+        are logged and skipped.
+
+        :param solver: str holding the user chosen solver label
+        :type solver: str
+        :param num_threads: number of threads the solver is allowed to \
+            use
+        :type num_threads: int
+        :param solver_options: dictionary as returned by \
+            read_solver_options
+        :type solver_options: dict
+
+        :return: - **cmdline_options** (dict) - options passed to the \
+            solver
+    """
+    names = SOLVER_OPTION_NAMES.get(solver, {})
+    levels = SOLVER_OPTION_LEVEL_VALUES.get(solver, {})
+    cmdline_options = {}
+    if "threads" in names:
+        cmdline_options[names["threads"]] = int(num_threads)
+    for key, value in solver_options.items():
+        if key in SESMG_OPTION_KEYS:
+            continue
+        if key not in names:
+            logging.warning("\t The solver option " + key + " is not "
+                            "supported for " + solver + " and ignored.")
+            continue
+        if key in levels:
+            value = levels[key][value]
+            if value is None:
+                continue
+        elif key == "time limit" and solver == "glpk":
+            # glpk only accepts integer seconds
+            value = int(value)
+        cmdline_options[names[key]] = value
+    return cmdline_options
@@ -0,0 +1,212 @@
+"""
+    Linking of the storage contents of typical periods across the real
+    calendar.
+
+    The typical period modes of the timeseries preparation ("k_means
+    typical periods", "k_medoids typical periods") represent every
+    cluster of periods by one typical period and concatenate the
+    typical periods in the order of their cluster number. Without
+    linking, the storages would exchange energy between unrelated
+    typical periods and seasonal storage could not be represented.
+    The chronological sequence of the cluster labels of the real
+    periods (cluster order) is therefore kept within nodes_data and the
+    storage content is split into (Kotzur et al. 2018):
+
+        - the intra-period content of every typical period, which
+          starts at a free start level, i.e. the storage balance
+          between two consecutive typical periods is replaced, and
+        - the inter-period content at the beginning of every real
+          period, which changes by the intra-period difference of the
+          real period's typical period.
+
+    The sum of both is bounded by the minimum and maximum storage level
+    of the storage. The losses of the inter-period content are applied
+    once per real period.
+"""
+import logging
+
+
+def get_linked_storages(om) -> list:
+    """
+        Returns the storages of the given model together with their
+        storage block and their (invested) storage capacity.
+
+        :param om: oemof model
+        :type om: oemof.solph.Model
+
+        :return: - **storages** (list) - (storage block, storage, \
+            capacity) tuple of every storage
+    """
+    storages = []
+    if hasattr(om, "GenericStorageBlock"):
+        block = om.GenericStorageBlock
+        storages += [(block, storage, storage.nominal_storage_capacity)
+                     for storage in block.STORAGES]
+    if hasattr(om, "GenericInvestmentStorageBlock"):
+        block = om.GenericInvestmentStorageBlock
+        storages += [(block, storage, block.invest[storage]
+                      + storage.investment.existing)
+                     for storage in block.INVESTSTORAGES]
+    return storages
+
+
+def get_period_loss_factor(om, storage, first: int, timesteps: int
+                           ) -> float:
+    """
+        Returns the share of the storage content remaining after the
+        self-discharge of one typical period.
+
+        :param om: oemof model
+        :type om: oemof.solph.Model
+        :param storage: oemof storage
+        :type storage: oemof.solph.components.GenericStorage
+        :param first: first timestep of the typical period
+        :type first: int
+        :param timesteps: number of timesteps per period
+        :type timesteps: int
+
+        :return: - **factor** (float) - remaining share of the content
+    """
+    factor = 1.0
+    for timestep in range(first, first + timesteps):
+        factor *= (1 - storage.loss_rate[timestep]) \
+            ** om.timeincrement[timestep]
+    return factor
+
+
+def link_storage(om, block, storage, capacity, cluster_order: list,
+                 timesteps: int) -> None:
+    """
+        Replaces the storage balance between the typical periods of the
+        given storage by the intra- and inter-period storage content
+        constraints.
+
+        :param om: oemof model including the variables created by \
+            add_inter_period_storage_linking, changed in place
+        :type om: oemof.solph.Model
+        :param block: GenericStorageBlock or \
+            GenericInvestmentStorageBlock of the storage
+        :type block: pyomo.core.base.block.Block
+        :param storage: oemof storage
+        :type storage: oemof.solph.components.GenericStorage
+        :param capacity: storage capacity (number or pyomo expression \
+            of investment storages)
+        :type capacity: float
+        :param cluster_order: cluster label of every real period in \
+            chronological order
+        :type cluster_order: list
+        :param timesteps: number of timesteps per period
+        :type timesteps: int
+    """
+    constraints = om.inter_period_storage_constraints
+    content = block.storage_content
+    start = om.intra_period_start
+    loss_factors = {}
+    for cluster in range(max(cluster_order) + 1):
+        first = cluster * timesteps
+        # the first timestep of a typical period starts at the free
+        # start level instead of the previous typical period's content
+        if first == 0:
+            balance = block.balance_first[storage]
+            previous = block.init_content[storage]
+        else:
+            balance = block.balance[storage, first]
+            previous = content[storage, first - 1]
+        balance.deactivate()
+        factor = (1 - storage.loss_rate[first]) ** om.timeincrement[first]
+        constraints.add(balance.body
+                        + factor * (previous - start[storage, cluster])
+                        == balance.upper)
+        # largest and smallest deviation of the intra-period content
+        # from the start level
+        for timestep in range(first, first + timesteps):
+            deviation = content[storage, timestep] - start[storage, cluster]
+            constraints.add(om.intra_period_max[storage, cluster]
+                            >= deviation)
+            constraints.add(om.intra_period_min[storage, cluster]
+                            <= deviation)
+        loss_factors[cluster] = get_period_loss_factor(
+            om=om, storage=storage, first=first, timesteps=timesteps)
+
+    inter = om.inter_period_content
+    maximum = capacity * storage.max_storage_level[0]
+    minimum = capacity * storage.min_storage_level[0]
+    for period, cluster in enumerate(cluster_order):
+        last = (cluster + 1) * timesteps - 1
+        constraints.add(
+            inter[storage, period + 1]
+            == inter[storage, period] * loss_factors[cluster]
+            + content[storage, last] - start[storage, cluster])
+        # the total storage content has to remain within the storage
+        # levels during the whole real period
+        constraints.add(inter[storage, period]
+                        + om.intra_period_max[storage, cluster] <= maximum)
+        constraints.add(inter[storage, period]
+                        + om.intra_period_min[storage, cluster] >= minimum)
+    periods = len(cluster_order)
+    constraints.add(inter[storage, periods] <= maximum)
+    constraints.add(inter[storage, periods] >= minimum)
+    if storage.initial_storage_level is not None:
+        constraints.add(inter[storage, 0]
+                        == capacity * storage.initial_storage_level)
+    # the balanced storage content refers to the real calendar
+    balanced = getattr(block, "balanced_cstr", None)
+    if balanced is not None and storage in balanced:
+        balanced[storage].deactivate()
+    if storage.balanced:
+        constraints.add(inter[storage, periods] == inter[storage, 0])
+
+
+def add_inter_period_storage_linking(om, cluster_order: list,
+                                     timesteps: int):
+    """
+        Links the storage contents of the typical periods of the given
+        model across the real calendar (see module description).
+
+        :param om: oemof model whose timesteps consist of the \
+            concatenated typical periods, changed in place
+        :type om: oemof.solph.Model
+        :param cluster_order: cluster label of every real period in \
+            chronological order
+        :type cluster_order: list
+        :param timesteps: number of timesteps per period
+        :type timesteps: int
+
+        :return: - **om** (oemof.solph.Model) - oemof model including \
+            the inter-period storage constraints
+
+        :raise: - **ValueError** - Error raised if the model's \
+            timesteps do not consist of the typical periods
+    """
+    import pyomo.environ as po
+
+    cluster_order = [int(cluster) for cluster in cluster_order]
+    clusters = max(cluster_order) + 1
+    if len(om.TIMESTEPS) != clusters * timesteps:
+        raise ValueError("The model consists of " + str(len(om.TIMESTEPS))
+                         + " timesteps instead of " + str(clusters)
+                         + " typical periods of " + str(timesteps)
+                         + " timesteps.")
+    storages = get_linked_storages(om=om)
+    if not storages:
+        return om
+
+    linked = [storage for block, storage, capacity in storages]
+    cluster_index = [(storage, cluster) for storage in linked
+                     for cluster in range(clusters)]
+    om.intra_period_start = po.Var(cluster_index,
+                                   within=po.NonNegativeReals)
+    om.intra_period_max = po.Var(cluster_index, within=po.NonNegativeReals)
+    om.intra_period_min = po.Var(cluster_index, within=po.NonPositiveReals)
+    om.inter_period_content = po.Var(
+        [(storage, period) for storage in linked
+         for period in range(len(cluster_order) + 1)],
+        within=po.NonNegativeReals)
+    om.inter_period_storage_constraints = po.ConstraintList()
+    for block, storage, capacity in storages:
+        link_storage(om=om, block=block, storage=storage, capacity=capacity,
+                     cluster_order=cluster_order, timesteps=timesteps)
+    logging.info("\t " + str(len(storages)) + " storages linked across "
+                 + str(len(cluster_order)) + " periods of "
+                 + str(clusters) + " typical periods")
+    return om
@@ -0,0 +1,310 @@
+"""
+    Headless batch runner of the Spreadsheet Energy System Model
+    Generator.
+
+    Runs a list of optimization jobs defined in a json job file one
+    after another within one python process without starting the
+    streamlit GUI. The job file has the following structure:
+
+    .. code-block:: json
+
+        {
+            "result_path": "/path/to/results",
+            "defaults": {
+                "input_solver": "cbc",
+                "input_num_threads": 4
+            },
+            "jobs": [
+                {"model_definition": "/path/to/model_definition.xlsx"},
+                {"model_definition": "/path/to/model_definition.xlsx",
+                 "input_timeseries_algorithm": "k_means",
+                 "input_timeseries_cluster_index": 10,
+                 "input_timeseries_criterion": "temperature",
+                 "input_timeseries_period": "days",
+                 "input_pareto_points": [50, 75]}
+            ]
+        }
+
+    The job parameters use the same keys as the GUI (see
+    GUI_st/GUI_st_cache.json), therefore the GUI_st_run_settings.json
+    stored within a GUI result folder can be reused as "defaults".
+
+    The solver options of the model definition (see
+    processing/solver_options.py) can be overwritten by
+    "input_solver_options", e.g. {"mip gap": 0.01, "time limit": 3600}.
+
+    With "input_dry_run" (or the command line option --dry-run) the
+    model of every job is only built and its statistics are stored
+    (model_statistics.json) without solving it. Pareto and Monte Carlo
+    jobs are built as single optimization in this case.
+
+    With "input_checkpoints" a single optimization job stores the
+    prepared model definition and its optimization results within the
+    "checkpoint" folder of its result folder. A job may additionally
+    define "resume_path", the result folder of an earlier run stored
+    with checkpoints. The run is then resumed from its last completed
+    stage, or only its postprocessing is repeated if
+    "postprocessing_only" is set as well.
+
+    Usage: python start_batch.py <job_file.json> [--result-path <dir>]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+
+# setting new system path to be able to refer to the program_files
+# package if the script is started directly
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from program_files.preprocessing.pareto_optimization import \
+    run_pareto, create_model_definition_save_folder
+from program_files.preprocessing.Spreadsheet_Energy_System_Model_Generator \
+    import run_SESMG, run_SESMG_montecarlo, rerun_postprocessing
+
+
+def import_batch_jobs(job_file_path: str) -> dict:
+    """
+        Imports the json job file of a batch run. If the file only
+        contains a list, this list is interpreted as the list of jobs.
+
+        :param job_file_path: path to the json job file
+        :type job_file_path: str
+
+        :raises: - **FileNotFoundError** - job file not found
+                 - **ValueError** - job file does not contain any job
+
+        :return: - **batch** (dict) - dictionary holding the \
+            "result_path", "defaults" and "jobs" entries of the job file
+    """
+    if not os.path.exists(job_file_path):
+        raise FileNotFoundError("Problem importing batch job file.")
+
+    with open(job_file_path, "r", encoding="utf-8") as infile:
+        batch = json.load(infile)
+
+    # a plain list of jobs is allowed as well
+    if isinstance(batch, list):
+        batch = {"jobs": batch}
+
+    if not batch.get("jobs"):
+        raise ValueError("The batch job file does not contain any job.")
+
+    # relative model definition paths are interpreted relative to the
+    # job file
+    job_file_directory = os.path.dirname(os.path.abspath(job_file_path))
+    for job in batch["jobs"]:
+        if "model_definition" not in job:
+            raise ValueError("Each batch job has to define a "
+                             "model_definition.")
+        job["model_definition"] = os.path.join(job_file_directory,
+                                               job["model_definition"])
+        if job.get("resume_path"):
+            job["resume_path"] = os.path.join(job_file_directory,
+                                              job["resume_path"])
+    # relative result paths are interpreted relative to the job file
+    batch["result_path"] = os.path.join(
+        job_file_directory, batch.get("result_path", "results"))
+    batch.setdefault("defaults", {})
+    return batch
+
+
+def create_batch_job_dict(job: dict, defaults: dict) -> dict:
+    """
+        Creates the GUI_main_dict equivalent for a single batch job. The
+        GUI default values (GUI_st_cache.json) are updated by the
+        batch defaults first and by the job specific parameters
+        afterwards.
+
+        :param job: job specific parameters
+        :type job: dict
+        :param defaults: parameters applied to every job of the batch
+        :type defaults: dict
+
+        :return: - **job_dict** (dict) - dictionary holding all \
+            parameters needed by run_SESMG, run_pareto and \
+            run_SESMG_montecarlo
+    """
+    # load the GUI default values
+    with open(os.path.join(os.path.dirname(__file__),
+                           "GUI_st", "GUI_st_cache.json"),
+              "r", encoding="utf-8") as infile:
+        job_dict = json.load(infile)
+    # the district heating folder is not part of the GUI cache
+    job_dict["input_dh_folder"] = ""
+
+    job_dict.update(defaults)
+    job_dict.update(job)
+    return job_dict
+
+
+def run_batch_job(job_dict: dict, result_path: str, job_number: int) -> str:
+    """
+        Runs a single batch job. Depending on the job parameters a
+        single optimization (including pre-modeling if activated), a
+        pareto optimization, a Monte Carlo simulation or a pareto
+        optimization followed by a Monte Carlo simulation is performed.
+
+        :param job_dict: dictionary created by create_batch_job_dict
+        :type job_dict: dict
+        :param result_path: directory where the job's result folder \
+            will be created
+        :type result_path: str
+        :param job_number: position of the job within the batch, used \
+            to distinguish the result folders
+        :type job_number: int
+
+        :return: - **res_path** (str) - path where the job's results \
+            were stored
+    """
+    model_definition = job_dict["model_definition"]
+    # a dry run only builds the model of a single optimization
+    dry_run = job_dict.get("input_dry_run", False)
+
+    if job_dict["input_montecarlo_number_of_runs"] != "Not set" \
+            and not dry_run:
+        if job_dict["montecarlo_with_pareto"]:
+            # run pareto in advance, the monte carlo runs are stored
+            # within the pareto directory
+            job_dict["res_path"] = run_pareto(
+                limits=[0.1, 0.5, 0.95, 0.98, 0.99],
+                model_definition=model_definition,
+                GUI_main_dict=job_dict,
+                result_path=result_path)
+        job_dict["res_path"] = run_SESMG_montecarlo(
+            GUI_main_dict=job_dict,
+            model_definition=model_definition,
+            result_path=result_path)
+
+    elif len(job_dict["input_pareto_points"]) != 0 and not dry_run:
+        job_dict["res_path"] = run_pareto(
+            limits=[i / 100 for i in job_dict["input_pareto_points"]],
+            model_definition=model_definition,
+            GUI_main_dict=job_dict,
+            result_path=result_path)
+
+    elif job_dict.get("resume_path"):
+        # continue an earlier run within its result folder
+        job_dict["res_path"] = job_dict["resume_path"]
+        if job_dict.get("postprocessing_only"):
+            rerun_postprocessing(
+                result_path=job_dict["res_path"],
+                xlsx_results=job_dict["input_xlsx_results"],
+                console_results=job_dict["input_console_results"],
+                cluster_dh=job_dict["input_cluster_dh"])
+        else:
+            job_dict["input_resume"] = True
+            run_SESMG(GUI_main_dict=job_dict,
+                      model_definition=model_definition,
+                      save_path=job_dict["res_path"])
+
+    else:
+        job_dict["res_path"] = create_model_definition_save_folder(
+            model_definition=model_definition,
+            directory=result_path,
+            limit=str(job_number))
+        run_SESMG(GUI_main_dict=job_dict,
+                  model_definition=model_definition,
+                  save_path=job_dict["res_path"])
+
+    # save the job settings in the result folder in the same way as
+    # the GUI does
+    with open(os.path.join(job_dict["res_path"], "GUI_st_run_settings.json"),
+              "w", encoding="utf-8") as outfile:
+        json.dump(job_dict, outfile, indent=4)
+
+    return job_dict["res_path"]
+
+
+def reset_logging() -> None:
+    """
+        Removes the handlers which were added by oemof's define_logging
+        during the previous job, so that the log file of every job only
+        contains its own entries.
+    """
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        handler.close()
+        root_logger.removeHandler(handler)
+
+
+def run_batch(batch: dict, stop_on_error=False) -> dict:
+    """
+        Runs all jobs of a batch back to back within the current
+        process. A failing job is logged and skipped unless
+        stop_on_error is set.
+
+        :param batch: dictionary as returned by import_batch_jobs
+        :type batch: dict
+        :param stop_on_error: if True the batch is interrupted by the \
+            first failing job
+        :type stop_on_error: bool
+
+        :return: - **job_results** (dict) - dictionary holding the \
+            result path (or the error message) for each job number
+    """
+    result_path = batch["result_path"]
+    if not os.path.exists(result_path):
+        os.makedirs(result_path)
+
+    job_results = {}
+    for job_number, job in enumerate(batch["jobs"]):
+        job_dict = create_batch_job_dict(job=job, defaults=batch["defaults"])
+        try:
+            job_results[job_number] = run_batch_job(
+                job_dict=job_dict,
+                result_path=result_path,
+                job_number=job_number)
+            logging.info("\t Batch job " + str(job_number)
+                         + " successfully completed.")
+        except Exception as error:
+            if stop_on_error:
+                raise
+            job_results[job_number] = "failed: " + str(error)
+            logging.error("\t Batch job " + str(job_number) + " failed: "
+                          + str(error))
+        finally:
+            reset_logging()
+
+    # write an overview of all jobs to the batch result path
+    with open(os.path.join(result_path, "batch_summary.json"), "w",
+              encoding="utf-8") as outfile:
+        json.dump(job_results, outfile, indent=4)
+
+    return job_results
+
+
+def main() -> None:
+    """
+        Command line entry point of the batch runner.
+    """
+    parser = argparse.ArgumentParser(
+        description="Run SESMG optimizations defined in a json job file "
+                    "without the GUI.")
+    parser.add_argument("job_file", help="path to the json job file")
+    parser.add_argument("--result-path", default=None,
+                        help="directory where the results are stored "
+                             "(overrides the job file's result_path)")
+    parser.add_argument("--stop-on-error", action="store_true",
+                        help="abort the batch if a job fails")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="only build the models and store their "
+                             "statistics without solving them")
+    args = parser.parse_args()
+
+    batch = import_batch_jobs(job_file_path=args.job_file)
+    if args.result_path:
+        batch["result_path"] = os.path.abspath(args.result_path)
+    if args.dry_run:
+        for job in batch["jobs"]:
+            job["input_dry_run"] = True
+
+    job_results = run_batch(batch=batch, stop_on_error=args.stop_on_error)
+    for job_number, job_result in job_results.items():
+        print("job " + str(job_number) + ": " + job_result)
+
+
+if __name__ == '__main__':
+    main()
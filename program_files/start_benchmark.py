@@ -0,0 +1,331 @@
+"""
+    Scaling benchmark of the Spreadsheet Energy System Model Generator.
+
+    Synthetic model definitions of increasing size (number of
+    buildings, number of hourly time steps, with or without district
+    heating) are generated with the urban district upscaling tool based
+    on its example input (urban_district_upscaling/us_sheet_example.xlsx)
+    and solved one after another. The stage profile of every run
+    (run_profile.json, see processing/run_profile.py) is collected in a
+    json benchmark file which can be compared against a stored
+    baseline to detect scaling regressions of the component creation,
+    the model building or the postprocessing.
+
+    Usage:
+        python start_benchmark.py --output benchmark.json
+        python start_benchmark.py --buildings 10 100 --hours 24 168 \
+            --baseline baseline.json --output benchmark.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+# setting new system path to be able to refer to the program_files
+# package if the script is started directly
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas
+
+# default sizes of the benchmark matrix
+BENCHMARK_BUILDINGS = [10, 100, 1000]
+BENCHMARK_HOURS = [24, 168, 8760]
+# urban district upscaling input files used as template
+UPSCALING_PATH = os.path.join(os.path.dirname(__file__),
+                              "urban_district_upscaling")
+
+
+def create_benchmark_cases(buildings: list, hours: list,
+                           district_heating: list) -> list:
+    """
+        Creates the list of benchmark cases, i.e. all combinations of
+        the given sizes.
+
+        :param buildings: numbers of buildings
+        :type buildings: list
+        :param hours: numbers of hourly time steps
+        :type hours: list
+        :param district_heating: list of booleans whether the \
+            buildings are connected to a district heating network
+        :type district_heating: list
+
+        :return: - **cases** (list) - list of dicts holding "name", \
+            "buildings", "hours" and "district_heating"
+    """
+    cases = []
+    for building_number in buildings:
+        for hour_number in hours:
+            for dh in district_heating:
+                cases.append({
+                    "name": "{}_buildings_{}_h_{}".format(
+                        building_number, hour_number,
+                        "dh" if dh else "no_dh"),
+                    "buildings": building_number,
+                    "hours": hour_number,
+                    "district_heating": dh})
+    return cases
+
+
+def create_synthetic_us_input(buildings: int, district_heating: bool,
+                              us_input_path: str) -> None:
+    """
+        Creates an upscaling tool input file holding the given number
+        of buildings by replicating the buildings of the upscaling
+        tool's example input. The replicated buildings are shifted
+        slightly, so that no two buildings share their coordinates.
+
+        :param buildings: number of buildings
+        :type buildings: int
+        :param district_heating: if False no building is connected to \
+            the district heating network
+        :type district_heating: bool
+        :param us_input_path: path where the created input file is \
+            stored
+        :type us_input_path: str
+    """
+    xls = pandas.ExcelFile(os.path.join(UPSCALING_PATH,
+                                        "us_sheet_example.xlsx"))
+    us_sheets = {sheet: xls.parse(sheet) for sheet in xls.sheet_names}
+
+    building_data = us_sheets["1 - building data"]
+    investment_data = us_sheets["2 - building investment data"]
+    # the first row of both sheets holds the units
+    template = building_data.iloc[1:]
+    template = template[template["active"] == 1]
+    rows = [i % len(template) for i in range(buildings)]
+
+    # replicate the building data
+    new_buildings = template.iloc[rows].copy()
+    template_labels = list(new_buildings["label"])
+    new_buildings["label"] = ["building_" + str(i) for i in range(buildings)]
+    # shift the replicated buildings by about 10 m per replication
+    shift = [0.0001 * (i // len(template)) for i in range(buildings)]
+    new_buildings["latitude"] = \
+        pandas.to_numeric(new_buildings["latitude"]) + shift
+    new_buildings["longitude"] = \
+        pandas.to_numeric(new_buildings["longitude"]) + shift
+    if not district_heating:
+        new_buildings["central heat"] = "no"
+
+    # replicate the investment data of the respective template building
+    new_investments = investment_data.iloc[1:].set_index("label").loc[
+        template_labels].reset_index()
+    new_investments["label"] = list(new_buildings["label"])
+
+    us_sheets["1 - building data"] = pandas.concat(
+        [building_data.iloc[[0]], new_buildings])
+    us_sheets["2 - building investment data"] = pandas.concat(
+        [investment_data.iloc[[0]], new_investments])
+
+    with pandas.ExcelWriter(us_input_path, engine="xlsxwriter") as writer:
+        for sheet, data in us_sheets.items():
+            data.to_excel(writer, sheet_name=sheet, index=False)
+
+
+def create_benchmark_model_definition(case: dict, directory: str) -> str:
+    """
+        Creates the model definition of a benchmark case using the
+        urban district upscaling tool and limits its time horizon to
+        the case's number of hours.
+
+        :param case: benchmark case (see create_benchmark_cases)
+        :type case: dict
+        :param directory: directory where the case's files are stored
+        :type directory: str
+
+        :return: - **model_definition_path** (str) - path of the \
+            created model definition
+    """
+    from program_files.urban_district_upscaling.pre_processing import \
+        urban_district_upscaling_pre_processing
+
+    us_input_path = os.path.join(directory, "us_input.xlsx")
+    create_synthetic_us_input(buildings=case["buildings"],
+                              district_heating=case["district_heating"],
+                              us_input_path=us_input_path)
+
+    sheets, worksheets = urban_district_upscaling_pre_processing(
+        paths=[us_input_path,
+               os.path.join(UPSCALING_PATH, "standard_parameters_example.xlsx"),
+               "",
+               os.path.join(UPSCALING_PATH, "plain_scenario.xlsx")],
+        clustering=False,
+        clustering_dh=False)
+
+    # limit the time horizon, the first row of the energysystem sheet
+    # holds the units
+    energysystem = sheets["energysystem"]
+    start_date = pandas.to_datetime(energysystem["start date"].iloc[1])
+    energysystem.loc[energysystem.index[1], "end date"] = \
+        start_date + pandas.Timedelta(hours=case["hours"] - 1)
+    for sheet in ["time series", "weather data"]:
+        sheets[sheet] = sheets[sheet].iloc[:case["hours"]]
+
+    model_definition_path = os.path.join(directory, case["name"] + ".xlsx")
+    with pandas.ExcelWriter(model_definition_path,
+                            engine="xlsxwriter") as writer:
+        for sheet, data in sheets.items():
+            data.to_excel(writer, sheet_name=sheet, index=False)
+    return model_definition_path
+
+
+def run_benchmark_case(case: dict, directory: str, defaults: dict) -> dict:
+    """
+        Generates and solves the model definition of a benchmark case.
+
+        :param case: benchmark case (see create_benchmark_cases)
+        :type case: dict
+        :param directory: directory where the case's folder is created
+        :type directory: str
+        :param defaults: GUI parameters used for the run (e.g. solver)
+        :type defaults: dict
+
+        :return: - **result** (dict) - case parameters, the wall time \
+            of the model definition generation and the run profile
+    """
+    from program_files.start_batch import create_batch_job_dict, \
+        reset_logging
+    from program_files.preprocessing.Spreadsheet_Energy_System_Model_Generator \
+        import run_SESMG
+
+    case_directory = os.path.join(directory, case["name"])
+    os.makedirs(case_directory, exist_ok=True)
+
+    start = time.perf_counter()
+    model_definition = create_benchmark_model_definition(
+        case=case, directory=case_directory)
+    generation_time = time.perf_counter() - start
+
+    job_dict = create_batch_job_dict(
+        job={"model_definition": model_definition}, defaults=defaults)
+    try:
+        run_SESMG(GUI_main_dict=job_dict, model_definition=model_definition,
+                  save_path=case_directory)
+    finally:
+        reset_logging()
+
+    with open(os.path.join(case_directory, "run_profile.json"), "r",
+              encoding="utf-8") as infile:
+        run_profile = json.load(infile)
+
+    return dict(case,
+                generation_time=round(generation_time, 3),
+                total_wall_time=run_profile["total_wall_time"],
+                peak_rss_mb=run_profile["peak_rss_mb"],
+                stages={stage["stage"]: stage["wall_time"]
+                        for stage in run_profile["stages"]})
+
+
+def compare_benchmarks(results: dict, baseline: dict, tolerance=0.25,
+                       min_difference=0.5) -> list:
+    """
+        Compares the stage wall times of a benchmark against a baseline.
+        A stage is reported as regression if it takes more than
+        (1 + tolerance) times its baseline and more than min_difference
+        seconds longer, the latter to ignore the noise of short stages.
+
+        :param results: benchmark as written by this module
+        :type results: dict
+        :param baseline: baseline benchmark as written by this module
+        :type baseline: dict
+        :param tolerance: relative tolerance of the stage wall times
+        :type tolerance: float
+        :param min_difference: absolute tolerance in seconds
+        :type min_difference: float
+
+        :return: - **regressions** (list) - list of dicts holding \
+            "case", "stage", "baseline", "current" and "ratio"
+    """
+    regressions = []
+    for name, case in results["cases"].items():
+        if name not in baseline["cases"]:
+            continue
+        baseline_stages = dict(baseline["cases"][name]["stages"])
+        baseline_stages["total"] = baseline["cases"][name]["total_wall_time"]
+        current_stages = dict(case["stages"])
+        current_stages["total"] = case["total_wall_time"]
+        for stage, current in current_stages.items():
+            if stage not in baseline_stages:
+                continue
+            previous = baseline_stages[stage]
+            if current > previous * (1 + tolerance) \
+                    and current - previous > min_difference:
+                regressions.append({
+                    "case": name,
+                    "stage": stage,
+                    "baseline": previous,
+                    "current": current,
+                    "ratio": round(current / previous, 2)
+                    if previous else float("inf")})
+    return regressions
+
+
+def main() -> None:
+    """
+        Command line entry point of the benchmark suite.
+    """
+    parser = argparse.ArgumentParser(
+        description="Run the SESMG scaling benchmark.")
+    parser.add_argument("--buildings", type=int, nargs="+",
+                        default=BENCHMARK_BUILDINGS,
+                        help="numbers of buildings")
+    parser.add_argument("--hours", type=int, nargs="+",
+                        default=BENCHMARK_HOURS,
+                        help="numbers of hourly time steps")
+    parser.add_argument("--district-heating", choices=["both", "on", "off"],
+                        default="both",
+                        help="benchmark with and/or without district "
+                             "heating")
+    parser.add_argument("--solver", default="cbc", help="solver to be used")
+    parser.add_argument("--directory", default="benchmark_runs",
+                        help="directory where the benchmark runs are stored")
+    parser.add_argument("--output", default="benchmark.json",
+                        help="json file the benchmark results are written to")
+    parser.add_argument("--baseline", default=None,
+                        help="json benchmark file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="relative tolerance of the stage wall times")
+    args = parser.parse_args()
+
+    district_heating = {"both": [False, True], "on": [True],
+                        "off": [False]}[args.district_heating]
+    cases = create_benchmark_cases(buildings=args.buildings,
+                                   hours=args.hours,
+                                   district_heating=district_heating)
+    os.makedirs(args.directory, exist_ok=True)
+
+    results = {"environment": {"python": platform.python_version(),
+                               "platform": platform.platform(),
+                               "solver": args.solver},
+               "cases": {}}
+    for case in cases:
+        print("running " + case["name"])
+        try:
+            results["cases"][case["name"]] = run_benchmark_case(
+                case=case, directory=args.directory,
+                defaults={"input_solver": args.solver})
+        except Exception as error:
+            print(case["name"] + " failed: " + str(error))
+        # write the results after every case, so that a long benchmark
+        # can be evaluated while it is running
+        with open(args.output, "w", encoding="utf-8") as outfile:
+            json.dump(results, outfile, indent=4)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as infile:
+            baseline = json.load(infile)
+        regressions = compare_benchmarks(results=results, baseline=baseline,
+                                         tolerance=args.tolerance)
+        for regression in regressions:
+            print("regression {case} / {stage}: {baseline} s -> "
+                  "{current} s ({ratio}x)".format(**regression))
+        if regressions:
+            sys.exit(1)
+        print("no regressions compared to " + args.baseline)
+
+
+if __name__ == '__main__':
+    main()
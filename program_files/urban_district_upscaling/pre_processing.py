@@ -6,6 +6,7 @@
 import xlsxwriter
 import pandas
 import logging
+import numbers
 from io import BytesIO
 
 import program_files.urban_district_upscaling.clustering as clustering_py
@@ -20,6 +21,29 @@ from program_files.urban_district_upscaling.components import (
     Central_components,
 )
 
+# building columns which do not have to be equal for identical buildings
+AGGREGATION_IGNORED_COLUMNS = ["label", "comment", "latitude", "longitude",
+                               "cluster ID"]
+# columns of the model definition which are multiplied by the number of
+# buildings an aggregated building subsystem represents
+AGGREGATION_SCALED_COLUMNS = {
+    "sinks": ["annual demand", "nominal value"],
+    "sources": ["existing capacity", "min. investment capacity",
+                "max. investment capacity", "fix investment costs",
+                "fix investment constraint costs"],
+    "transformers": ["existing capacity", "min. investment capacity",
+                     "max. investment capacity", "fix investment costs",
+                     "fix investment constraint costs"],
+    "storages": ["existing capacity", "min. investment capacity",
+                 "max. investment capacity", "fix investment costs",
+                 "fix investment constraint costs"],
+    "links": ["existing capacity", "min. investment capacity",
+              "max. investment capacity", "fix investment costs",
+              "fix investment constraint costs"],
+    "insulation": ["area"],
+    "competition constraints": ["limit"],
+}
+
 
 def append_component(sheets: dict, sheet: str, comp_parameter: dict) -> dict:
     """
@@ -486,8 +510,105 @@ def copying_sheets(paths: list, standard_parameters: pandas.ExcelFile,
     return sheets
 
 
+def group_identical_buildings(tool: pandas.DataFrame) -> dict:
+    """
+        Groups the active buildings which are identical in all columns
+        except for the ones listed in AGGREGATION_IGNORED_COLUMNS.
+        Buildings which can be connected to a heating network or a
+        GCHP parcel are never grouped, since their location and shared
+        components matter.
+
+        :param tool: DataFrame holding the US-Input sheets' building \
+            data and building investment data
+        :type tool: pandas.DataFrame
+
+        :return: - **groups** (dict) - labels of the buildings \
+            represented by a building (first building of a group) \
+            indexed by the representative's label
+    """
+    groups = {}
+    representatives = {}
+    for num, building in tool[tool["active"] == 1].iterrows():
+        label = str(building["label"])
+        if building["central heat"] not in ["No", "no", 0] \
+                or building["parcel ID"] not in [0, "0"]:
+            groups[label] = [label]
+            continue
+        key = tuple(str(value) for column, value in building.items()
+                    if column not in AGGREGATION_IGNORED_COLUMNS)
+        if key in representatives:
+            groups[representatives[key]].append(label)
+        else:
+            representatives[key] = label
+            groups[label] = [label]
+    return groups
+
+
+def scale_building_subsystem(sheets: dict, start_rows: dict, factor: int
+                             ) -> dict:
+    """
+        Multiplies the extensive parameters (demands, capacities, fix
+        costs, insulation areas and competition limits, see
+        AGGREGATION_SCALED_COLUMNS) of the components appended to the
+        sheets since start_rows by the given factor. Since the specific
+        costs are not changed, the subsystem represents factor
+        identical building subsystems.
+
+        :param sheets: dictionary containing the pandas.Dataframes that\
+            will represent the model definition's Spreadsheets
+        :type sheets: dict
+        :param start_rows: number of rows of the sheets before the \
+            building subsystem was appended
+        :type start_rows: dict
+        :param factor: number of buildings represented by the subsystem
+        :type factor: int
+
+        :return: - **sheets** (dict) - dictionary containing the \
+            pandas.Dataframes that will represent the model \
+            definition's Spreadsheets which was modified in this method
+    """
+    for sheet, columns in AGGREGATION_SCALED_COLUMNS.items():
+        if sheet not in sheets:
+            continue
+        for column in columns:
+            if column not in sheets[sheet]:
+                continue
+            position = sheets[sheet].columns.get_loc(column)
+            for row in range(start_rows[sheet], len(sheets[sheet])):
+                value = sheets[sheet].iat[row, position]
+                # fill characters like "x" remain unchanged
+                if isinstance(value, numbers.Number) \
+                        and not isinstance(value, bool):
+                    sheets[sheet].iat[row, position] = value * factor
+    return sheets
+
+
+def create_aggregated_buildings_sheet(groups: dict) -> pandas.DataFrame:
+    """
+        Creates the "aggregated buildings" sheet of the model
+        definition which is used to disaggregate the results of the
+        aggregated building subsystems (see
+        postprocessing.create_results_prepare_data).
+
+        :param groups: dictionary as returned by group_identical_buildings
+        :type groups: dict
+
+        :return: - **-** (pandas.DataFrame) - sheet holding the \
+            representative's label, the labels of the represented \
+            buildings and their number (multiplicity) including the \
+            unit row
+    """
+    rows = [{"label": "x", "buildings": "x", "multiplicity": "x"}]
+    for label, buildings in groups.items():
+        if len(buildings) > 1:
+            rows.append({"label": label,
+                         "buildings": ",".join(buildings),
+                         "multiplicity": len(buildings)})
+    return pandas.DataFrame(rows)
+
+
 def urban_district_upscaling_pre_processing(
-    paths: list, clustering: bool, clustering_dh: bool
+    paths: list, clustering: bool, clustering_dh: bool, aggregation=False
 ) -> (dict, list):
     """
         The Urban District Upscaling Pre Processing method is used to
@@ -510,6 +631,11 @@ def urban_district_upscaling_pre_processing(
         :param clustering_dh: boolean for decision rather the district \
             heating connection will be clustered cluster_id wise
         :type clustering_dh: bool
+        :param aggregation: boolean for decision rather identical \
+            buildings are represented by one building subsystem scaled \
+            by their number (multiplicity), not applied in combination \
+            with the spatial clustering
+        :type aggregation: bool
 
         :returns: - **sheets** (dict) - dictionary containing the created \
                         model definition prepared to save as xlsx
@@ -545,7 +671,18 @@ def urban_district_upscaling_pre_processing(
         sheets=sheets,
         standard_parameters=standard_parameters)
 
+    # identical buildings are represented by the first building of
+    # their group
+    if aggregation and not clustering:
+        groups = group_identical_buildings(tool=tool)
+    else:
+        groups = {str(building["label"]): [str(building["label"])]
+                  for num, building in tool[tool["active"] == 1].iterrows()}
+
     for num, building in tool[tool["active"] == 1].iterrows():
+        if str(building["label"]) not in groups:
+            continue
+        start_rows = {sheet: len(sheets[sheet]) for sheet in sheets}
         sheets = create_building_buses_links(
             building=building,
             sheets=sheets,
@@ -590,8 +727,17 @@ def urban_district_upscaling_pre_processing(
             standard_parameters=standard_parameters
         )
 
-        logging.info(str(building["label"])
-                     + " subsystem added to model definition sheet.")
+        multiplicity = len(groups[str(building["label"])])
+        if multiplicity > 1:
+            sheets = scale_building_subsystem(sheets=sheets,
+                                              start_rows=start_rows,
+                                              factor=multiplicity)
+            logging.info(str(building["label"]) + " subsystem added to "
+                         + "model definition sheet representing "
+                         + str(multiplicity) + " identical buildings.")
+        else:
+            logging.info(str(building["label"])
+                         + " subsystem added to model definition sheet.")
 
     if clustering:
         sheets = clustering_py.clustering_method(
@@ -602,4 +748,9 @@ def urban_district_upscaling_pre_processing(
             clustering_dh=clustering_dh,
         )
 
+    if any(len(buildings) > 1 for buildings in groups.values()):
+        sheets["aggregated buildings"] = \
+            create_aggregated_buildings_sheet(groups=groups)
+        worksheets.append("aggregated buildings")
+
     return sheets, worksheets
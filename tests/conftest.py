@@ -30,6 +30,63 @@ def test_storage_decentralized_battery_entry():
     return sheets
 
 
+@pytest.fixture
+def montecarlo_template():
+    """
+        Minimal model definition varied by the Monte Carlo runs.
+    """
+    return {
+        "buses": pandas.DataFrame({
+            "label": ["heat_1", "heat_2", "central_heat"],
+            "sector": ["heat", "heat", "central_heat"],
+            "district heating conn.": [0, 0, 0]}),
+        "sources": pandas.DataFrame({
+            "label": ["pv_1", "pv_2"],
+            "min. investment capacity": [0, 0],
+            "max. investment capacity": [10.5, 100]}),
+        "transformers": pandas.DataFrame({
+            "label": ["chp"],
+            "min. investment capacity": [0],
+            "max. investment capacity": [50]}),
+        "storages": pandas.DataFrame({
+            "label": [], "min. investment capacity": [],
+            "max. investment capacity": []}),
+        "links": pandas.DataFrame({
+            "label": [], "min. investment capacity": [],
+            "max. investment capacity": []}),
+        "insulation": pandas.DataFrame({
+            "label": ["roof"], "existing with costs": [0],
+            "area": [120.0]}),
+        "district heating": pandas.DataFrame({"label": ["dh"],
+                                              "active": [0]})}
+
+
+@pytest.fixture
+def gas_heat_energy_system():
+    """
+        Energy system of three hourly timesteps consisting of a gas
+        bus, a heat bus and a heat demand (peak 30 kW), the components
+        in between are added by the tests.
+    """
+    from oemof import solph
+
+    energy_system = solph.EnergySystem(
+        timeindex=pandas.date_range("2020-01-01", periods=3, freq="H"))
+    heat_bus = solph.Bus(label="heat_bus")
+    energy_system.add(
+        solph.Bus(label="gas_bus"), heat_bus,
+        solph.Sink(label="heat_demand", inputs={heat_bus: solph.Flow(
+            fix=[1, 3, 2], nominal_value=10)}))
+    return energy_system
+
+
+def get_node(energy_system, label: str):
+    """
+        Returns the node of the given energy system by its label.
+    """
+    return [node for node in energy_system.nodes if node.label == label][0]
+
+
 def compare_flow_attributes(flows, flows_test):
     """
     
@@ -74,6 +74,28 @@ def test_create_timeseries_parameter_list(test_GUI_main_dict):
     assert parameter_list == target_parameter_list
 
 
+def test_create_timeseries_parameter_list_tolerance(test_GUI_main_dict):
+    """
+        Testing if the error tolerance of the automatic index selection \
+        is appended after the (unset) weights of the multi-attribute \
+        clustering.
+    """
+    from program_files.GUI_st.GUI_st_global_functions \
+        import create_timeseries_parameter_list
+
+    test_GUI_main_dict["input_timeseries_error_tolerance"] = 0.1
+
+    parameter_list = create_timeseries_parameter_list(
+        GUI_main_dict=test_GUI_main_dict,
+        input_value_list=["input_timeseries_algorithm",
+                          "input_timeseries_cluster_index",
+                          "input_timeseries_criterion",
+                          "input_timeseries_period"],
+        input_timeseries_season="input_timeseries_season")
+
+    assert parameter_list == ["slicing A", 83, "None", "days", 4, None, 0.1]
+
+
 def test_import_GUI_input_values_json(test_GUI_main_dict):
     """
         Testing the json upload and the definition of the dict is working as \
@@ -206,6 +228,24 @@ def test_create_cluster_simplification_index_none(test_GUI_main_dict):
     assert changed_test_dict == test_GUI_main_dict
 
 
+def test_create_cluster_simplification_index_auto(test_GUI_main_dict):
+    """
+        Testing if the function sets the index of the last option if the \
+        input value is "auto".
+    """
+    from program_files.GUI_st.GUI_st_global_functions \
+        import create_cluster_simplification_index
+
+    test_GUI_main_dict["input_timeseries_cluster_index"] = "auto"
+
+    create_cluster_simplification_index(
+        input_value="input_timeseries_cluster_index",
+        input_output_dict=test_GUI_main_dict,
+        input_value_index="input_timeseries_cluster_index_index")
+
+    assert test_GUI_main_dict["input_timeseries_cluster_index_index"] == 8761
+
+
 def test_positive_read_markdown_document():
     """
         Testing if function is loading the README.md as required and if it is \
@@ -8,3 +8,83 @@ def test_sesmg_including_premodel():
     from program_files.preprocessing.Spreadsheet_Energy_System_Model_Generator\
         import sesmg_main_including_premodel
     pass
+
+
+def test_extract_results(monkeypatch):
+    import pandas
+    from types import SimpleNamespace
+    from oemof import solph
+    from program_files.preprocessing.Spreadsheet_Energy_System_Model_Generator\
+        import extract_results
+    from program_files.preprocessing.data_preparation import SEGMENTS_SHEET
+
+    # results of a model of two segments
+    monkeypatch.setattr(solph.processing, "results", lambda om: {
+        ("source", "bus"): {"sequences": pandas.DataFrame(
+            {"flow": [1.0, 2.0]})}})
+    monkeypatch.setattr(solph.processing, "meta_results",
+                        lambda om: {"objective": 0})
+    nodes_data = {
+        "energysystem": pandas.DataFrame(
+            {"start date": [pandas.Timestamp("2020-01-01 00:00")],
+             "end date": [pandas.Timestamp("2020-01-01 02:00")],
+             "temporal resolution": ["h"]}),
+        SEGMENTS_SHEET: pandas.DataFrame(
+            {"segment": [0, 1], "first timestep": [0, 1],
+             "duration": [1, 2]})}
+    energy_system = SimpleNamespace(results={})
+
+    extract_results(om=None, energy_system=energy_system,
+                    nodes_data=nodes_data)
+
+    # the postprocessing receives the results of the original timesteps
+    sequences = energy_system.results["main"][("source", "bus")]["sequences"]
+    assert list(sequences["flow"]) == [1.0, 2.0, 2.0]
+    assert energy_system.results["meta"] == {"objective": 0}
+
+
+def solve_montecarlo_run_stub(nodes_data_template, current_run, result_path,
+                              seed, **kwargs):
+    """
+        Replaces the solve of a Monte Carlo run by the parameter
+        variation only, defined on module level so that the spawned
+        worker processes can import it.
+    """
+    from program_files.preprocessing.create_energy_system import \
+        create_montecarlo_nodes_data
+    create_montecarlo_nodes_data(nodes_data_template=nodes_data_template,
+                                 current_run=current_run,
+                                 result_path=result_path, seed=seed)
+
+
+def test_run_montecarlo_runs(montecarlo_template, monkeypatch, tmp_path):
+    import os
+    import pandas
+    from program_files.preprocessing import \
+        Spreadsheet_Energy_System_Model_Generator as sesmg
+    monkeypatch.setattr(sesmg, "sesmg_main_montecarlo",
+                        solve_montecarlo_run_stub)
+    results = {}
+    for processes in [1, 2]:
+        runs = []
+        for current_run in range(3):
+            result_path = str(tmp_path / str(processes) / str(current_run))
+            os.makedirs(result_path)
+            runs.append({"nodes_data_template": montecarlo_template,
+                         "current_run": current_run,
+                         "result_path": result_path, "seed": 7,
+                         "num_threads": 2})
+        finished = list(sesmg.run_montecarlo_runs(
+            runs=runs, processes=processes, num_threads=2))
+        assert [error for run, error in finished] == [None] * 3
+        results[processes] = {
+            run["current_run"]: pandas.read_excel(
+                os.path.join(run["result_path"],
+                             "montecarlo_used_parameters.xlsx"),
+                sheet_name=None)
+            for run, error in finished}
+    # the runs of a seed do not depend on the number of workers
+    for current_run, sheets in results[1].items():
+        for sheet, values in sheets.items():
+            pandas.testing.assert_frame_equal(
+                results[2][current_run][sheet], values)
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas
+import pytest
+
+
+@pytest.fixture
+def test_period_matrix():
+    """
+        Four days of two hours of one column, the first and the last
+        two days are equal.
+    """
+    return np.array([[[1.0], [3.0]], [[1.0], [3.0]],
+                     [[2.0], [6.0]], [[2.0], [6.0]]])
+
+
+def test_reconstruct_period_matrix(test_period_matrix):
+    from program_files.preprocessing.data_preparation_algorithms.\
+        cluster_count_selection import reconstruct_period_matrix
+
+    # averaging of two consecutive days reconstructs the year exactly
+    reconstruction, representatives = reconstruct_period_matrix(
+        period_matrix=test_period_matrix, algorithm="averaging", index=2)
+    assert representatives == 2
+    assert (reconstruction == test_period_matrix).all()
+
+    # slicing A uses the first day for the first three days
+    reconstruction, representatives = reconstruct_period_matrix(
+        period_matrix=test_period_matrix, algorithm="slicing A", index=3)
+    assert representatives == 2
+    assert list(reconstruction[:, 0, 0]) == [1.0, 1.0, 1.0, 2.0]
+
+    with pytest.raises(ValueError):
+        reconstruct_period_matrix(period_matrix=test_period_matrix,
+                                  algorithm="random sampling", index=2)
+
+
+def test_calculate_reconstruction_errors(test_period_matrix):
+    from program_files.preprocessing.data_preparation_algorithms.\
+        cluster_count_selection import calculate_reconstruction_errors
+
+    # every day is replaced by the first one
+    errors = calculate_reconstruction_errors(
+        period_matrix=test_period_matrix,
+        reconstruction=np.repeat(test_period_matrix[:1], 4, axis=0),
+        column_names=["demand"])
+
+    # the peak of 6 is reconstructed as 3 within a value range of 5
+    assert errors["peak error demand"] == 0.6
+    assert errors["duration curve RMSE demand"] > 0
+
+
+def test_select_index():
+    from program_files.preprocessing.data_preparation_algorithms.\
+        cluster_count_selection import select_index
+
+    evaluation = pandas.DataFrame({
+        "index": [4, 2, 1], "timesteps": [24, 48, 96],
+        "max. duration curve RMSE": [0.2, 0.04, 0.0]})
+
+    assert select_index(evaluation=evaluation, tolerance=0.05) == 2
+    assert select_index(evaluation=evaluation, tolerance=0.5) == 4
+    # no candidate meets the tolerance
+    evaluation["max. duration curve RMSE"] = 1
+    assert select_index(evaluation=evaluation, tolerance=0.05) == 1
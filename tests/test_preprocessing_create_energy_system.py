@@ -1,3 +1,7 @@
+import os
+import pytest
+
+
 def test_import_scenario():
     from program_files.preprocessing.create_energy_system \
         import import_model_definition
@@ -8,3 +12,116 @@ def test_define_energy_system():
     from program_files.preprocessing.create_energy_system \
         import define_energy_system
     pass
+
+
+def test_evict_model_definition_cache(tmp_path):
+    import os
+    import time
+    from program_files.preprocessing.create_energy_system \
+        import evict_model_definition_cache
+    # create three cache entries of 10 bytes with increasing age
+    for number, file in enumerate(["c.pkl", "b.pkl", "a.pkl"]):
+        (tmp_path / file).write_bytes(b"0" * 10)
+        os.utime(tmp_path / file, (time.time() - number, time.time() - number))
+    evict_model_definition_cache(cache_path=str(tmp_path), max_size=20)
+    # the least recently used entry is removed
+    assert sorted(os.listdir(tmp_path)) == ["b.pkl", "c.pkl"]
+
+
+def test_import_cached_model_definition(tmp_path):
+    import pandas
+    from program_files.preprocessing.create_energy_system \
+        import import_cached_model_definition
+    calls = []
+
+    def parser(content):
+        calls.append(content)
+        return {"sheet": pandas.DataFrame({"length": [len(content)]})}
+
+    first = import_cached_model_definition(
+        content=b"model", cache_path=str(tmp_path), parser=parser)
+    # the caller is allowed to adapt the returned sheets
+    first["sheet"].loc[0, "length"] = 0
+    # an unchanged content is served by the cache
+    second = import_cached_model_definition(
+        content=b"model", cache_path=str(tmp_path), parser=parser)
+    assert calls == [b"model"]
+    assert second["sheet"].loc[0, "length"] == 5
+    # a changed content is parsed again
+    third = import_cached_model_definition(
+        content=b"changed model", cache_path=str(tmp_path), parser=parser)
+    assert calls == [b"model", b"changed model"]
+    assert third["sheet"].loc[0, "length"] == 13
+    assert len(list(tmp_path.glob("*.pkl"))) == 2
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"),
+                    reason="the temp directory is a per-user directory")
+def test_get_model_definition_cache_path(tmp_path, monkeypatch):
+    import stat
+    import tempfile
+    from program_files.preprocessing.create_energy_system \
+        import get_model_definition_cache_path
+    monkeypatch.setattr(tempfile, "gettempdir", lambda: str(tmp_path))
+
+    cache_path = get_model_definition_cache_path()
+    # the directory is created per user and accessible by its owner only
+    assert cache_path == str(tmp_path / ("SESMG_model_definition_cache_"
+                                         + str(os.getuid())))
+    assert stat.S_IMODE(os.stat(cache_path).st_mode) == 0o700
+    # a directory accessible by others is not used
+    os.chmod(cache_path, 0o777)
+    assert get_model_definition_cache_path() is None
+
+
+def test_create_montecarlo_rng():
+    from program_files.preprocessing.create_energy_system import \
+        create_montecarlo_rng
+    draws = create_montecarlo_rng(seed=1, current_run=3).random(5)
+    # the same seed and run reproduce the draws
+    assert (create_montecarlo_rng(seed=1, current_run=3).random(5)
+            == draws).all()
+    # another run or seed results in other draws
+    assert (create_montecarlo_rng(seed=1, current_run=4).random(5)
+            != draws).any()
+    assert (create_montecarlo_rng(seed=2, current_run=3).random(5)
+            != draws).any()
+
+
+def test_draw_montecarlo_capacities(montecarlo_template):
+    from program_files.preprocessing.create_energy_system import \
+        create_montecarlo_rng, draw_montecarlo_capacities
+    sheet = montecarlo_template["sources"].copy()
+    draw_montecarlo_capacities(
+        sheet=sheet, rng=create_montecarlo_rng(seed=1, current_run=0))
+    # the capacity is fixed to a drawn integer within the bounds
+    assert (sheet["min. investment capacity"]
+            == sheet["max. investment capacity"]).all()
+    assert (sheet["max. investment capacity"] >= 0).all()
+    assert (sheet["max. investment capacity"] <= [10, 100]).all()
+    # empty sheets remain unchanged
+    storages = montecarlo_template["storages"].copy()
+    draw_montecarlo_capacities(
+        sheet=storages, rng=create_montecarlo_rng(seed=1, current_run=0))
+    assert len(storages) == 0
+
+
+def test_create_montecarlo_nodes_data(montecarlo_template, tmp_path):
+    import pandas
+    from program_files.preprocessing.create_energy_system import \
+        create_montecarlo_nodes_data
+    template = {key: sheet.copy() for key, sheet in
+                montecarlo_template.items()}
+    nodes_data = create_montecarlo_nodes_data(
+        nodes_data_template=montecarlo_template, current_run=1,
+        result_path=str(tmp_path), seed=1)
+    # the template is not changed by the run
+    for key, sheet in template.items():
+        pandas.testing.assert_frame_equal(montecarlo_template[key], sheet)
+    # the same seed and run reproduce the varied nodes data
+    repeated = create_montecarlo_nodes_data(
+        nodes_data_template=montecarlo_template, current_run=1,
+        result_path=str(tmp_path), seed=1)
+    for key, sheet in nodes_data.items():
+        pandas.testing.assert_frame_equal(repeated[key], sheet)
+    assert os.path.exists(tmp_path / "montecarlo_used_parameters.xlsx")
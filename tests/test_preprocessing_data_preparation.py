@@ -1,13 +1,98 @@
-def test_extract_single_periods():
+import pandas
+import pytest
+
+
+@pytest.fixture
+def test_data_set():
+    """
+        Three days of hourly data of two columns.
+    """
+    return pandas.DataFrame({
+        "timestamp": pandas.date_range("2020-01-01", periods=72, freq="H"),
+        "temperature": [float(hour // 24) for hour in range(72)],
+        "demand": [float(hour % 24) for hour in range(72)]})
+
+
+def test_extract_single_periods(test_data_set):
     from program_files.preprocessing.data_preparation \
         import extract_single_periods
-    pass
+
+    cluster_vectors = extract_single_periods(data_set=test_data_set,
+                                             column_name="temperature",
+                                             period="days")
+
+    assert cluster_vectors.shape == (3, 24)
+    assert list(cluster_vectors[:, 0]) == [0, 1, 2]
 
 
-def test_calculate_cluster_means():
+def test_calculate_cluster_means(test_data_set):
     from program_files.preprocessing.data_preparation \
         import calculate_cluster_means
-    pass
+
+    prep_data_set = calculate_cluster_means(data_set=test_data_set,
+                                            cluster_number=2,
+                                            cluster_labels=[0, 0, 1],
+                                            period="days")
+
+    assert list(prep_data_set.columns) == ["temperature", "demand"]
+    # cluster 0 is the mean of the first and the second day, cluster 1
+    # consists of the third day
+    assert list(prep_data_set["temperature"]) == [0.5] * 24 + [2.0] * 24
+    assert list(prep_data_set["demand"]) == list(range(24)) * 2
+
+
+def test_store_cluster_order():
+    from program_files.preprocessing.data_preparation \
+        import store_cluster_order, TYPICAL_PERIODS_SHEET
+
+    nodes_data = {}
+    store_cluster_order(nodes_data=nodes_data, cluster_labels=[1, 0, 1],
+                        period="days")
+
+    assert list(nodes_data[TYPICAL_PERIODS_SHEET]["cluster"]) == [1, 0, 1]
+    assert list(nodes_data[TYPICAL_PERIODS_SHEET]["timesteps"]) == [24] * 3
+
+
+def test_get_typical_period_weights():
+    from program_files.preprocessing.data_preparation \
+        import store_cluster_order, get_typical_period_weights
+
+    nodes_data = {"energysystem": pandas.DataFrame(
+        {"temporal resolution": ["h"]})}
+    cluster_order = [1, 0, 1, 1]
+    store_cluster_order(nodes_data=nodes_data, cluster_labels=cluster_order,
+                        period="days")
+
+    weights = get_typical_period_weights(nodes_data=nodes_data)
+
+    # every hour of a typical period is weighted by the number of real
+    # days it represents, i.e. its occurrence within the cluster order
+    assert weights == [float(cluster_order.count(0))] * 24 \
+        + [float(cluster_order.count(1))] * 24
+    assert sum(weights) == 24 * len(cluster_order)
+
+
+def test_expand_typical_period_results():
+    from types import SimpleNamespace
+    from program_files.preprocessing.data_preparation \
+        import store_cluster_order, expand_typical_period_results
+
+    nodes_data = {"energysystem": pandas.DataFrame(
+        {"start date": [pandas.Timestamp("2020-01-01")],
+         "temporal resolution": ["h"]})}
+    store_cluster_order(nodes_data=nodes_data, cluster_labels=[1, 0, 1],
+                        period="days")
+    energy_system = SimpleNamespace(results={"main": {
+        ("source", "bus"): {"sequences": pandas.DataFrame(
+            {"flow": range(48)})}}})
+
+    expand_typical_period_results(energy_system=energy_system,
+                                  nodes_data=nodes_data)
+
+    flow = energy_system.results["main"][("source", "bus")]["sequences"]
+    assert list(flow["flow"]) == list(range(24, 48)) + list(range(24)) \
+        + list(range(24, 48))
+    assert flow.index[-1] == pandas.Timestamp("2020-01-03 23:00")
 
 
 def test_append_timeseries_to_weatherdata_sheet():
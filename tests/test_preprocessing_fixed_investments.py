@@ -0,0 +1,84 @@
+import pytest
+
+
+@pytest.fixture
+def test_energy_system(gas_heat_energy_system):
+    """
+        Energy system with a gas import of a fixed capacity (non-convex
+        investment), a gas boiler whose capacity is optimized and a
+        heat storage of a fixed capacity.
+    """
+    from oemof import solph
+    from .conftest import get_node
+
+    energy_system = gas_heat_energy_system
+    gas_bus = get_node(energy_system, "gas_bus")
+    heat_bus = get_node(energy_system, "heat_bus")
+    energy_system.add(
+        solph.Source(label="gas_import", outputs={gas_bus: solph.Flow(
+            investment=solph.Investment(
+                ep_costs=2, minimum=10, maximum=10, existing=5,
+                nonconvex=True, offset=100))}),
+        solph.Transformer(
+            label="gas_boiler", inputs={gas_bus: solph.Flow()},
+            outputs={heat_bus: solph.Flow(investment=solph.Investment(
+                ep_costs=1, maximum=50))},
+            conversion_factors={heat_bus: 0.9}),
+        solph.components.GenericStorage(
+            label="heat_storage", inputs={heat_bus: solph.Flow()},
+            outputs={heat_bus: solph.Flow()},
+            invest_relation_input_capacity=0.5,
+            invest_relation_output_capacity=0.25,
+            investment=solph.Investment(ep_costs=3, minimum=20, maximum=20)))
+    return energy_system
+
+
+def test_fix_investments(test_energy_system):
+    from program_files.preprocessing.fixed_investments import \
+        fix_investments, get_fixed_investment_costs
+    from .conftest import get_node
+
+    fixed = fix_investments(energy_system=test_energy_system)
+
+    assert fixed == {
+        # maximum * ep_costs + offset of the non-convex investment
+        "gas_import -> gas_bus": {"capacity": 15, "costs": 120,
+                                  "constraint costs": 0},
+        "heat_storage": {"capacity": 20, "costs": 60,
+                         "constraint costs": 0}}
+    gas_bus = get_node(test_energy_system, "gas_bus")
+    heat_bus = get_node(test_energy_system, "heat_bus")
+    flow = get_node(test_energy_system, "gas_import").outputs[gas_bus]
+    assert flow.investment is None and flow.nominal_value == 15
+    storage = get_node(test_energy_system, "heat_storage")
+    assert storage.investment is None
+    assert storage.nominal_storage_capacity == 20
+    # capacity * input / output capacity ratio
+    assert storage.outputs[heat_bus].nominal_value == 5
+    assert heat_bus.outputs[storage].nominal_value == 10
+    # the boiler's capacity is still optimized
+    boiler = get_node(test_energy_system, "gas_boiler")
+    assert boiler.outputs[heat_bus].investment is not None
+    assert get_fixed_investment_costs(energy_system=test_energy_system,
+                                      cost_type="costs") == 180
+
+
+def test_restore_fixed_investments(test_energy_system):
+    from program_files.preprocessing.fixed_investments import \
+        fix_investments, restore_fixed_investments
+    from .conftest import get_node
+
+    fix_investments(energy_system=test_energy_system)
+    results = {}
+    restore_fixed_investments(energy_system=test_energy_system,
+                              results=results)
+
+    gas_bus = get_node(test_energy_system, "gas_bus")
+    source = get_node(test_energy_system, "gas_import")
+    storage = get_node(test_energy_system, "heat_storage")
+    assert source.outputs[gas_bus].investment.maximum == 10
+    assert source.outputs[gas_bus].nominal_value is None
+    assert storage.investment.maximum == 20
+    assert results[(source, gas_bus)]["scalars"]["invest"] == 10
+    assert results[(storage, None)]["scalars"]["invest"] == 20
+    assert len(results) == 2
@@ -0,0 +1,99 @@
+import pytest
+
+
+@pytest.fixture
+def test_energy_system(gas_heat_energy_system):
+    """
+        Energy system with a heat demand (peak 30 kW) supplied by a gas
+        boiler (efficiency 0.5) and a gas import whose maximum
+        investment capacities are placeholder values.
+    """
+    from oemof import solph
+    from .conftest import get_node
+
+    energy_system = gas_heat_energy_system
+    gas_bus = get_node(energy_system, "gas_bus")
+    heat_bus = get_node(energy_system, "heat_bus")
+    energy_system.add(
+        solph.Source(label="gas_import", outputs={gas_bus: solph.Flow(
+            investment=solph.Investment(ep_costs=1, maximum=999999))}),
+        solph.Transformer(
+            label="gas_boiler", inputs={gas_bus: solph.Flow()},
+            outputs={heat_bus: solph.Flow(investment=solph.Investment(
+                ep_costs=1, maximum=999999, existing=5))},
+            conversion_factors={heat_bus: 0.5}))
+    return energy_system
+
+
+def test_tighten_investment_bounds(test_energy_system):
+    from program_files.preprocessing.investment_bounds import \
+        tighten_investment_bounds
+
+    tightened = tighten_investment_bounds(energy_system=test_energy_system)
+
+    assert tightened == {
+        # peak demand minus existing capacity
+        "gas_boiler -> heat_bus": {"maximum": 999999,
+                                   "tightened maximum": 25},
+        # peak boiler output divided by its efficiency
+        "gas_import -> gas_bus": {"maximum": 999999,
+                                  "tightened maximum": 60}}
+
+
+def test_restore_investment_bounds(test_energy_system):
+    from program_files.preprocessing.investment_bounds import \
+        restore_investment_bounds, tighten_investment_bounds
+    from .conftest import get_node
+
+    tightened = tighten_investment_bounds(energy_system=test_energy_system)
+    restore_investment_bounds(energy_system=test_energy_system,
+                              tightened=tightened)
+    # the model definition's maximum capacities are reported again
+    gas_bus = get_node(test_energy_system, "gas_bus")
+    heat_bus = get_node(test_energy_system, "heat_bus")
+    assert get_node(test_energy_system, "gas_import").outputs[
+        gas_bus].investment.maximum == 999999
+    assert get_node(test_energy_system, "gas_boiler").outputs[
+        heat_bus].investment.maximum == 999999
+
+
+def test_tighten_investment_bounds_excess(test_energy_system):
+    from oemof import solph
+    from program_files.preprocessing.investment_bounds import \
+        tighten_investment_bounds
+    from .conftest import get_node
+
+    # an excess sink is able to consume an unlimited amount of heat
+    heat_bus = get_node(test_energy_system, "heat_bus")
+    test_energy_system.add(solph.Sink(label="heat_excess",
+                                      inputs={heat_bus: solph.Flow()}))
+
+    assert tighten_investment_bounds(energy_system=test_energy_system) == {}
+
+
+def test_tighten_investment_bounds_max_profile(test_energy_system):
+    from oemof import solph
+    from program_files.preprocessing.investment_bounds import \
+        tighten_investment_bounds
+    from .conftest import get_node
+
+    # a curtailable solar thermal collector is able to use capacity
+    # beyond the peak demand in the time steps of low irradiation
+    heat_bus = get_node(test_energy_system, "heat_bus")
+    test_energy_system.add(solph.Source(
+        label="solar_thermal", outputs={heat_bus: solph.Flow(
+            max=[0, 0.25, 1], investment=solph.Investment(
+                ep_costs=1, maximum=999999))}))
+    # a collector which is never available can not be tightened
+    test_energy_system.add(solph.Source(
+        label="shaded_solar_thermal", outputs={heat_bus: solph.Flow(
+            max=[0, 0, 0], investment=solph.Investment(
+                ep_costs=1, maximum=999999))}))
+
+    tightened = tighten_investment_bounds(energy_system=test_energy_system)
+
+    # largest ratio of the demand (10, 30, 20) to the available profile
+    assert tightened["solar_thermal -> heat_bus"] == {
+        "maximum": 999999, "tightened maximum": 120}
+    assert "shaded_solar_thermal -> heat_bus" not in tightened
+    assert tightened["gas_boiler -> heat_bus"]["tightened maximum"] == 25
@@ -1,3 +1,52 @@
+import pandas
+import pytest
+
+
+@pytest.fixture
+def test_data_set():
+    """
+        Two days of hourly weather data and the timeseries of an
+        electricity sink.
+    """
+    return pandas.DataFrame({
+        "timestamp": pandas.date_range("2020-01-01", periods=48, freq="H"),
+        "temperature": [10.0] * 24 + [20.0] * 24,
+        "ghi": [0.0] * 48,
+        "el_sink.fix": [1.0] * 24 + [0.5] * 24})
+
+
+@pytest.fixture
+def test_sinks():
+    return pandas.DataFrame({"label": ["el_sink"], "active": [1],
+                             "nominal value": [4], "sector": ["electricity"]})
+
+
 def test_k_means_algorithm():
     from program_files.preprocessing.data_preparation_algorithms.k_means_medoids \
-        import k_means_algorithm
\ No newline at end of file
+        import k_means_algorithm
+
+
+def test_create_feature_matrix(test_data_set, test_sinks):
+    from program_files.preprocessing.data_preparation_algorithms.\
+        k_means_medoids import create_feature_matrix
+
+    feature_matrix = create_feature_matrix(
+        data_set=test_data_set, sinks=test_sinks, period="days",
+        weights={"temperature": 4, "ghi": 1, "windspeed": 1,
+                 "electricity demand": 1})
+
+    # temperature (weight 4) and electricity demand, the constant ghi
+    # and the missing windspeed do not contribute
+    assert feature_matrix.shape == (2, 72)
+    assert list(feature_matrix[:, 0]) == [0, 2]
+    assert list(feature_matrix[:, 24]) == [0, 0]
+    assert list(feature_matrix[:, 48]) == [1, 0]
+
+
+def test_create_feature_matrix_missing_attributes(test_data_set, test_sinks):
+    from program_files.preprocessing.data_preparation_algorithms.\
+        k_means_medoids import create_feature_matrix
+
+    with pytest.raises(ValueError):
+        create_feature_matrix(data_set=test_data_set, sinks=test_sinks,
+                              period="days", weights={"windspeed": 1})
@@ -0,0 +1,95 @@
+import pandas
+import pytest
+
+
+@pytest.fixture
+def test_nodes_data():
+    """
+        Model definition with a demand bus supplied by a gas boiler, a
+        heat bus of a zero capacity heat pump and two buses connected
+        by a link which do not lead to any sink.
+    """
+    return {
+        "buses": pandas.DataFrame(
+            {"label": ["gas_bus", "heat_bus", "hp_bus", "island_1",
+                       "island_2"],
+             "active": [1, 1, 1, 1, 1],
+             "excess": [0, 0, 0, 0, 0],
+             "district heating conn.": [0, 0, 0, 0, 0]}),
+        "sinks": pandas.DataFrame(
+            {"label": ["heat_demand"], "active": [1], "input": ["heat_bus"]}),
+        "sources": pandas.DataFrame(
+            {"label": ["gas_import", "island_pv"], "active": [1, 1],
+             "output": ["gas_bus", "island_1"], "input": ["None", "None"],
+             "existing capacity": [0, 10],
+             "max. investment capacity": [1000, 10]}),
+        "transformers": pandas.DataFrame(
+            {"label": ["gas_boiler", "heat_pump"], "active": [1, 1],
+             "input": ["gas_bus", "hp_bus"], "input2": ["None", "None"],
+             "output": ["heat_bus", "heat_bus"],
+             "output2": ["None", "None"],
+             "existing capacity": [0, 0],
+             "max. investment capacity": [100, 0]}),
+        "storages": pandas.DataFrame(
+            {"label": ["island_battery"], "active": [1], "bus": ["island_2"],
+             "existing capacity": [0], "max. investment capacity": [10]}),
+        "links": pandas.DataFrame(
+            {"label": ["island_link"], "active": [1],
+             "(un)directed": ["undirected"], "bus1": ["island_1"],
+             "bus2": ["island_2"], "existing capacity": [0],
+             "max. investment capacity": [10]}),
+        "competition constraints": pandas.DataFrame(
+            {"label": ["area", "island_area"], "active": [1, 1],
+             "component 1": ["island_pv", "island_pv"],
+             "component 2": ["gas_boiler", "heat_pump"]})}
+
+
+def test_presolve_model_definition(test_nodes_data):
+    from program_files.preprocessing.model_definition_presolve import \
+        presolve_model_definition
+
+    removed = presolve_model_definition(nodes_data=test_nodes_data)
+
+    assert removed == {
+        "transformers": {"heat_pump"},
+        "sources": {"island_pv"},
+        "storages": {"island_battery"},
+        "links": {"island_link"},
+        "buses": {"hp_bus", "island_1", "island_2"},
+        "competition constraints": {"island_area"}}
+    assert list(test_nodes_data["buses"]["active"]) == [1, 1, 0, 0, 0]
+    assert list(test_nodes_data["transformers"]["active"]) == [1, 0]
+    assert list(test_nodes_data["competition constraints"]["active"]) \
+        == [1, 0]
+
+
+def test_presolve_model_definition_excess(test_nodes_data):
+    from program_files.preprocessing.model_definition_presolve import \
+        presolve_model_definition
+
+    # an excess sink makes the island buses reachable
+    test_nodes_data["buses"].loc[3, "excess"] = 1
+
+    removed = presolve_model_definition(nodes_data=test_nodes_data)
+
+    assert removed["buses"] == {"hp_bus"}
+    assert "links" not in removed
+    assert "competition constraints" not in removed
+
+
+def test_presolve_model_definition_competition(test_nodes_data):
+    from program_files.preprocessing.model_definition_presolve import \
+        presolve_model_definition
+
+    presolve_model_definition(nodes_data=test_nodes_data)
+
+    # the gas boiler is still limited by the constraint of the
+    # deactivated island pv
+    competition = test_nodes_data["competition constraints"]
+    assert list(competition.loc[0, ["active", "component 1",
+                                    "component 2"]]) \
+        == [1, "None", "gas_boiler"]
+    # both components of the island area are deactivated
+    assert list(competition.loc[1, ["active", "component 1",
+                                    "component 2"]]) \
+        == [0, "island_pv", "heat_pump"]
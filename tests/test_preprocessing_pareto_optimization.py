@@ -0,0 +1,63 @@
+import os
+
+
+def run_sesmg_stub(GUI_main_dict, model_definition, save_path):
+    """
+        Replaces the optimization of a pareto point by storing the
+        number of threads it was given, defined on module level so that
+        the spawned worker processes can import it.
+    """
+    with open(os.path.join(save_path, "threads.txt"), "w") as outfile:
+        outfile.write(str(GUI_main_dict["input_num_threads"]))
+
+
+def test_save_model_definition_to_directory(tmp_path):
+    import io
+    from program_files.preprocessing.pareto_optimization import \
+        save_model_definition_to_directory
+
+    # file paths are returned unchanged
+    assert save_model_definition_to_directory(
+        "model_definition.xlsx", str(tmp_path)) == "model_definition.xlsx"
+
+    # uploaded files are stored within the pareto directory
+    class UploadedFile(io.BytesIO):
+        name = "uploads/model_definition.xlsx"
+    file_path = save_model_definition_to_directory(
+        UploadedFile(b"model definition"), str(tmp_path))
+    assert file_path == str(tmp_path) + "/model_definition.xlsx"
+    with open(file_path, "rb") as infile:
+        assert infile.read() == b"model definition"
+
+
+def test_run_pareto_points_serial(monkeypatch):
+    from program_files.preprocessing import \
+        Spreadsheet_Energy_System_Model_Generator as sesmg
+    from program_files.preprocessing.pareto_optimization import \
+        run_pareto_points
+    calls = []
+    monkeypatch.setattr(sesmg, "run_SESMG",
+                        lambda *args: calls.append(args))
+    runs = [({"input_num_threads": 4}, "model_definition.xlsx", "0"),
+            ({"input_num_threads": 4}, "model_definition.xlsx", "1")]
+    run_pareto_points(runs=runs, processes=1, num_threads=4)
+    # the runs are solved in order with the user's number of threads
+    assert calls == runs
+
+
+def test_run_pareto_points_parallel(monkeypatch, tmp_path):
+    from program_files.preprocessing import \
+        Spreadsheet_Energy_System_Model_Generator as sesmg
+    from program_files.preprocessing.pareto_optimization import \
+        run_pareto_points
+    monkeypatch.setattr(sesmg, "run_SESMG", run_sesmg_stub)
+    runs = []
+    for run in range(3):
+        os.makedirs(tmp_path / str(run))
+        runs.append(({"input_num_threads": 6}, "model_definition.xlsx",
+                     str(tmp_path / str(run))))
+    run_pareto_points(runs=runs, processes=2, num_threads=6)
+    # the threads are split across the worker processes
+    for GUI_main_dict, model_definition, save_path in runs:
+        with open(os.path.join(save_path, "threads.txt"), "r") as infile:
+            assert infile.read() == "3"
@@ -0,0 +1,41 @@
+import pandas
+import pytest
+
+
+@pytest.fixture
+def test_data_set():
+    """
+        Eight hours of hourly data with a two hour peak of the demand.
+    """
+    return pandas.DataFrame({
+        "timestamp": pandas.date_range("2020-01-01", periods=8, freq="H"),
+        "temperature": [1.0, 1.0, 1.0, 1.0, 2.0, 2.0, 2.0, 2.0],
+        "demand": [1.0, 1.0, 5.0, 5.0, 1.0, 1.0, 1.0, 1.0]})
+
+
+def test_calculate_segment_durations(test_data_set):
+    from program_files.preprocessing.data_preparation_algorithms.\
+        segmentation import create_normalized_matrix, \
+        calculate_segment_durations, calculate_segmentation_error
+
+    matrix = create_normalized_matrix(data_sets=[test_data_set])
+    durations = calculate_segment_durations(matrix=matrix, segment_number=3)
+
+    # the peak is kept as a segment of its own
+    assert durations == [2, 2, 4]
+    assert calculate_segmentation_error(matrix, durations) == 0
+    with pytest.raises(ValueError):
+        calculate_segment_durations(matrix=matrix, segment_number=9)
+
+
+def test_segment_data_set(test_data_set):
+    from program_files.preprocessing.data_preparation_algorithms.\
+        segmentation import segment_data_set
+
+    segmented = segment_data_set(data_set=test_data_set, durations=[3, 5])
+
+    assert list(segmented["timestamp"]) == list(test_data_set["timestamp"][
+        [0, 3]])
+    assert list(segmented["temperature"]) == [1.0, 1.8]
+    # the energy of the demand is kept if weighted by the durations
+    assert list(segmented["demand"] * [3, 5]) == [7.0, 9.0]
@@ -1,4 +1,29 @@
+import pandas
+import pytest
+
+
+@pytest.fixture
+def test_data_set():
+    """
+        Three days of hourly data of one column.
+    """
+    return pandas.DataFrame({
+        "timestamp": pandas.date_range("2020-01-01", periods=72, freq="H"),
+        "temperature": [float(hour // 24) for hour in range(72)]})
+
 
 def test_timeseries_slicing():
     from program_files.preprocessing.data_preparation_algorithms.slicing \
-        import timeseries_slicing
\ No newline at end of file
+        import timeseries_slicing
+
+
+def test_data_set_slicing(test_data_set):
+    from program_files.preprocessing.data_preparation_algorithms.slicing \
+        import data_set_slicing, data_set_slicing2
+
+    assert list(data_set_slicing(
+        n_days=2, data_set=test_data_set, period="days")["temperature"]) \
+        == [0.0] * 24
+    assert list(data_set_slicing2(
+        n_days=3, data_set=test_data_set, period="days")["temperature"]) \
+        == [0.0] * 24 + [1.0] * 24
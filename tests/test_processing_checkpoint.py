@@ -0,0 +1,49 @@
+def test_create_checkpoint_key(tmp_path):
+    from program_files.processing.checkpoint import create_checkpoint_key
+    model_definition = tmp_path / "model_definition.xlsx"
+    model_definition.write_bytes(b"model definition")
+    params = {"model_definition_file": str(model_definition),
+              "timeseries_prep": ["none", "none", "none", "none", 0],
+              "criterion_switch": False, "presolve": True,
+              "tighten_bounds": True, "cluster_dh": False,
+              "district_heating_path": None, "solver": "cbc",
+              "solver_options": {"threads": 2}}
+    key = create_checkpoint_key(**params)
+    assert create_checkpoint_key(**params) == key
+    # every parameter affecting the results changes the key
+    for param, value in [("criterion_switch", True), ("presolve", False),
+                         ("tighten_bounds", False), ("cluster_dh", True),
+                         ("district_heating_path", str(tmp_path)),
+                         ("solver", "gurobi"),
+                         ("solver_options", {"threads": 4})]:
+        assert create_checkpoint_key(**{**params, param: value}) != key
+    model_definition.write_bytes(b"changed model definition")
+    assert create_checkpoint_key(**params) != key
+
+
+def test_checkpoint_stage(tmp_path):
+    from program_files.processing.checkpoint import load_checkpoint_stage, \
+        save_checkpoint_stage
+    assert load_checkpoint_stage(result_path=str(tmp_path), key="a") \
+        == "none"
+    save_checkpoint_stage(result_path=str(tmp_path), key="a", stage="solved")
+    assert load_checkpoint_stage(result_path=str(tmp_path), key="a") \
+        == "solved"
+    # checkpoints of another input are ignored
+    assert load_checkpoint_stage(result_path=str(tmp_path), key="b") \
+        == "none"
+
+
+def test_prepared_nodes_data(tmp_path):
+    import pandas
+    from program_files.processing.checkpoint import load_checkpoint_stage, \
+        load_prepared_nodes_data, save_prepared_nodes_data
+    nodes_data = {"sources": pandas.DataFrame({"label": ["pv"],
+                                               "active": [1]})}
+    save_prepared_nodes_data(result_path=str(tmp_path), key="a",
+                             nodes_data=nodes_data)
+    assert load_checkpoint_stage(result_path=str(tmp_path), key="a") \
+        == "prepared"
+    loaded = load_prepared_nodes_data(result_path=str(tmp_path))
+    pandas.testing.assert_frame_equal(loaded["sources"],
+                                      nodes_data["sources"])
@@ -0,0 +1,24 @@
+def test_create_model_statistics():
+    import pyomo.environ as po
+    from program_files.processing.model_statistics import \
+        create_model_statistics
+
+    om = po.ConcreteModel()
+    om.x = po.Var([0, 1])
+    om.y = po.Var(within=po.Binary)
+    om.z = po.Var()
+    om.z.fix(1)
+    om.c = po.Constraint(expr=om.x[0] + om.y <= 1)
+    om.d = po.Constraint([0, 1], rule=lambda m, i: m.x[i] + m.z >= 0)
+
+    statistics = create_model_statistics(om=om)
+
+    assert statistics["variables"] == {"continuous": 2, "binary": 1,
+                                       "integer": 0, "fixed": 1, "total": 4}
+    assert statistics["constraints"] == 3
+    # fixed variables are not counted as nonzeros
+    assert statistics["nonzeros"] == 4
+    assert statistics["constraints by name"]["d"] == {"constraints": 2,
+                                                      "nonzeros": 2}
+    # the index of the constraints does not contain any oemof node
+    assert statistics["component types"]["other"]["constraints"] == 3
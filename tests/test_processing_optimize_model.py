@@ -0,0 +1,49 @@
+import pytest
+
+
+@pytest.fixture
+def test_model():
+    """
+        Small pyomo model providing the attributes of an oemof model
+        used by the custom constraints (TIMESTEPS, timeincrement and
+        flow variables).
+    """
+    import pyomo.environ as po
+
+    om = po.ConcreteModel()
+    om.TIMESTEPS = po.Set(initialize=[0, 1, 2], ordered=True)
+    om.FLOWS = po.Set(initialize=[("a", "b"), ("c", "d")], dimen=2)
+    om.flow = po.Var(om.FLOWS, om.TIMESTEPS, initialize=1)
+    om.timeincrement = [1, 2, 1]
+    return om
+
+
+def test_create_integral_flow_expression(test_model):
+    from types import SimpleNamespace
+    import pyomo.environ as po
+    from program_files.processing.optimize_model import \
+        create_integral_flow_expression
+
+    flows = {("a", "b"): SimpleNamespace(emission_factor=0.5),
+             ("c", "d"): SimpleNamespace(emission_factor=[0, 3, 0])}
+
+    expression = create_integral_flow_expression(
+        om=test_model, flows=flows, attribute="emission_factor")
+
+    # 0.5 * (1 + 2 + 1) + 3 * 2, all flows are 1
+    assert po.value(expression) == pytest.approx(8)
+    # time steps without emissions are skipped
+    assert len(expression.linear_vars) == 4
+
+
+def test_create_flow_index():
+    from types import SimpleNamespace
+    from program_files.processing.optimize_model import create_flow_index
+
+    om = SimpleNamespace(flows={("link", "bus_1"): None,
+                                ("link", "bus_2"): None,
+                                ("pv", "bus_1"): None})
+
+    assert create_flow_index(om=om) == {
+        "link": [("link", "bus_1"), ("link", "bus_2")],
+        "pv": [("pv", "bus_1")]}
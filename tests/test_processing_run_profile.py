@@ -0,0 +1,22 @@
+def test_run_profile(tmp_path):
+    import json
+    from program_files.processing.run_profile import RunProfile
+    profile = RunProfile()
+    with profile.stage("first"):
+        pass
+    assert profile.call("second", max, 1, 2, thread=True) == 2
+    profile.save(result_path=str(tmp_path))
+    # the stages are stored in order of their completion
+    with open(tmp_path / "run_profile.json", "r") as infile:
+        run_profile = json.load(infile)
+    assert [stage["stage"] for stage in run_profile["stages"]] \
+        == ["first", "second"]
+    assert run_profile["stages"][1]["concurrent"]
+
+
+def test_run_profile_file_name(tmp_path):
+    import os
+    from program_files.processing.run_profile import RunProfile
+    profile = RunProfile()
+    profile.save(result_path=str(tmp_path), file_name="build_profile.json")
+    assert os.listdir(tmp_path) == ["build_profile.json"]
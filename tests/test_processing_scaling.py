@@ -0,0 +1,74 @@
+import math
+import pytest
+
+
+@pytest.fixture
+def test_model():
+    """
+        Small pyomo model whose coefficients span several orders of
+        magnitude.
+    """
+    import pyomo.environ as po
+
+    model = po.ConcreteModel()
+    model.x = po.Var(bounds=(0, 999999))
+    model.y = po.Var(bounds=(0, None))
+    model.demand = po.Constraint(expr=1000 * model.x + 0.001 * model.y >= 5)
+    model.link = po.Constraint(expr=model.x - 0.01 * model.y <= 0)
+    model.objective = po.Objective(expr=10000 * model.x + model.y)
+    return model
+
+
+def test_power_of_two():
+    from program_files.processing.scaling import power_of_two
+
+    assert power_of_two(1000) == 1024
+    assert power_of_two(0.001) == 2 ** -10
+
+
+def test_compute_scaling_factors(test_model):
+    from program_files.processing.scaling import collect_coefficients, \
+        compute_scaling_factors, get_coefficient_ranges
+
+    rows, objective, variables = collect_coefficients(om=test_model)
+    row_factors, column_factors, objective_factor = compute_scaling_factors(
+        rows=rows, objective=objective, passes=4)
+
+    before = get_coefficient_ranges(rows=rows, objective=objective,
+                                    variables=variables)
+    after = get_coefficient_ranges(
+        rows=rows, objective=objective, variables=variables,
+        row_factors=row_factors, column_factors=column_factors,
+        objective_factor=objective_factor)
+
+    assert before["matrix"] == [0.001, 1000]
+    assert before["bounds"] == [999999, 999999]
+    # the ratio of the largest and smallest coefficient decreases
+    assert after["matrix"][1] / after["matrix"][0] \
+        < before["matrix"][1] / before["matrix"][0]
+    # all factors are powers of two
+    for factor in row_factors + list(column_factors.values()):
+        assert factor == 2.0 ** round(math.log2(factor))
+
+
+def test_create_scaled_model_binary(test_model):
+    import pyomo.environ as po
+    from program_files.processing.scaling import collect_coefficients, \
+        compute_scaling_factors, create_scaled_model
+
+    # binary investment decision of the big-M constraint
+    test_model.z = po.Var(within=po.Binary)
+    test_model.big_m = po.Constraint(
+        expr=test_model.x - 999999 * test_model.z <= 0)
+    rows, objective, variables = collect_coefficients(om=test_model)
+    row_factors, column_factors, objective_factor = compute_scaling_factors(
+        rows=rows, objective=objective, passes=4,
+        unscaled_variables={id(test_model.z)})
+    assert id(test_model.z) not in column_factors
+    assert column_factors[id(test_model.x)] != 1.0
+
+    scaled_model = create_scaled_model(om=test_model, scaling="aggressive")
+    # the binary variable remains integral within the scaled model
+    scaled_z = scaled_model.find_component("scaled_z")
+    assert scaled_z.is_binary()
+    assert scaled_z.bounds == (0, 1)
@@ -0,0 +1,75 @@
+import pandas
+import pytest
+
+
+@pytest.fixture
+def test_nodes_data():
+    return {"energysystem": pandas.DataFrame(
+        {"start date": ["2012-01-01 00:00:00"],
+         "mip gap": [0.05],
+         "time limit": ["None"],
+         "presolve": ["aggressive"]}, index=[1])}
+
+
+def test_read_solver_options(test_nodes_data):
+    from program_files.processing.solver_options import read_solver_options
+
+    assert read_solver_options(nodes_data=test_nodes_data) == {
+        "mip gap": 0.05, "presolve": "aggressive"}
+    # options given by the batch runner overwrite the model definition
+    assert read_solver_options(
+        nodes_data=test_nodes_data,
+        solver_options={"mip gap": 0.01, "time limit": 60}) == {
+        "mip gap": 0.01, "presolve": "aggressive", "time limit": 60.0}
+
+
+def test_read_solver_options_invalid(test_nodes_data):
+    from program_files.processing.solver_options import read_solver_options
+
+    with pytest.raises(ValueError):
+        read_solver_options(nodes_data=test_nodes_data,
+                            solver_options={"gap": 0.01})
+    with pytest.raises(ValueError):
+        read_solver_options(nodes_data=test_nodes_data,
+                            solver_options={"cuts": "all"})
+
+
+def test_translate_solver_options():
+    from program_files.processing.solver_options import \
+        translate_solver_options
+
+    options = {"mip gap": 0.01, "time limit": 60.0, "presolve": "off",
+               "cuts": "aggressive"}
+
+    assert translate_solver_options(
+        solver="cbc", num_threads=4, solver_options=options) == {
+        "threads": 4, "ratioGap": 0.01, "sec": 60.0, "presolve": "off",
+        "cuts": "forceOn"}
+    assert translate_solver_options(
+        solver="gurobi", num_threads=4, solver_options=options) == {
+        "threads": 4, "MIPGap": 0.01, "TimeLimit": 60.0, "Presolve": 0,
+        "Cuts": 2}
+    # glpk does not support threads and cuts, the presolver is a flag
+    assert translate_solver_options(
+        solver="glpk", num_threads=4, solver_options=options) == {
+        "mipgap": 0.01, "tmlim": 60}
+
+
+def test_translate_solver_options_highs():
+    from program_files.processing.solver_options import \
+        translate_solver_options
+
+    assert translate_solver_options(
+        solver="highs", num_threads=2,
+        solver_options={"mip gap": 0.01, "presolve": "on", "cuts": "off"}
+    ) == {"threads": 2, "mip_rel_gap": 0.01, "presolve": "choose"}
+
+
+def test_translate_solver_options_scaling():
+    from program_files.processing.solver_options import \
+        translate_solver_options
+
+    # the scaling is applied by the SESMG and not passed to the solver
+    assert translate_solver_options(
+        solver="cbc", num_threads=1,
+        solver_options={"scaling": "aggressive"}) == {"threads": 1}
@@ -0,0 +1,61 @@
+import pandas
+import pytest
+
+
+@pytest.fixture
+def test_model():
+    """
+        Model of two typical periods of two hours each, consisting of a
+        heat storage whose capacity is optimized and a fixed heat
+        storage.
+    """
+    from oemof import solph
+
+    energy_system = solph.EnergySystem(
+        timeindex=pandas.date_range("2020-01-01", periods=4, freq="H"))
+    heat_bus = solph.Bus(label="heat_bus")
+    energy_system.add(
+        heat_bus,
+        solph.Source(label="heat_source", outputs={heat_bus: solph.Flow(
+            variable_costs=[1, 5, 1, 5])}),
+        solph.Sink(label="heat_demand", inputs={heat_bus: solph.Flow(
+            fix=[1, 3, 2, 1], nominal_value=10)}),
+        solph.components.GenericStorage(
+            label="seasonal_storage", inputs={heat_bus: solph.Flow()},
+            outputs={heat_bus: solph.Flow()}, loss_rate=0.01,
+            investment=solph.Investment(ep_costs=1, maximum=100)),
+        solph.components.GenericStorage(
+            label="heat_storage", inputs={heat_bus: solph.Flow()},
+            outputs={heat_bus: solph.Flow()},
+            nominal_storage_capacity=20, initial_storage_level=0.5))
+    return solph.Model(energy_system)
+
+
+def test_add_inter_period_storage_linking(test_model):
+    from program_files.processing.storage_linking import \
+        add_inter_period_storage_linking, get_linked_storages
+
+    om = add_inter_period_storage_linking(om=test_model,
+                                          cluster_order=[0, 1, 1, 0, 1],
+                                          timesteps=2)
+
+    # one inter-period content at the beginning of every period plus
+    # the content at the end of the year per storage
+    assert len(om.inter_period_content) == 2 * 6
+    assert len(om.intra_period_start) == 2 * 2
+    # the balances between the typical periods are replaced
+    for block, storage, capacity in get_linked_storages(om=om):
+        assert not block.balance_first[storage].active
+        assert not block.balance[storage, 2].active
+        assert block.balance[storage, 3].active
+
+
+def test_add_inter_period_storage_linking_timesteps(test_model):
+    from program_files.processing.storage_linking import \
+        add_inter_period_storage_linking
+
+    # three typical periods of two hours do not match four timesteps
+    with pytest.raises(ValueError):
+        add_inter_period_storage_linking(om=test_model,
+                                         cluster_order=[0, 1, 2],
+                                         timesteps=2)
@@ -0,0 +1,60 @@
+import json
+import os
+import pytest
+
+
+@pytest.fixture
+def test_job_file(tmp_path):
+    """
+        Creates a job file holding two jobs with relative model
+        definition paths.
+    """
+    job_file_path = tmp_path / "jobs.json"
+    with open(job_file_path, "w", encoding="utf-8") as outfile:
+        json.dump({"defaults": {"input_solver": "gurobi",
+                                "input_num_threads": 4},
+                   "jobs": [{"model_definition": "model_definition.xlsx"},
+                            {"model_definition": "model_definition.xlsx",
+                             "input_num_threads": 8}]},
+                  outfile)
+    return str(job_file_path)
+
+
+def test_import_batch_jobs(test_job_file):
+    from program_files.start_batch import import_batch_jobs
+
+    batch = import_batch_jobs(job_file_path=test_job_file)
+
+    directory = os.path.dirname(test_job_file)
+    assert len(batch["jobs"]) == 2
+    assert batch["result_path"] == os.path.join(directory, "results")
+    assert batch["jobs"][0]["model_definition"] \
+        == os.path.join(directory, "model_definition.xlsx")
+
+
+def test_import_batch_jobs_without_jobs(tmp_path):
+    from program_files.start_batch import import_batch_jobs
+
+    job_file_path = tmp_path / "jobs.json"
+    with open(job_file_path, "w", encoding="utf-8") as outfile:
+        json.dump({"jobs": []}, outfile)
+
+    with pytest.raises(ValueError):
+        import_batch_jobs(job_file_path=str(job_file_path))
+
+
+def test_create_batch_job_dict(test_job_file):
+    from program_files.start_batch import import_batch_jobs, \
+        create_batch_job_dict
+
+    batch = import_batch_jobs(job_file_path=test_job_file)
+    job_dict = create_batch_job_dict(job=batch["jobs"][1],
+                                     defaults=batch["defaults"])
+
+    # batch defaults overwrite the GUI defaults
+    assert job_dict["input_solver"] == "gurobi"
+    # job parameters overwrite the batch defaults
+    assert job_dict["input_num_threads"] == 8
+    # GUI defaults are kept for parameters not given
+    assert job_dict["input_timeseries_algorithm"] == "None"
+    assert job_dict["input_dh_folder"] == ""
@@ -0,0 +1,20 @@
+def test_create_benchmark_cases():
+    from program_files.start_benchmark import create_benchmark_cases
+    cases = create_benchmark_cases(buildings=[10, 100], hours=[24],
+                                   district_heating=[False, True])
+    assert [case["name"] for case in cases] == [
+        "10_buildings_24_h_no_dh", "10_buildings_24_h_dh",
+        "100_buildings_24_h_no_dh", "100_buildings_24_h_dh"]
+
+
+def test_compare_benchmarks():
+    from program_files.start_benchmark import compare_benchmarks
+    baseline = {"cases": {"case": {"total_wall_time": 10.0,
+                                   "stages": {"solver": 5.0,
+                                              "import": 0.1}}}}
+    results = {"cases": {"case": {"total_wall_time": 11.0,
+                                  "stages": {"solver": 8.0,
+                                             "import": 0.3}}}}
+    regressions = compare_benchmarks(results=results, baseline=baseline)
+    # the import is slower, but below the absolute tolerance
+    assert [regression["stage"] for regression in regressions] == ["solver"]
@@ -254,3 +254,49 @@ def test_get_central_comp_active_status():
 
 def test_urban_district_upscaling_pre_processing():
     pass
+
+
+def test_group_identical_buildings():
+    """
+    
+    """
+    from program_files.urban_district_upscaling.pre_processing \
+        import group_identical_buildings
+    
+    tool = pandas.DataFrame.from_dict(
+        {"label": ["b1", "b2", "b3", "b4", "b5"],
+         "active": [1, 1, 1, 1, 0],
+         "latitude": [52.0, 52.1, 52.2, 52.3, 52.4],
+         "building type": ["SFB", "SFB", "MFB", "SFB", "SFB"],
+         "central heat": ["no", "no", "no", "yes", "no"],
+         "parcel ID": [0, 0, 0, 0, 0]})
+    
+    # b4 could be connected to a heating network, b5 is inactive
+    assert group_identical_buildings(tool=tool) == {
+        "b1": ["b1", "b2"], "b3": ["b3"], "b4": ["b4"]}
+
+
+def test_scale_building_subsystem():
+    """
+    
+    """
+    from program_files.urban_district_upscaling.pre_processing \
+        import scale_building_subsystem
+    
+    sheets = {
+        "sinks": pandas.DataFrame.from_dict(
+            {"label": ["x", "central_demand", "b1_heat_demand"],
+             "annual demand": ["x", 100.0, 10.0]}),
+        "sources": pandas.DataFrame.from_dict(
+            {"label": ["x", "b1_pv_source"],
+             "max. investment capacity": ["x", 5.0],
+             "variable costs": ["x", 0.1]})}
+    
+    sheets = scale_building_subsystem(sheets=sheets,
+                                      start_rows={"sinks": 2, "sources": 1},
+                                      factor=3)
+    
+    assert list(sheets["sinks"]["annual demand"]) == ["x", 100.0, 30.0]
+    assert list(sheets["sources"]["max. investment capacity"]) == ["x", 15.0]
+    # specific costs are not scaled
+    assert list(sheets["sources"]["variable costs"]) == ["x", 0.1]